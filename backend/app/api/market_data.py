@@ -4,13 +4,12 @@ Market Data API endpoints
 
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional, List, Dict
-import json
+from datetime import datetime
 
-from app.services.rate_aggregator import RateAggregatorService
-from app.core.database import cache
+from app.schemas.market import BatchConversionRequest
+from app.services.rate_aggregator import rate_service
 
 router = APIRouter()
-rate_service = RateAggregatorService()
 
 @router.get("/rates")
 async def get_forex_rates(
@@ -21,7 +20,7 @@ async def get_forex_rates(
     """
     try:
         # Get all rates
-        all_rates = await rate_service.get_all_rates()
+        all_rates, meta = await rate_service.get_all_rates_with_meta()
         
         # Filter if specific pairs requested
         if pairs:
@@ -34,13 +33,15 @@ async def get_forex_rates(
             return {
                 "success": True,
                 "data": filtered_rates,
-                "count": len(filtered_rates)
+                "count": len(filtered_rates),
+                "meta": meta
             }
         
         return {
             "success": True,
             "data": all_rates,
-            "count": len(all_rates)
+            "count": len(all_rates),
+            "meta": meta
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -55,14 +56,15 @@ async def get_rate(pair: str):
         # Replace hyphen with slash for flexibility
         pair = pair.replace("-", "/")
         
-        rate_data = await rate_service.get_rate(pair)
+        rate_data, meta = await rate_service.get_rate_with_meta(pair)
         
         if not rate_data:
             raise HTTPException(status_code=404, detail=f"Rate not found for {pair}")
         
         return {
             "success": True,
-            "data": rate_data
+            "data": rate_data,
+            "meta": meta
         }
     except HTTPException:
         raise
@@ -73,10 +75,12 @@ async def get_rate(pair: str):
 async def get_historical_data(
     symbol: str,
     interval: str = Query("1d", regex="^(1h|1d|1w|1m)$"),
-    limit: int = Query(100, ge=1, le=1000)
+    limit: int = Query(100, ge=1, le=1000),
+    max_points: Optional[int] = Query(None, ge=2, le=5000),
+    downsample: str = Query("lttb", regex="^(lttb|minmax)$")
 ):
     """
-    Get historical price data for a symbol
+    Get historical price data for a symbol, optionally downsampled to max_points
     """
     try:
         symbol = symbol.replace("-", "/")
@@ -84,19 +88,56 @@ async def get_historical_data(
         historical_data = await rate_service.get_historical_rates(
             symbol=symbol,
             interval=interval,
-            limit=limit
+            limit=limit,
+            max_points=max_points,
+            downsample=downsample
         )
         
         return {
             "success": True,
             "symbol": symbol,
             "interval": interval,
+            "downsample": downsample if max_points else None,
             "data": historical_data,
             "count": len(historical_data)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/historical/{symbol}/ticks")
+async def get_tick_history(
+    symbol: str,
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    limit: int = Query(1000, ge=1, le=100000),
+    max_points: Optional[int] = Query(None, ge=2, le=5000),
+    downsample: str = Query("lttb", regex="^(lttb|minmax)$")
+):
+    """
+    Get raw ticks for a symbol, including sealed archive months
+    """
+    try:
+        symbol = symbol.replace("-", "/")
+        
+        ticks = await rate_service.get_tick_history(
+            symbol=symbol,
+            start=start,
+            end=end,
+            limit=limit,
+            max_points=max_points,
+            downsample=downsample
+        )
+        
+        return {
+            "success": True,
+            "symbol": symbol,
+            "downsample": downsample if max_points else None,
+            "data": ticks,
+            "count": len(ticks)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/convert")
 async def convert_currency(
     amount: float = Query(..., gt=0),
@@ -126,6 +167,43 @@ async def convert_currency(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/convert/batch")
+async def convert_currency_batch(request: BatchConversionRequest):
+    """
+    Convert many (amount, from, to) rows in one call
+    """
+    try:
+        rows = request.conversions
+        from_currencies = [row.from_currency.upper() for row in rows]
+        to_currencies = [row.to_currency.upper() for row in rows]
+        
+        converted = await rate_service.convert_currency_batch(
+            amounts=[row.amount for row in rows],
+            from_currencies=from_currencies,
+            to_currencies=to_currencies
+        )
+        
+        results = [
+            {
+                "from_currency": from_currency,
+                "to_currency": to_currency,
+                "amount": row.amount,
+                "converted_amount": converted_amount,
+                "rate": converted_amount / row.amount if converted_amount is not None else None
+            }
+            for row, from_currency, to_currency, converted_amount
+            in zip(rows, from_currencies, to_currencies, converted)
+        ]
+        
+        return {
+            "success": True,
+            "data": results,
+            "count": len(results),
+            "failed": sum(1 for value in converted if value is None)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/bubbles")
 async def get_crypto_bubbles():
     """
@@ -313,3 +391,15 @@ async def get_prices():
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/providers")
+async def get_providers():
+    """
+    Describe every configured rate provider with its health and consensus record
+    """
+    providers = rate_service.get_providers()
+    return {
+        "success": True,
+        "data": providers,
+        "count": len(providers)
+    }
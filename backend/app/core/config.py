@@ -54,7 +54,120 @@ class Settings(BaseSettings):
     COINBASE_API_KEY: str = "your-coinbase-api-key"
     COINBASE_API_SECRET: str = "your-coinbase-api-secret"
     COINGECKO_API_KEY: str = "your-coingecko-api-key"
-    
+    ALPHA_VANTAGE_URL: str = "https://www.alphavantage.co/query"
+    BINANCE_API_URL: str = "https://api.binance.com"  # http://localhost:9002 for stub_market_server.py
+
+    # Upstream HTTP client
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100
+    HTTP_CLIENT_MAX_KEEPALIVE: int = 20
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = 60.0  # seconds an idle connection is kept open
+    HTTP_CLIENT_MAX_PER_HOST: int = 10  # Concurrent requests per upstream host
+    HTTP_CLIENT_HTTP2: bool = False  # Needs the h2 package
+    HTTP_CLIENT_DNS_TTL: float = 300.0  # seconds; 0 disables the DNS cache
+    HTTP_CLIENT_TIMEOUT: float = 10.0
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = 3.0
+
+    # Rate Aggregator
+    RATE_FOREX_PAIRS: List[str] = [
+        "USD/EUR", "USD/JPY", "USD/GBP", "USD/CHF", "USD/CAD",
+        "EUR/JPY", "EUR/GBP", "GBP/JPY", "AUD/USD", "NZD/USD"
+    ]
+    RATE_CRYPTO_PAIRS: List[str] = ["BTC/USD", "ETH/USD", "USDC/USD", "USDT/USD"]
+    RATE_PAIR_UNIVERSE_FILE: Optional[str] = None  # JSON {"forex": [...], "crypto": [...]} added to the lists above
+    RATE_PROVIDERS: dict = {  # Provider chains in priority order (see app.services.providers)
+        "forex": ["alpha_vantage", "yahoo_finance"],
+        "crypto": ["binance"]
+    }
+    RATE_SIMULATOR: dict = {  # Deterministic offline provider settings
+        "seed": 42,
+        "latency_ms": 50.0,
+        "jitter_ms": 20.0,
+        "error_rate": 0.0,
+        "volatility": 0.0005
+    }
+    RATE_SIMULATOR_FALLBACK: bool = False  # Serve simulated rates when every provider fails (offline dev only)
+    RATE_CACHE_SOFT_TTL: int = 90  # seconds before a cached rate is refreshed in the background
+    RATE_CACHE_HARD_TTL: int = 300  # seconds before reads fall back to the last-known-good snapshot
+    RATE_REFRESH_LOCK_TTL: int = 30  # seconds a worker may hold a refresh lock
+    RATE_REFRESH_POLL_INTERVAL: float = 0.1  # seconds between cache checks while another worker refreshes
+    RATE_BATCH_FETCH: bool = True  # One multi-symbol request per source instead of one per pair
+    RATE_PROVIDER_MAX_WORKERS: int = 16  # Thread pool size for blocking SDK calls
+    RATE_PROVIDER_CONCURRENCY: dict = {
+        "alpha_vantage": 5,
+        "yahoo_finance": 8,
+        "binance": 10,
+        "simulator": 64,
+        "default": 4
+    }
+    RATE_PROVIDER_TIMEOUTS: dict = {  # seconds
+        "alpha_vantage": 10.0,
+        "yahoo_finance": 10.0,
+        "binance": 8.0,
+        "default": 10.0
+    }
+    RATE_POLL_MIN_INTERVAL: float = 5.0  # seconds; fastest any pair is refreshed
+    RATE_POLL_MAX_INTERVAL: float = 300.0  # seconds; slowest, e.g. for pegged stablecoins
+    RATE_POLL_TARGET_MOVE_BPS: float = 3.0  # Poll about as often as a pair moves this much
+    RATE_POLL_VOLATILITY_ALPHA: float = 0.2  # EWMA weight of the newest return
+    RATE_POLL_DEMAND_WEIGHT: float = 0.5  # How strongly reads and subscribers shorten intervals
+    RATE_POLL_DEMAND_HALF_LIFE: float = 300.0  # seconds for API read demand to halve
+    RATE_POLL_JITTER: float = 0.1  # +/- fraction applied to every interval
+    RATE_BREAKER_FAILURE_THRESHOLD: int = 3  # Consecutive failures before a provider's circuit opens
+    RATE_BREAKER_RESET_TIMEOUT: float = 30.0  # seconds open before a half-open trial call
+    RATE_BREAKER_RESET_MAX: float = 300.0  # seconds; the timeout doubles after failed trials up to this
+    RATE_LATENCY_WINDOW: int = 200  # Latency samples kept per provider
+    # Hedging applies to the sequential provider chain only. With consensus on (the default with more
+    # than one provider) every provider is already asked at once, so there is nothing left to hedge.
+    RATE_HEDGE_ENABLED: bool = True  # Race the next provider once the current one passes its latency percentile
+    RATE_HEDGE_PERCENTILE: float = 95.0
+    RATE_HEDGE_MIN_SAMPLES: int = 20  # Samples needed before the percentile is trusted
+    RATE_HEDGE_DEFAULT_DELAY: float = 1.0  # seconds, until then, for providers with no expected latency
+    RATE_CONSENSUS_ENABLED: bool = True  # Price from every provider's quote instead of the first to answer
+    RATE_CONSENSUS_METHOD: str = "median"  # median (weighted) or vwap (volume-weighted mean of accepted quotes)
+    RATE_CONSENSUS_MAD_K: float = 5.0  # Reject quotes further than this many scaled MADs from the median...
+    RATE_CONSENSUS_TOLERANCE_BPS: float = 50.0  # ...and further than this, so tight markets are not over-pruned
+    RATE_CONSENSUS_GRACE: float = 1.0  # seconds to wait for other sources after the first answer
+    RATE_CONSENSUS_WEIGHTS: dict = {
+        "alpha_vantage": 2.0,
+        "yahoo_finance": 1.0,
+        "binance": 2.0,
+        "default": 1.0
+    }
+    RATE_LEADER_ELECTION: bool = True  # Only the elected worker polls providers; the rest read the shared snapshot
+    RATE_LEADER_LEASE_TTL: float = 10.0  # seconds; worst-case failover time when a leader dies
+    RATE_LEADER_RENEW_INTERVAL: float = 3.0  # seconds between lease renewals
+    RATE_LEADER_RETRY_INTERVAL: float = 1.0  # seconds between follower election attempts
+    RATE_INGEST_MODE: str = "leader"  # leader: one elected worker polls every pair; sharded: pairs are split over the ingest pool
+    RATE_INGEST_IN_API: bool = True  # False when ingest_worker.py processes do the polling and API workers only read
+    RATE_SHARD_HEARTBEAT_INTERVAL: float = 2.0  # seconds between ingest pool heartbeats
+    RATE_SHARD_MEMBER_TTL: float = 6.0  # seconds without a heartbeat before a worker's pairs move
+    RATE_SHARD_VNODES: int = 128  # Points per worker on the hash ring
+    RATE_STREAM_ENABLED: bool = False  # Push crypto tickers over an exchange WebSocket; polling stays as fallback
+    RATE_STREAM_URL: str = "wss://stream.binance.com:9443/stream"  # ws://localhost:9001/stream for mock_exchange_server.py
+    RATE_EXCHANGE_SYMBOLS: dict = {  # pair -> Binance symbol, for the REST provider and the stream
+        "BTC/USD": "BTCUSDT",
+        "ETH/USD": "ETHUSDT",
+        "USDC/USD": "USDCUSDT"
+    }
+    RATE_EXCHANGE_INFO_TTL: float = 3600.0  # seconds between reloads of Binance's listed symbols
+    RATE_STREAM_FLUSH_INTERVAL: float = 0.25  # seconds between batched cache writes
+    RATE_STREAM_STALE_AFTER: float = 10.0  # seconds of silence before polling takes a pair back
+    RATE_STREAM_PING_INTERVAL: float = 20.0
+    RATE_STREAM_RECONNECT_MAX: float = 30.0  # seconds
+    RATE_RECORD_FILE: Optional[str] = None  # e.g. "data/feed-{pid}.jsonl.gz"; records provider answers and tickers for replay_feed.py
+
+    # Internal event bus
+    EVENT_BUS_QUEUE_SIZE: int = 1024  # Events buffered per subscriber before the oldest is dropped
+
+    # WebSocket fan-out
+    WS_REQUIRE_AUTH: bool = False  # Refuse connections without a valid access token (?token=... or Bearer header)
+    WS_SEND_QUEUE_SIZE: int = 256  # Frames buffered per client before the overflow policy applies
+    WS_OVERFLOW_POLICY: str = "conflate"  # drop_oldest, conflate (keep the newest frame per channel) or disconnect
+    WS_SEND_TIMEOUT: float = 10.0  # seconds one frame may take before the client is dropped
+    WS_CONFLATION_MIN_INTERVAL_MS: int = 50  # Fastest cadence a client may ask for with interval_ms
+    WS_CONFLATION_MAX_INTERVAL_MS: int = 60000
+    WS_MARKET_MIN_INTERVAL: float = 1.0  # seconds; market summaries are coalesced to at most one per interval
+
     # KYC Providers
     KYC_PROVIDER: str = "jumio"  # jumio, onfido, sumsub
     JUMIO_API_KEY: str = "your-jumio-api-key"
@@ -78,6 +191,16 @@ class Settings(BaseSettings):
     WITHDRAWAL_FEE_PERCENT: float = 0.5  # 0.5%
     MAX_SLIPPAGE_PERCENT: float = 5.0  # 5%
     
+    # Tick History
+    TICK_STORE_ENABLED: bool = True
+    TICK_BATCH_SIZE: int = 500  # Flush once this many ticks are buffered
+    TICK_FLUSH_INTERVAL: float = 5.0  # ...or after this many seconds
+    TICK_BUFFER_MAX: int = 50000  # Oldest ticks are dropped beyond this while the database is down
+    TICK_ARCHIVE_ENABLED: bool = True
+    TICK_ARCHIVE_DIR: str = "data/tick_archive"  # Memory-mapped columnar files for sealed months
+    TICK_ARCHIVE_AFTER_MONTHS: int = 3  # Months kept in PostgreSQL before sealing
+    TICK_ARCHIVE_CHECK_INTERVAL: int = 3600  # seconds between sealing passes
+    
     # Rate Limits
     RATE_LIMIT_REQUESTS: int = 100
     RATE_LIMIT_PERIOD: int = 60  # seconds
@@ -5,8 +5,9 @@ Database configuration and session management
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import Dict, Generator, List, Optional
 import redis
+import uuid
 from .config import settings
 
 # PostgreSQL setup
@@ -44,18 +45,40 @@ def get_redis() -> redis.Redis:
     """Get Redis client"""
     return redis_client
 
+# Compare-and-delete so a worker can only release a lock it still owns
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Extends a lock's TTL only if the caller still owns it
+EXTEND_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
 # Cache utilities
 class CacheManager:
     def __init__(self, redis_client: redis.Redis):
         self.redis = redis_client
         self.prefix = settings.REDIS_PREFIX
     
+    def key(self, key: str) -> str:
+        """Get the fully prefixed Redis key"""
+        return f"{self.prefix}{key}"
+    
     def get(self, key: str):
         """Get value from cache"""
         return self.redis.get(f"{self.prefix}{key}")
     
-    def set(self, key: str, value: str, expire: int = 300):
-        """Set value in cache with expiration"""
+    def set(self, key: str, value: str, expire: Optional[int] = 300):
+        """Set value in cache with expiration (expire=None keeps it forever)"""
+        if expire is None:
+            return self.redis.set(f"{self.prefix}{key}", value)
         return self.redis.setex(f"{self.prefix}{key}", expire, value)
     
     def delete(self, key: str):
@@ -66,6 +89,69 @@ class CacheManager:
         """Check if key exists"""
         return self.redis.exists(f"{self.prefix}{key}") > 0
     
+    def pipeline(self, transaction: bool = False):
+        """Get a pipeline for batching commands into one round trip (use key() for keys)"""
+        return self.redis.pipeline(transaction=transaction)
+    
+    def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Get many values in one round trip"""
+        return self.redis.mget([f"{self.prefix}{key}" for key in keys])
+    
+    def mset(self, mapping: Dict[str, str], expire: Optional[int] = 300):
+        """Set many values in one round trip, each with the same expiration"""
+        pipe = self.pipeline()
+        for key, value in mapping.items():
+            if expire is None:
+                pipe.set(f"{self.prefix}{key}", value)
+            else:
+                pipe.setex(f"{self.prefix}{key}", expire, value)
+        return pipe.execute()
+    
+    def hget(self, key: str, field: str) -> Optional[str]:
+        """Get one field of a hash"""
+        return self.redis.hget(f"{self.prefix}{key}", field)
+    
+    def hmget(self, key: str, fields: List[str]) -> List[Optional[str]]:
+        """Get several fields of a hash in one round trip"""
+        return self.redis.hmget(f"{self.prefix}{key}", fields)
+    
+    def hgetall(self, key: str) -> Dict[str, str]:
+        """Get every field of a hash"""
+        return self.redis.hgetall(f"{self.prefix}{key}")
+    
+    def hset(self, key: str, mapping: Dict[str, str], expire: Optional[int] = None):
+        """Set several fields of a hash, optionally refreshing its expiration"""
+        pipe = self.pipeline()
+        pipe.hset(f"{self.prefix}{key}", mapping=mapping)
+        if expire is not None:
+            pipe.expire(f"{self.prefix}{key}", expire)
+        return pipe.execute()
+    
+    def acquire_lock(self, name: str, ttl_ms: int) -> Optional[str]:
+        """Try to take a cross-process lock; returns an owner token or None"""
+        token = uuid.uuid4().hex
+        if self.redis.set(f"{self.prefix}lock:{name}", token, nx=True, px=ttl_ms):
+            return token
+        return None
+    
+    def release_lock(self, name: str, token: str) -> bool:
+        """Release a lock taken with acquire_lock, if we still own it"""
+        released = self.redis.eval(RELEASE_LOCK_SCRIPT, 1, f"{self.prefix}lock:{name}", token)
+        return bool(released)
+    
+    def extend_lock(self, name: str, token: str, ttl_ms: int) -> bool:
+        """Renew a lock taken with acquire_lock; False if it was lost"""
+        extended = self.redis.eval(EXTEND_LOCK_SCRIPT, 1, f"{self.prefix}lock:{name}", token, ttl_ms)
+        return bool(extended)
+    
+    def publish(self, channel: str, message: str):
+        """Publish a message on a prefixed pub/sub channel"""
+        return self.redis.publish(f"{self.prefix}{channel}", message)
+    
+    def pubsub(self):
+        """Get a pub/sub handle (subscribe with key() to apply the prefix)"""
+        return self.redis.pubsub(ignore_subscribe_messages=True)
+    
     def flush_pattern(self, pattern: str):
         """Delete all keys matching pattern"""
         cursor = 0
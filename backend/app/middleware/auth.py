@@ -2,6 +2,8 @@
 Authentication middleware
 """
 
+from typing import Optional
+
 from fastapi import HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
@@ -9,20 +11,20 @@ from app.core.config import settings
 
 security = HTTPBearer()
 
-def verify_token(credentials: HTTPAuthorizationCredentials):
-    """Verify JWT token"""
-    token = credentials.credentials
+def decode_user_id(token: str) -> Optional[str]:
+    """Return the user id a JWT access token was issued to, or None if it is invalid"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials"
-            )
-        return user_id
     except JWTError:
+        return None
+    return payload.get("sub")
+
+def verify_token(credentials: HTTPAuthorizationCredentials):
+    """Verify JWT token"""
+    user_id = decode_user_id(credentials.credentials)
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials"
         )
+    return user_id
@@ -18,6 +18,7 @@ from .all_models import (
     TransactionStatus,
     WatchlistItem, WatchlistType,
     CryptoPrice,
+    PriceTick, PriceCandle,
     LiquidityPool
 )
 
@@ -32,5 +33,6 @@ __all__ = [
     'TransactionStatus',
     'WatchlistItem', 'WatchlistType',
     'CryptoPrice',
+    'PriceTick', 'PriceCandle',
     'LiquidityPool'
 ]
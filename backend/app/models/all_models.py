@@ -2,7 +2,7 @@
 Consolidated models file for quick implementation
 """
 
-from sqlalchemy import Column, String, Numeric, ForeignKey, DateTime, Enum as SQLEnum, UniqueConstraint, JSON, Boolean, Integer, func
+from sqlalchemy import Column, String, Numeric, ForeignKey, DateTime, Enum as SQLEnum, UniqueConstraint, JSON, Boolean, Integer, BigInteger, Identity, Index, func
 from sqlalchemy.orm import relationship
 import enum
 from app.core.database import Base
@@ -229,6 +229,39 @@ class CryptoPrice(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+class PriceTick(Base):
+    """Raw rate ticks, range-partitioned by month on timestamp (see TickStore)"""
+    __tablename__ = "price_ticks"
+    
+    id = Column(BigInteger, Identity(), primary_key=True)
+    timestamp = Column(DateTime(timezone=True), primary_key=True)
+    symbol = Column(String, nullable=False)
+    price = Column(Numeric(18, 8), nullable=False)
+    bid = Column(Numeric(18, 8), nullable=True)
+    ask = Column(Numeric(18, 8), nullable=True)
+    volume_24h = Column(Numeric(30, 8), nullable=True)
+    change_24h = Column(Numeric(10, 4), nullable=True)
+    
+    __table_args__ = (
+        Index('ix_price_ticks_symbol_timestamp', 'symbol', 'timestamp'),
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
+    )
+
+class PriceCandle(Base):
+    """OHLCV rollups per symbol and interval, maintained by CandleAggregator"""
+    __tablename__ = "price_candles"
+    
+    symbol = Column(String, primary_key=True)
+    interval = Column(String(4), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    open = Column(Numeric(18, 8), nullable=False)
+    high = Column(Numeric(18, 8), nullable=False)
+    low = Column(Numeric(18, 8), nullable=False)
+    close = Column(Numeric(18, 8), nullable=False)
+    volume = Column(Numeric(30, 8))  # NULL when no tick carried volume information
+    tick_count = Column(Integer, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class LiquidityPool(Base):
     __tablename__ = "liquidity_pools"
     
@@ -0,0 +1,14 @@
+"""
+Pydantic schemas for market data
+"""
+
+from pydantic import BaseModel, Field
+from typing import List
+
+class ConversionRow(BaseModel):
+    amount: float = Field(..., gt=0)
+    from_currency: str
+    to_currency: str
+
+class BatchConversionRequest(BaseModel):
+    conversions: List[ConversionRow] = Field(..., min_length=1, max_length=10000)
@@ -0,0 +1,125 @@
+"""
+Incremental OHLCV candle aggregation
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+# Supported candle intervals; "1m" is one calendar month
+INTERVALS = ("1h", "1d", "1w", "1m")
+
+def bucket_start(timestamp: datetime, interval: str) -> datetime:
+    """Start of the interval bucket containing timestamp (UTC)"""
+    timestamp = timestamp.astimezone(timezone.utc)
+    if interval == "1h":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if interval == "1d":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "1w":
+        day = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+        return day - timedelta(days=day.weekday())  # Weeks start on Monday
+    if interval == "1m":
+        return timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unsupported candle interval: {interval}")
+
+class CandleAggregator:
+    """Folds ticks into open OHLCV candles for every supported interval
+
+    Only the open bucket of each (symbol, interval) is kept in memory.
+    Volume and tick counts are tracked as deltas since the last drain, so
+    persisting a candle is an idempotent-safe upsert that adds the deltas
+    and widens high/low, even if the process restarted mid-bucket.
+    """
+
+    def __init__(self, intervals=INTERVALS):
+        self.intervals = tuple(intervals)
+        self._open: Dict[Tuple[str, str], Dict] = {}
+        self._closed: List[Dict] = []
+
+    def add_tick(self, symbol: str, timestamp: datetime, price: float, volume: Optional[float] = None):
+        """Fold one tick into every interval's open candle
+
+        volume is what traded since the symbol's previous tick, or None if
+        unknown; a candle whose ticks never carried any keeps volume None.
+        """
+        for interval in self.intervals:
+            start = bucket_start(timestamp, interval)
+            key = (symbol, interval)
+            candle = self._open.get(key)
+
+            if candle is not None and start < candle["bucket_start"]:
+                # Late tick for a bucket we already rolled over; leave it to the raw tick store
+                continue
+
+            if candle is None or start > candle["bucket_start"]:
+                if candle is not None and candle["dirty"]:
+                    self._closed.append(candle)
+                candle = {
+                    "symbol": symbol,
+                    "interval": interval,
+                    "bucket_start": start,
+                    "open": price,
+                    "high": price,
+                    "low": price,
+                    "close": price,
+                    "volume": None,
+                    "tick_count": 0,
+                    "dirty": True
+                }
+                self._open[key] = candle
+
+            candle["high"] = max(candle["high"], price)
+            candle["low"] = min(candle["low"], price)
+            candle["close"] = price
+            if volume is not None:
+                candle["volume"] = (candle["volume"] or 0.0) + volume
+            candle["tick_count"] += 1
+            candle["dirty"] = True
+
+    def drain(self) -> List[Dict]:
+        """Take every candle changed since the last drain as upsert rows
+
+        Finished candles are handed over for good; open ones stay in memory
+        with their volume and tick deltas reset.
+        """
+        rows = [self._row(candle) for candle in self._closed]
+        self._closed = []
+
+        for candle in self._open.values():
+            if candle["dirty"]:
+                rows.append(self._row(candle))
+                candle["volume"] = None
+                candle["tick_count"] = 0
+                candle["dirty"] = False
+
+        return rows
+
+    def open_candle(self, symbol: str, interval: str) -> Optional[Dict]:
+        """Unpersisted state of the open candle, for merging into query results"""
+        candle = self._open.get((symbol, interval))
+        return self._row(candle) if candle else None
+
+    @staticmethod
+    def _row(candle: Dict) -> Dict:
+        return {key: value for key, value in candle.items() if key != "dirty"}
+
+def add_volumes(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    """Sum two volumes where None means unknown rather than zero"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a + b
+
+def merge_candle(stored: Optional[Dict], pending: Dict) -> Dict:
+    """Combine a persisted candle with unflushed deltas for the same bucket"""
+    if stored is None:
+        return dict(pending)
+    return {
+        **stored,
+        "high": max(stored["high"], pending["high"]),
+        "low": min(stored["low"], pending["low"]),
+        "close": pending["close"],
+        "volume": add_volumes(stored["volume"], pending["volume"]),
+        "tick_count": stored["tick_count"] + pending["tick_count"]
+    }
@@ -0,0 +1,179 @@
+"""
+Multi-source consensus pricing with vectorized outlier rejection
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+MAD_SCALE = 1.4826  # Makes the median absolute deviation comparable to a standard deviation
+
+def weighted_median(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Row-wise weighted median; entries with zero weight are ignored
+
+    Rows whose weights are all zero come back as NaN.
+    """
+    masked = np.where(weights > 0, values, np.inf)
+    order = np.argsort(masked, axis=1)
+    sorted_values = np.take_along_axis(masked, order, axis=1)
+    sorted_weights = np.take_along_axis(weights, order, axis=1)
+
+    cumulative = np.cumsum(sorted_weights, axis=1)
+    total = cumulative[:, -1:]
+    index = np.argmax(cumulative >= total / 2, axis=1)
+
+    result = sorted_values[np.arange(len(values)), index]
+    return np.where(total[:, 0] > 0, result, np.nan)
+
+def reject_outliers(
+    prices: np.ndarray,
+    anchor: np.ndarray,
+    k: float,
+    tolerance: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Flag quotes too far from the row median, all rows at once
+
+    prices is pairs x sources (NaN where a source has no quote); anchor is
+    the previous consensus per pair (NaN if none). It takes part in the
+    median and MAD but is never accepted itself, which lets two
+    disagreeing sources be told apart. A quote is rejected when its
+    relative deviation exceeds both k scaled MADs and the tolerance.
+    Returns (accepted mask, relative deviation).
+    """
+    valid = ~np.isnan(prices)
+    with np.errstate(all="ignore"):
+        anchored = np.column_stack([prices, anchor])
+        reference = np.nanmedian(anchored, axis=1)
+        spread = np.abs(anchored - reference[:, None]) / reference[:, None]
+        mad = np.nanmedian(spread, axis=1)
+    deviation = spread[:, :-1]
+    threshold = np.maximum(k * MAD_SCALE * np.nan_to_num(mad), tolerance)
+
+    accepted = valid & (deviation <= threshold[:, None])
+    return accepted, deviation
+
+class ConsensusEngine:
+    """Combines every source's quote for a pair into one robust price
+
+    Each cycle the quotes form a pairs x sources matrix. Outliers are
+    rejected against the row median in one NumPy pass, and the survivors
+    are combined by weighted median (or volume-weighted mean with
+    RATE_CONSENSUS_METHOD = "vwap"). Pairs where every source was rejected
+    fall back to the highest-weighted source. Running per-source deviation
+    and rejection counts are kept for the health endpoints.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = weights or settings.RATE_CONSENSUS_WEIGHTS
+        self._last: Dict[str, float] = {}
+        self._stats: Dict[str, Dict] = {}
+
+    def weight(self, source: str) -> float:
+        return self.weights.get(source, self.weights.get("default", 1.0))
+
+    def combine(self, quotes: Dict[str, Dict[str, Dict]]) -> Dict[str, Dict]:
+        """Turn {source: {pair: rate}} into {pair: consensus rate}"""
+        sources = [source for source, rates in quotes.items() if rates]
+        if not sources:
+            return {}
+        if len(sources) == 1:
+            # Nothing to compare against; pass through but keep the anchor fresh
+            rates = quotes[sources[0]]
+            self._last.update((pair, rate["price"]) for pair, rate in rates.items() if rate.get("price"))
+            return dict(rates)
+
+        pairs: List[str] = list(dict.fromkeys(pair for source in sources for pair in quotes[source]))
+        pair_index = {pair: i for i, pair in enumerate(pairs)}
+
+        prices = np.full((len(pairs), len(sources)), np.nan)
+        volumes = np.full((len(pairs), len(sources)), np.nan)
+        for j, source in enumerate(sources):
+            for pair, rate in quotes[source].items():
+                if rate.get("price"):
+                    prices[pair_index[pair], j] = rate["price"]
+                    if rate.get("volume_24h"):
+                        volumes[pair_index[pair], j] = rate["volume_24h"]
+
+        anchor = np.array([self._last.get(pair, np.nan) for pair in pairs])
+        weights = np.array([self.weight(source) for source in sources])
+
+        accepted, deviation = reject_outliers(
+            prices,
+            anchor,
+            settings.RATE_CONSENSUS_MAD_K,
+            settings.RATE_CONSENSUS_TOLERANCE_BPS / 10_000
+        )
+
+        # Nothing survived: trust the highest-weighted source that quoted
+        valid = ~np.isnan(prices)
+        orphaned = valid.any(axis=1) & ~accepted.any(axis=1)
+        if orphaned.any():
+            best = np.argmax(np.where(valid[orphaned], weights, -np.inf), axis=1)
+            accepted[np.flatnonzero(orphaned), best] = True
+
+        row_weights = np.where(accepted, weights, 0.0)
+        consensus = weighted_median(prices, row_weights)
+
+        if settings.RATE_CONSENSUS_METHOD == "vwap":
+            volume_weights = np.where(accepted & ~np.isnan(volumes), volumes * weights, 0.0)
+            total = volume_weights.sum(axis=1)
+            with np.errstate(all="ignore"):
+                vwap = np.nansum(np.nan_to_num(prices) * volume_weights, axis=1) / total
+            consensus = np.where(total > 0, vwap, consensus)
+
+        self._record(sources, valid, accepted, deviation)
+
+        # Build each rate from the accepted source nearest the consensus
+        with np.errstate(all="ignore"):
+            distance = np.where(accepted, np.abs(prices - consensus[:, None]), np.inf)
+        nearest = np.argmin(distance, axis=1)
+        counts = accepted.sum(axis=1)
+
+        result = {}
+        for i, pair in enumerate(pairs):
+            price = consensus[i]
+            if np.isnan(price):
+                continue
+            base = quotes[sources[nearest[i]]][pair]
+            price = float(price)
+            scale = price / base["price"]
+            rate = dict(base)
+            rate["price"] = price
+            if base.get("bid"):
+                rate["bid"] = base["bid"] * scale
+            if base.get("ask"):
+                rate["ask"] = base["ask"] * scale
+            rate["sources"] = int(counts[i])
+            rejected = [sources[j] for j in np.flatnonzero(valid[i] & ~accepted[i])]
+            if rejected:
+                rate["rejected_sources"] = rejected
+            result[pair] = rate
+            self._last[pair] = float(price)
+
+        return result
+
+    def _record(self, sources: List[str], valid: np.ndarray, accepted: np.ndarray, deviation: np.ndarray):
+        """Fold this cycle's per-source counts and deviations into the running stats"""
+        quoted = valid.sum(axis=0)
+        rejected = (valid & ~accepted).sum(axis=0)
+        deviation_bps = np.nansum(np.where(valid, deviation, 0.0), axis=0) * 10_000
+
+        for j, source in enumerate(sources):
+            stats = self._stats.setdefault(source, {"quotes": 0, "rejected": 0, "deviation_bps_sum": 0.0})
+            stats["quotes"] += int(quoted[j])
+            stats["rejected"] += int(rejected[j])
+            stats["deviation_bps_sum"] += float(deviation_bps[j])
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-source quote count, rejection rate and mean deviation from the median"""
+        return {
+            source: {
+                "quotes": stats["quotes"],
+                "rejected": stats["rejected"],
+                "rejection_rate": stats["rejected"] / stats["quotes"] if stats["quotes"] else 0.0,
+                "mean_deviation_bps": stats["deviation_bps_sum"] / stats["quotes"] if stats["quotes"] else 0.0
+            }
+            for source, stats in self._stats.items()
+        }
@@ -0,0 +1,110 @@
+"""
+Precomputed cross-rate matrix for currency conversion
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+class CrossRateMatrix:
+    """Dense from/to conversion matrix built from a set of pair quotes
+
+    A quote "A/B" with price p means 1 A = p B. Currencies are the nodes
+    of a graph whose edges are the quoted pairs; a breadth-first walk
+    values every currency of a connected component against that
+    component's root, which gives every cross rate in it. Directly quoted
+    pairs (and their inverses) then override the derived values so they
+    match the quote exactly. Currencies that are not connected convert
+    to NaN.
+    """
+
+    def __init__(self, rates: Mapping[str, Dict]):
+        quotes = {}
+        for pair, data in rates.items():
+            if "/" not in pair:
+                continue
+            price = data.get("price") if data else None
+            if price is None or not price > 0:
+                continue
+            base, quote = pair.split("/", 1)
+            quotes[(base, quote)] = float(price)
+
+        currencies = sorted({currency for edge in quotes for currency in edge})
+        self.currencies = np.array(currencies)
+        self.index: Dict[str, int] = {currency: i for i, currency in enumerate(currencies)}
+
+        size = len(currencies)
+        value = np.full(size, np.nan)
+        component = np.full(size, -1)
+
+        neighbours: Dict[int, List] = {i: [] for i in range(size)}
+        for (base, quote), price in quotes.items():
+            b, q = self.index[base], self.index[quote]
+            neighbours[b].append((q, price))  # value[q] = value[b] / price
+            neighbours[q].append((b, 1.0 / price))  # value[b] = value[q] * price
+
+        for root in range(size):
+            if component[root] >= 0:
+                continue
+            component[root] = root
+            value[root] = 1.0
+            queue = deque([root])
+            while queue:
+                node = queue.popleft()
+                for other, price in neighbours[node]:
+                    if component[other] < 0:
+                        component[other] = root
+                        value[other] = value[node] / price
+                        queue.append(other)
+
+        # matrix[i, j] = units of currency j per unit of currency i
+        matrix = value[:, None] / value[None, :]
+        matrix[component[:, None] != component[None, :]] = np.nan
+
+        for (base, quote), price in quotes.items():
+            b, q = self.index[base], self.index[quote]
+            matrix[b, q] = price
+            matrix[q, b] = 1.0 / price
+
+        self.matrix = matrix
+
+    def rate(self, from_currency: str, to_currency: str) -> Optional[float]:
+        """Units of to_currency per unit of from_currency, or None"""
+        if from_currency == to_currency:
+            return 1.0
+        i = self.index.get(from_currency)
+        j = self.index.get(to_currency)
+        if i is None or j is None:
+            return None
+        rate = self.matrix[i, j]
+        return None if np.isnan(rate) else float(rate)
+
+    def _lookup(self, codes: np.ndarray) -> np.ndarray:
+        """Vectorized currency code -> matrix index, -1 when unknown"""
+        if len(self.currencies) == 0:
+            return np.full(len(codes), -1)
+        positions = np.searchsorted(self.currencies, codes)
+        positions = np.clip(positions, 0, len(self.currencies) - 1)
+        return np.where(self.currencies[positions] == codes, positions, -1)
+
+    def convert_many(
+        self,
+        amounts: Iterable[float],
+        from_currencies: Iterable[str],
+        to_currencies: Iterable[str]
+    ) -> np.ndarray:
+        """Convert many (amount, from, to) rows at once; unconvertible rows are NaN"""
+        amounts = np.asarray(amounts, dtype=float)
+        from_codes = np.asarray(from_currencies, dtype=str)
+        to_codes = np.asarray(to_currencies, dtype=str)
+
+        from_idx = self._lookup(from_codes)
+        to_idx = self._lookup(to_codes)
+        known = (from_idx >= 0) & (to_idx >= 0)
+
+        rates = np.full(len(amounts), np.nan)
+        rates[known] = self.matrix[from_idx[known], to_idx[known]]
+        rates[from_codes == to_codes] = 1.0
+
+        return amounts * rates
@@ -0,0 +1,116 @@
+"""
+Chart downsampling (largest-triangle-three-buckets and min/max envelope)
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points largest-triangle-three-buckets keeps
+
+    The first and last points are always kept; the rest are split into
+    threshold - 2 equal buckets and each bucket keeps the point forming
+    the largest triangle with the previously kept point and the average
+    of the next bucket. Triangle areas inside a bucket are computed in
+    one vectorized step.
+    """
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        # No room for a middle bucket; keep as many of the end points as allowed
+        return np.array([0, n - 1])[:max(threshold, 0)]
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        next_lo = hi
+        next_hi = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        px, py = x[previous], y[previous]
+        areas = np.abs((px - avg_x) * (y[lo:hi] - py) - (px - x[lo:hi]) * (avg_y - py))
+        previous = lo + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+def minmax_indices(low: np.ndarray, high: Optional[np.ndarray], threshold: int) -> np.ndarray:
+    """Indices of each bucket's minimum and maximum, in original order
+
+    Points are split into threshold // 2 equal buckets; every bucket keeps
+    the point with the lowest `low` and the one with the highest `high`
+    (the same series when high is None), so spikes always survive.
+    """
+    n = len(low)
+    if threshold >= n or threshold < 2:
+        return np.arange(n)
+
+    low = np.asarray(low, dtype=float)
+    high = low if high is None else np.asarray(high, dtype=float)
+
+    buckets = max(1, threshold // 2)
+    bucket_ids = (np.arange(n) * buckets) // n
+
+    # Sorting by (bucket, value) puts each bucket's min first and max last
+    by_low = np.lexsort((low, bucket_ids))
+    by_high = np.lexsort((high, bucket_ids))
+    starts = np.searchsorted(bucket_ids[by_low], np.arange(buckets), side="left")
+    ends = np.searchsorted(bucket_ids[by_high], np.arange(buckets), side="right") - 1
+
+    return np.unique(np.concatenate([by_low[starts], by_high[ends]]))
+
+def epoch_seconds(value) -> float:
+    """Seconds since the epoch for a number, datetime or ISO timestamp (naive means UTC)"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def downsample_rows(
+    rows: List[Dict],
+    max_points: Optional[int],
+    method: str = "lttb",
+    x_key: str = "timestamp",
+    y_key: str = "price",
+    low_key: Optional[str] = None,
+    high_key: Optional[str] = None
+) -> List[Dict]:
+    """Reduce a row series to at most max_points rows, keeping its shape
+
+    x values may be numbers, datetimes or ISO timestamps; LTTB weighs
+    points by their spacing, so all of them are converted to epoch seconds.
+    """
+    if not max_points or len(rows) <= max_points:
+        return rows
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    if method == "minmax":
+        low = np.fromiter((row[low_key or y_key] for row in rows), dtype=float, count=len(rows))
+        high = None
+        if high_key:
+            high = np.fromiter((row[high_key] for row in rows), dtype=float, count=len(rows))
+        indices = minmax_indices(low, high, max_points)
+    else:
+        y = np.fromiter((row[y_key] for row in rows), dtype=float, count=len(rows))
+        x = np.fromiter((epoch_seconds(row[x_key]) for row in rows), dtype=float, count=len(rows))
+        indices = lttb_indices(x, y, max_points)
+
+    return [rows[i] for i in indices.tolist()]
@@ -0,0 +1,110 @@
+"""
+In-process publish/subscribe event bus
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# {"rate_type": str, "rates": {pair: rate}} with only the pairs whose price changed
+RATES_CHANGED = "rates.changed"
+
+class Subscription:
+    """One consumer's bounded queue of events for a topic
+
+    When the consumer falls behind, the oldest event is dropped to make
+    room; consumers that need full state should read it from the source
+    rather than replay every event.
+    """
+
+    def __init__(self, bus: "EventBus", topic: str, maxsize: int):
+        self.bus = bus
+        self.topic = topic
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._loop = asyncio.get_running_loop()
+
+    def _deliver(self, event: Any):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+    async def get(self) -> Any:
+        return await self._queue.get()
+
+    def get_nowait(self) -> Optional[Any]:
+        """Next queued event, or None if there is none"""
+        try:
+            return self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+class EventBus:
+    """Fans events out to every subscription on a topic without blocking the publisher
+
+    Subscriber state belongs to the event loop that subscribed. publish()
+    may be called from any thread: off that loop (such as from the Redis
+    listener thread) it hands the event over with call_soon_threadsafe
+    before touching any bus state.
+    """
+
+    def __init__(self):
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, topic: str, maxsize: Optional[int] = None) -> Subscription:
+        """Start receiving topic's events; must be called from the consuming event loop"""
+        subscription = Subscription(self, topic, maxsize or settings.EVENT_BUS_QUEUE_SIZE)
+        self._loop = subscription._loop
+        self._subscriptions.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscriptions = self._subscriptions.get(subscription.topic)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.topic]
+
+    def has_subscribers(self, topic: str) -> bool:
+        return topic in self._subscriptions
+
+    def publish(self, topic: str, event: Any):
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        loop = self._loop
+        if loop is not None and loop is not running_loop:
+            try:
+                loop.call_soon_threadsafe(self._dispatch, topic, event)
+            except RuntimeError:
+                # The subscribers' loop has closed; nobody is listening
+                pass
+            return
+        self._dispatch(topic, event)
+
+    def _dispatch(self, topic: str, event: Any):
+        """Deliver to topic's subscribers; runs on the bus's loop"""
+        running_loop = self._loop
+        for subscription in tuple(self._subscriptions.get(topic, ())):
+            if subscription._loop is running_loop:
+                subscription._deliver(event)
+            else:
+                try:
+                    subscription._loop.call_soon_threadsafe(subscription._deliver, event)
+                except RuntimeError:
+                    # Its loop has closed; the consumer is gone
+                    self.unsubscribe(subscription)
+
+# Global bus connecting the rate aggregator to the WebSocket layer
+event_bus = EventBus()
@@ -0,0 +1,169 @@
+"""
+Record-and-replay of normalized rate feeds for reproducible load tests
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Rates are stored as positional lists in this order; timestamps are restamped on replay
+RATE_FIELDS = ("price", "bid", "ask", "volume_24h", "change_24h", "high_24h", "low_24h")
+
+def encode_rates(rates: Dict[str, Dict]) -> Dict[str, list]:
+    return {pair: [rate.get(field) for field in RATE_FIELDS] for pair, rate in rates.items()}
+
+def decode_rates(encoded: Dict[str, list]) -> Dict[str, Dict]:
+    return {
+        pair: {field: value for field, value in zip(RATE_FIELDS, values) if value is not None}
+        for pair, values in encoded.items()
+    }
+
+class FeedRecorder:
+    """Appends what the ingest path receives to a gzipped JSON-lines file
+
+    Two kinds of record are written, each with its offset in seconds from
+    the start of the recording:
+
+    - "quotes": one polling cycle, {source: {pair: rate}} as the providers
+      returned it, before consensus or chain merging
+    - "stream": one flushed batch of pushed exchange tickers
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records = 0
+        self._started = time.monotonic()
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._write({
+            "version": FORMAT_VERSION,
+            "fields": RATE_FIELDS,
+            "started_at": datetime.utcnow().isoformat()
+        })
+        logger.info(f"Recording rate feed to {path}")
+
+    def _write(self, record: Dict):
+        self._file.write(json.dumps(record, separators=(",", ":")))
+        self._file.write("\n")
+
+    def record_quotes(self, quotes: Dict[str, Dict]):
+        """Record one polling cycle's raw per-source answers"""
+        quotes = {source: encode_rates(rates) for source, rates in quotes.items() if rates}
+        if quotes:
+            self._record("quotes", quotes)
+
+    def record_stream(self, rates: Dict[str, Dict]):
+        """Record one batch of streamed tickers"""
+        if rates:
+            self._record("stream", encode_rates(rates))
+
+    def _record(self, kind: str, data: Dict):
+        self._write({"t": round(time.monotonic() - self._started, 6), "kind": kind, "data": data})
+        self.records += 1
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            logger.info(f"Recorded {self.records} feed records to {self.path}")
+
+def read_recording(path: str) -> Iterator[Tuple[float, str, Dict]]:
+    """Yield (offset, kind, data) from a recording, with rates decoded back to dicts"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version: {header.get('version')}")
+
+        for line in f:
+            record = json.loads(line)
+            if record["kind"] == "quotes":
+                data = {source: decode_rates(rates) for source, rates in record["data"].items()}
+            else:
+                data = decode_rates(record["data"])
+            yield record["t"], record["kind"], data
+
+class FeedReplayer:
+    """Feeds a recording back through the aggregator and WebSocket manager
+
+    Records are dispatched on the recorded timeline divided by speed
+    (speed 0 replays as fast as the pipeline keeps up). Polling cycles go
+    through RateAggregatorService.ingest_quotes, so consensus runs as it
+    did live, and ticker batches through ingest_streamed_rates; the stored
+    rates are then broadcast to WebSocket subscribers. Per record it
+    measures how far dispatch fell behind the timeline and the
+    ingest-to-delivery latency, which ends once every subscriber's writer
+    has put the record's frames on its socket.
+    """
+
+    def __init__(self, service, ws_manager=None, speed: float = 1.0):
+        self.service = service
+        self.ws_manager = ws_manager
+        self.speed = speed
+        self.records = 0
+        self.rates = 0
+        self.lags = []
+        self.latencies = []
+        self.elapsed = 0.0
+
+    async def run(self, path: str) -> Dict:
+        started = time.monotonic()
+
+        for offset, kind, data in read_recording(path):
+            if self.speed > 0:
+                delay = started + offset / self.speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.lags.append(max(-delay, 0.0))
+
+            dispatched = time.monotonic()
+            rates = await self._ingest(kind, data)
+            if self.ws_manager and rates:
+                await self.ws_manager.broadcast_rates(rates)
+                await self.ws_manager.manager.drain()
+            self.latencies.append(time.monotonic() - dispatched)
+
+            self.records += 1
+            self.rates += len(rates)
+
+        self.elapsed = time.monotonic() - started
+        return self.stats()
+
+    async def _ingest(self, kind: str, data: Dict) -> Dict:
+        timestamp = datetime.utcnow().isoformat()
+        if kind == "stream":
+            for rate in data.values():
+                rate["timestamp"] = timestamp
+            await self.service.ingest_streamed_rates(data)
+            return data
+
+        for rates in data.values():
+            for rate in rates.values():
+                rate["timestamp"] = timestamp
+        return await self.service.ingest_quotes(data)
+
+    def stats(self) -> Dict:
+        """Throughput plus lag and latency percentiles in milliseconds"""
+        def percentiles(samples) -> Optional[Dict]:
+            if not samples:
+                return None
+            p50, p95, p99, worst = np.percentile(np.asarray(samples) * 1000, (50, 95, 99, 100)).tolist()
+            return {"p50": round(p50, 3), "p95": round(p95, 3), "p99": round(p99, 3), "max": round(worst, 3)}
+
+        return {
+            "speed": self.speed,
+            "records": self.records,
+            "rates": self.rates,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "rates_per_second": round(self.rates / self.elapsed, 1) if self.elapsed else None,
+            "lag_ms": percentiles(self.lags),
+            "latency_ms": percentiles(self.latencies)
+        }
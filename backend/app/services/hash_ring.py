@@ -0,0 +1,45 @@
+"""
+Consistent hash ring for spreading pairs across ingest workers
+"""
+
+import bisect
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+class HashRing:
+    """Maps keys to nodes so that adding or removing a node only moves
+    about 1/N of the keys
+
+    Each node is placed on the ring at `vnodes` points; a key belongs to
+    the first node point clockwise from the key's hash.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 128):
+        self.vnodes = vnodes
+        self.nodes = sorted(set(nodes))
+        points = sorted(
+            (_hash(f"{node}#{i}"), node)
+            for node in self.nodes
+            for i in range(vnodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key: str) -> Optional[str]:
+        """Node that owns key, or None on an empty ring"""
+        if not self._hashes:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+    def assign(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """Group keys by owning node"""
+        assignment: Dict[str, List[str]] = {node: [] for node in self.nodes}
+        for key in keys:
+            node = self.node_for(key)
+            if node is not None:
+                assignment[node].append(key)
+        return assignment
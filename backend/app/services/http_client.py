@@ -0,0 +1,153 @@
+"""
+Shared pooled async HTTP client for upstream market-data calls
+"""
+
+import asyncio
+import logging
+import socket
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class DNSCache:
+    """Resolved addresses per host, kept for a fixed TTL"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int], Tuple[float, str]] = {}
+
+    async def resolve(self, host: str, port: int) -> str:
+        """First address for host, from cache while it is fresh"""
+        key = (host, port)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry and now - entry[0] < self.ttl:
+            return entry[1]
+
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        address = infos[0][4][0]
+        self._entries[key] = (now, address)
+        return address
+
+class MarketDataHTTPClient:
+    """One keep-alive connection pool shared by every provider
+
+    Connections (and their TLS sessions) survive across refresh cycles,
+    so only the first call to a host pays for the handshake. On top of
+    httpx's global pool limits, each host gets its own concurrency cap,
+    and resolved addresses are cached for HTTP_CLIENT_DNS_TTL. Every
+    request is timed into per-host stats, which the providers endpoint
+    reports next to each provider.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._dns = DNSCache(settings.HTTP_CLIENT_DNS_TTL) if settings.HTTP_CLIENT_DNS_TTL > 0 else None
+        self.stats: Dict[str, Dict] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the pooled client on first use"""
+        if self._client is None:
+            http2 = settings.HTTP_CLIENT_HTTP2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning("HTTP/2 requested but the h2 package is missing; using HTTP/1.1")
+                    http2 = False
+
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY
+                ),
+                timeout=httpx.Timeout(settings.HTTP_CLIENT_TIMEOUT, connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT),
+                headers={"User-Agent": f"{settings.APP_NAME}/{settings.APP_VERSION}"}
+            )
+        return self._client
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(settings.HTTP_CLIENT_MAX_PER_HOST)
+        return self._host_limits[host]
+
+    async def _resolve(self, url: str) -> Tuple[str, Dict, Dict]:
+        """Point url at a cached address, keeping Host and TLS SNI on the name"""
+        parts = urlsplit(url)
+        host = parts.hostname
+        if self._dns is None or not host:
+            return url, {}, {}
+
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        address = await self._dns.resolve(host, port)
+        netloc = f"[{address}]" if ":" in address else address
+        if parts.port:
+            netloc = f"{netloc}:{parts.port}"
+
+        headers = {"Host": parts.netloc}
+        extensions = {"sni_hostname": host} if parts.scheme == "https" else {}
+        return parts._replace(netloc=netloc).geturl(), headers, extensions
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the shared pool, raising on HTTP errors"""
+        host = urlsplit(url).hostname or ""
+        started = time.monotonic()
+        status = None
+
+        try:
+            async with self._host_limit(host):
+                target, headers, extensions = await self._resolve(url)
+                if headers:
+                    kwargs["headers"] = {**headers, **kwargs.get("headers", {})}
+                if extensions:
+                    kwargs["extensions"] = {**extensions, **kwargs.get("extensions", {})}
+
+                response = await self._get_client().request(method, target, **kwargs)
+                status = response.status_code
+                response.raise_for_status()
+                return response
+        finally:
+            self._record(host, method, status, time.monotonic() - started)
+
+    async def get_json(self, url: str, **kwargs):
+        """GET url and decode its JSON body"""
+        response = await self.request("GET", url, **kwargs)
+        return response.json()
+
+    def _record(self, host: str, method: str, status: Optional[int], elapsed: float):
+        stats = self.stats.setdefault(host, {"requests": 0, "errors": 0, "total_seconds": 0.0})
+        stats["requests"] += 1
+        stats["total_seconds"] += elapsed
+        if status is None or status >= 400:
+            stats["errors"] += 1
+
+    def metadata(self) -> Dict:
+        """Per-host request counts and mean latency"""
+        return {
+            host: {
+                "requests": stats["requests"],
+                "errors": stats["errors"],
+                "mean_ms": round(stats["total_seconds"] / stats["requests"] * 1000, 1)
+            }
+            for host, stats in self.stats.items()
+        }
+
+    async def aclose(self):
+        """Close every pooled connection"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._host_limits.clear()
+
+# Global client instance shared by every provider in this process
+http_client = MarketDataHTTPClient()
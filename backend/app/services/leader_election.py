@@ -0,0 +1,111 @@
+"""
+Redis lease-based leader election across worker processes
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.core.database import cache
+
+logger = logging.getLogger(__name__)
+
+class LeaderElection:
+    """Keeps at most one process in the deployment holding a named lease
+
+    The leader renews a Redis lock well inside its TTL; everyone else
+    retries the lock every RATE_LEADER_RETRY_INTERVAL. If the leader dies
+    the lease lapses and a follower takes over within one TTL; on a clean
+    shutdown the lock is released straight away. A leader that cannot
+    renew (lost lock or Redis unreachable past its lease) steps down
+    before anyone else can be elected, so two leaders never overlap.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        on_elected: Callable[[], Awaitable],
+        on_demoted: Callable[[], Awaitable],
+        lease_ttl: Optional[float] = None,
+        renew_interval: Optional[float] = None,
+        retry_interval: Optional[float] = None
+    ):
+        self.name = name
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.lease_ttl = lease_ttl or settings.RATE_LEADER_LEASE_TTL
+        self.renew_interval = renew_interval or settings.RATE_LEADER_RENEW_INTERVAL
+        self.retry_interval = retry_interval or settings.RATE_LEADER_RETRY_INTERVAL
+        self._token: Optional[str] = None
+        self._renewed_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.is_running = False
+
+    @property
+    def is_leader(self) -> bool:
+        return self._token is not None
+
+    async def start(self):
+        self.is_running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop campaigning and hand the lease back if we hold it"""
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        if self.is_leader:
+            token = self._token
+            await self._step_down("shutting down")
+            try:
+                cache.release_lock(self.name, token)
+            except Exception as e:
+                logger.warning(f"Could not release {self.name} leadership: {e}")
+
+    async def _run(self):
+        while self.is_running:
+            if self.is_leader:
+                await self._renew()
+            else:
+                await self._campaign()
+            await asyncio.sleep(self.renew_interval if self.is_leader else self.retry_interval)
+
+    async def _campaign(self):
+        try:
+            token = cache.acquire_lock(self.name, int(self.lease_ttl * 1000))
+        except Exception as e:
+            logger.debug(f"Leader election for {self.name} failed: {e}")
+            return
+
+        if token:
+            self._token = token
+            self._renewed_at = time.monotonic()
+            logger.info(f"Elected leader for {self.name}")
+            try:
+                await self.on_elected()
+            except Exception as e:
+                logger.error(f"Error taking over {self.name}: {e}")
+
+    async def _renew(self):
+        try:
+            if cache.extend_lock(self.name, self._token, int(self.lease_ttl * 1000)):
+                self._renewed_at = time.monotonic()
+                return
+            await self._step_down("lease lost")
+        except Exception as e:
+            # Redis is unreachable; hold on only while our last lease is still valid
+            if time.monotonic() - self._renewed_at >= self.lease_ttl - self.renew_interval:
+                await self._step_down(f"cannot renew lease: {e}")
+
+    async def _step_down(self, reason: str):
+        self._token = None
+        logger.warning(f"Stepping down as {self.name} leader: {reason}")
+        try:
+            await self.on_demoted()
+        except Exception as e:
+            logger.error(f"Error handing off {self.name}: {e}")
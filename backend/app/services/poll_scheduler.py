@@ -0,0 +1,228 @@
+"""
+Volatility-adaptive polling scheduler for rate pairs
+"""
+
+import math
+import random
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+
+class ProviderBudget:
+    """Token bucket over a provider's per-minute quota"""
+
+    def __init__(self, rate_limit_per_minute: Optional[int], clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(rate_limit_per_minute) if rate_limit_per_minute else None
+        self.tokens = self.capacity
+        self.clock = clock
+        self._refilled_at = clock()
+
+    def _refill(self):
+        now = self.clock()
+        if self.capacity is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self._refilled_at) * self.capacity / 60.0)
+        self._refilled_at = now
+
+    def remaining(self) -> float:
+        """Fraction of the quota left, 1.0 for unlimited providers"""
+        if self.capacity is None:
+            return 1.0
+        self._refill()
+        return self.tokens / self.capacity
+
+    def available(self, cost: float = 0.0) -> bool:
+        """Check the provider can afford cost from its remaining quota"""
+        if self.capacity is None:
+            return True
+        self._refill()
+        return self.tokens >= cost
+
+    def spend(self, cost: float):
+        if self.capacity is not None:
+            self._refill()
+            self.tokens = max(0.0, self.tokens - cost)
+
+class PairState:
+    """Refresh cadence and recent volatility of one pair"""
+
+    __slots__ = ("pair", "rate_type", "provider", "next_due", "interval",
+                 "last_price", "last_seen", "variance", "hits", "hits_at", "subscribers")
+
+    def __init__(self, pair: str, rate_type: str, provider: Optional[str], now: float):
+        self.pair = pair
+        self.rate_type = rate_type
+        self.provider = provider
+        self.next_due = now
+        self.interval = float(settings.RATE_POLL_MAX_INTERVAL)
+        self.last_price: Optional[float] = None
+        self.last_seen = now
+        self.variance: Optional[float] = None  # EWMA of squared log return per second
+        self.hits = 0.0  # Exponentially decayed API reads
+        self.hits_at = now
+        self.subscribers = 0
+
+class PollScheduler:
+    """Gives every pair its own refresh cadence
+
+    A pair's interval is the time its price is expected to take to move
+    RATE_POLL_TARGET_MOVE_BPS, from an EWMA of its squared log returns,
+    shortened for pairs that clients read or subscribe to and stretched
+    when its primary provider is running low on quota. Every interval is
+    jittered so pairs drift apart instead of firing together.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.pairs: Dict[str, PairState] = {}
+        self.budgets: Dict[str, ProviderBudget] = {}
+        self.owned: Optional[Set[str]] = None  # None polls every pair; a set limits this worker to its shard
+        self.broad_subscribers = 0  # Subscribers watching every pair at once
+
+    def add_provider(self, name: str, rate_limit_per_minute: Optional[int]):
+        if name not in self.budgets:
+            self.budgets[name] = ProviderBudget(rate_limit_per_minute, self.clock)
+
+    def add_pair(self, pair: str, rate_type: str, provider: Optional[str] = None):
+        """Track a pair; it is due immediately. provider is its primary source"""
+        if pair not in self.pairs:
+            self.pairs[pair] = PairState(pair, rate_type, provider, self.clock())
+
+    def budget(self, provider: str) -> ProviderBudget:
+        if provider not in self.budgets:
+            self.budgets[provider] = ProviderBudget(None, self.clock)
+        return self.budgets[provider]
+
+    # Demand
+
+    def record_read(self, pair: str):
+        """Count an API read of pair towards its demand"""
+        state = self.pairs.get(pair)
+        if state:
+            state.hits = self._decayed_hits(state) + 1
+            state.hits_at = self.clock()
+
+    def set_subscribers(self, pair: str, count: int):
+        """Set how many live subscribers watch pair"""
+        state = self.pairs.get(pair)
+        if state:
+            state.subscribers = max(0, count)
+
+    def set_broad_subscribers(self, count: int):
+        """Set how many live subscribers watch every pair"""
+        self.broad_subscribers = max(0, count)
+
+    def _decayed_hits(self, state: PairState) -> float:
+        elapsed = self.clock() - state.hits_at
+        return state.hits * 0.5 ** (elapsed / settings.RATE_POLL_DEMAND_HALF_LIFE)
+
+    def demand(self, pair: str) -> float:
+        state = self.pairs.get(pair)
+        if not state:
+            return 0.0
+        return state.subscribers + self.broad_subscribers + self._decayed_hits(state)
+
+    # Scheduling
+
+    def set_owned(self, pairs: Optional[Iterable[str]]):
+        """Limit polling to pairs (None for all); newly owned pairs are due at once"""
+        previous = self.owned
+        self.owned = None if pairs is None else set(pairs)
+        if self.owned is None:
+            return
+
+        now = self.clock()
+        for pair in self.owned:
+            state = self.pairs.get(pair)
+            if state and (previous is None or pair not in previous):
+                state.next_due = now
+
+    def _polled_states(self) -> Iterable[PairState]:
+        if self.owned is None:
+            return self.pairs.values()
+        return (self.pairs[pair] for pair in self.owned if pair in self.pairs)
+
+    def due(self) -> Dict[str, List[str]]:
+        """Pairs whose refresh is due, grouped by rate type"""
+        now = self.clock()
+        grouped: Dict[str, List[str]] = {}
+        for state in self._polled_states():
+            if state.next_due <= now:
+                grouped.setdefault(state.rate_type, []).append(state.pair)
+        return grouped
+
+    def seconds_until_next(self) -> float:
+        """How long the polling loop can sleep before something is due"""
+        next_due = min((state.next_due for state in self._polled_states()), default=None)
+        if next_due is None:
+            return float(settings.RATE_POLL_MAX_INTERVAL)
+        return max(0.0, next_due - self.clock())
+
+    def interval_for(self, state: PairState) -> float:
+        """Unjittered refresh interval for a pair"""
+        min_interval = settings.RATE_POLL_MIN_INTERVAL
+        max_interval = settings.RATE_POLL_MAX_INTERVAL
+
+        if state.variance is None:
+            # No history yet; poll at the middle of the range until there is
+            interval = (min_interval + max_interval) / 2
+        elif state.variance <= 0:
+            interval = max_interval
+        else:
+            target = settings.RATE_POLL_TARGET_MOVE_BPS / 10_000
+            interval = target * target / state.variance
+
+        interval /= 1 + settings.RATE_POLL_DEMAND_WEIGHT * math.log1p(self.demand(state.pair))
+
+        if state.provider:
+            remaining = self.budget(state.provider).remaining()
+            if remaining < 0.5:
+                interval *= 0.5 / max(remaining, 0.05)
+
+        return min(max_interval, max(min_interval, interval))
+
+    def mark_polled(self, pairs: Iterable[str], rates: Dict[str, Dict]):
+        """Fold fetched prices into volatility and schedule the next poll
+
+        Pairs the providers did not return are retried sooner, at the
+        minimum interval, but still jittered.
+        """
+        now = self.clock()
+        jitter = settings.RATE_POLL_JITTER
+
+        for pair in pairs:
+            state = self.pairs.get(pair)
+            if not state:
+                continue
+
+            rate = rates.get(pair)
+            if rate and rate.get("price"):
+                self._observe(state, float(rate["price"]), now)
+                state.interval = self.interval_for(state)
+            else:
+                state.interval = float(settings.RATE_POLL_MIN_INTERVAL)
+
+            state.next_due = now + state.interval * random.uniform(1 - jitter, 1 + jitter)
+
+    def _observe(self, state: PairState, price: float, now: float):
+        if state.last_price and price > 0:
+            elapsed = max(now - state.last_seen, 1e-3)
+            sample = math.log(price / state.last_price) ** 2 / elapsed
+            alpha = settings.RATE_POLL_VOLATILITY_ALPHA
+            state.variance = sample if state.variance is None else alpha * sample + (1 - alpha) * state.variance
+        state.last_price = price
+        state.last_seen = now
+
+    def metadata(self) -> Dict:
+        """Current cadence of every pair, for health endpoints"""
+        now = self.clock()
+        return {
+            pair: {
+                "interval": round(state.interval, 2),
+                "due_in": round(max(0.0, state.next_due - now), 2),
+                "volatility": math.sqrt(state.variance) if state.variance else 0.0,
+                "demand": round(self.demand(pair), 2),
+                "provider": state.provider
+            }
+            for pair, state in self.pairs.items()
+        }
@@ -0,0 +1,84 @@
+"""
+Provider execution engine for concurrent, non-blocking upstream calls
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ProviderExecutor:
+    """Runs provider calls concurrently with per-provider caps and timeouts
+
+    Async calls on the shared HTTP client run directly; blocking SDK calls
+    (yfinance) are pushed onto a bounded thread pool so they never stall
+    the event loop.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        concurrency: Optional[Dict[str, int]] = None,
+        timeouts: Optional[Dict[str, float]] = None
+    ):
+        self.max_workers = max_workers or settings.RATE_PROVIDER_MAX_WORKERS
+        self.concurrency = concurrency or settings.RATE_PROVIDER_CONCURRENCY
+        self.timeouts = timeouts or settings.RATE_PROVIDER_TIMEOUTS
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Create the shared thread pool on first use"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="rate-provider"
+            )
+        return self._pool
+
+    def _get_semaphore(self, provider: str) -> asyncio.Semaphore:
+        """Get the concurrency cap for a provider"""
+        if provider not in self._semaphores:
+            limit = self.concurrency.get(provider, self.concurrency.get("default", 4))
+            self._semaphores[provider] = asyncio.Semaphore(limit)
+        return self._semaphores[provider]
+
+    def get_timeout(self, provider: str) -> float:
+        """Get the call timeout for a provider in seconds"""
+        return self.timeouts.get(provider, self.timeouts.get("default", 10.0))
+
+    async def run(self, provider: str, func: Callable, *args, **kwargs) -> Any:
+        """Run a single provider call, blocking or async, under its cap and timeout"""
+        timeout = self.get_timeout(provider)
+
+        async with self._get_semaphore(provider):
+            if asyncio.iscoroutinefunction(func):
+                return await asyncio.wait_for(func(*args, **kwargs), timeout)
+
+            loop = asyncio.get_running_loop()
+            call = functools.partial(func, *args, **kwargs)
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._get_pool(), call),
+                timeout
+            )
+
+    async def map(self, provider: str, func: Callable, items: Iterable) -> Dict[Any, Any]:
+        """Run func for every item at once; failures are returned, not raised"""
+        items = list(items)
+        results = await asyncio.gather(
+            *(self.run(provider, func, item) for item in items),
+            return_exceptions=True
+        )
+        return dict(zip(items, results))
+
+    def shutdown(self):
+        """Release the thread pool"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._semaphores.clear()
@@ -0,0 +1,124 @@
+"""
+Per-provider health tracking: circuit breakers and latency percentiles
+"""
+
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open trial -> closed
+
+    While open every call is refused. Once the reset timeout passes one
+    trial call is let through (half-open); success closes the breaker,
+    failure reopens it with the timeout doubled, up to a maximum.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        max_reset_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold or settings.RATE_BREAKER_FAILURE_THRESHOLD
+        self.base_reset_timeout = reset_timeout or settings.RATE_BREAKER_RESET_TIMEOUT
+        self.max_reset_timeout = max_reset_timeout or settings.RATE_BREAKER_RESET_MAX
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.reset_timeout = self.base_reset_timeout
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Check whether a call may go through; claims the half-open trial"""
+        if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            self._trial_in_flight = False
+
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release(self):
+        """Give back a half-open trial whose call was abandoned without a result"""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.reset_timeout = self.base_reset_timeout
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+            self._open()
+        elif self.state == CLOSED and self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self._trial_in_flight = False
+
+class ProviderHealth:
+    """Circuit breaker plus a sliding window of call latencies for one provider"""
+
+    def __init__(self, name: str, expected_latency_ms: float = 0.0, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.expected_latency_ms = expected_latency_ms
+        self.breaker = CircuitBreaker(clock=clock)
+        self.latencies = deque(maxlen=settings.RATE_LATENCY_WINDOW)  # seconds
+        self.successes = 0
+        self.errors = 0
+
+    def record(self, ok: bool, latency: float):
+        self.latencies.append(latency)
+        if ok:
+            self.successes += 1
+            self.breaker.record_success()
+        else:
+            self.errors += 1
+            self.breaker.record_failure()
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile in seconds over the window, None without samples"""
+        if not self.latencies:
+            return None
+        return float(np.percentile(np.fromiter(self.latencies, dtype=float), q))
+
+    def hedge_delay(self) -> float:
+        """How long to wait on this provider before hedging to the next one
+
+        Until the window holds enough samples, twice the provider's
+        expected latency stands in for the percentile.
+        """
+        if len(self.latencies) >= settings.RATE_HEDGE_MIN_SAMPLES:
+            return self.percentile(settings.RATE_HEDGE_PERCENTILE)
+        return 2 * self.expected_latency_ms / 1000 if self.expected_latency_ms else settings.RATE_HEDGE_DEFAULT_DELAY
+
+    def metadata(self) -> Dict:
+        p50, p95, p99 = (self.percentile(q) for q in (50, 95, 99))
+        to_ms = lambda value: None if value is None else round(value * 1000, 1)
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "successes": self.successes,
+            "errors": self.errors,
+            "latency_ms": {"p50": to_ms(p50), "p95": to_ms(p95), "p99": to_ms(p99)},
+            "hedge_delay_ms": to_ms(self.hedge_delay())
+        }
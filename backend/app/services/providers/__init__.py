@@ -0,0 +1,49 @@
+"""
+Pluggable upstream rate providers
+"""
+
+from typing import List, Type
+
+from app.core.config import settings
+from .base import RateProvider
+from .simulator import SimulatorProvider, SimulatedProviderError
+
+def _load_alpha_vantage() -> Type[RateProvider]:
+    from .alpha_vantage import AlphaVantageProvider
+    return AlphaVantageProvider
+
+def _load_yahoo_finance() -> Type[RateProvider]:
+    from .yahoo_finance import YahooFinanceProvider
+    return YahooFinanceProvider
+
+def _load_binance() -> Type[RateProvider]:
+    from .binance import BinanceProvider
+    return BinanceProvider
+
+# SDK-backed providers are imported lazily so the simulator works on a bare install
+PROVIDER_REGISTRY = {
+    "alpha_vantage": _load_alpha_vantage,
+    "yahoo_finance": _load_yahoo_finance,
+    "binance": _load_binance,
+    "simulator": lambda: SimulatorProvider
+}
+
+def build_provider(name: str, pairs: List[str], executor=None) -> RateProvider:
+    """Instantiate a provider by its registry name"""
+    if name not in PROVIDER_REGISTRY:
+        raise ValueError(f"Unknown rate provider: {name}")
+
+    provider_class = PROVIDER_REGISTRY[name]()
+    if provider_class is SimulatorProvider:
+        return SimulatorProvider(pairs, executor, **settings.RATE_SIMULATOR)
+    return provider_class(pairs, executor)
+
+def build_providers(names: List[str], pairs: List[str], executor=None) -> List[RateProvider]:
+    """Instantiate an ordered provider chain"""
+    return [build_provider(name, pairs, executor) for name in names]
+
+__all__ = [
+    'RateProvider',
+    'SimulatorProvider', 'SimulatedProviderError',
+    'PROVIDER_REGISTRY', 'build_provider', 'build_providers'
+]
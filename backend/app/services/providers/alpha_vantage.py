@@ -0,0 +1,53 @@
+"""
+Alpha Vantage forex provider
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+from app.services.http_client import http_client
+from app.services.providers.base import RateProvider
+
+class AlphaVantageProvider(RateProvider):
+    """Forex rates from Alpha Vantage, one request per pair"""
+
+    name = "alpha_vantage"
+    expected_latency_ms = 400.0
+    cost_per_request = 1.0
+    rate_limit_per_minute = 5  # Free tier
+    supports_batch = False  # CURRENCY_EXCHANGE_RATE only takes one pair
+
+    def hosts(self) -> List[str]:
+        return [urlsplit(settings.ALPHA_VANTAGE_URL).hostname]
+
+    async def fetch_rates(self, pairs: List[str]) -> Dict[str, Dict]:
+        rates = {}
+        results = await self.executor.map(self.name, self._fetch_rate, pairs)
+        self._collect(results, rates)
+        return rates
+
+    async def _fetch_rate(self, pair: str) -> Optional[Dict]:
+        """Fetch a single pair over the shared connection pool"""
+        from_currency, to_currency = pair.split("/")
+        data = await http_client.get_json(settings.ALPHA_VANTAGE_URL, params={
+            "function": "CURRENCY_EXCHANGE_RATE",
+            "from_currency": from_currency,
+            "to_currency": to_currency,
+            "apikey": settings.ALPHA_VANTAGE_API_KEY
+        })
+
+        quote = data.get("Realtime Currency Exchange Rate") if isinstance(data, dict) else None
+        if quote:
+            rate = float(quote.get("5. Exchange Rate", 0))
+            if rate > 0:
+                bid = float(quote.get("8. Bid Price") or 0)
+                ask = float(quote.get("9. Ask Price") or 0)
+                return {
+                    "price": rate,
+                    "bid": bid or rate * 0.9995,  # Simulated when the feed has no quote
+                    "ask": ask or rate * 1.0005,
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+        return None
@@ -0,0 +1,63 @@
+"""
+Base rate provider interface
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class RateProvider:
+    """Base class for an upstream rate source
+
+    Subclasses implement fetch_rates, which takes a batch of pair keys
+    like "USD/EUR" and returns whatever it could fetch, keyed by pair,
+    in our rate format (price, bid, ask, timestamp, ...).
+    """
+
+    name: str = "base"
+    expected_latency_ms: float = 0.0  # Typical round trip for one batch call
+    cost_per_request: float = 0.0  # Upstream quota units spent per request
+    rate_limit_per_minute: Optional[int] = None  # Upstream request budget
+    supports_batch: bool = False  # True if one request covers many pairs
+
+    def __init__(self, pairs: List[str], executor=None):
+        self.pairs = list(pairs)
+        self.executor = executor
+
+    def supports(self, pair: str) -> bool:
+        """Check whether this provider quotes a pair"""
+        return pair in self.pairs
+
+    def request_cost(self, pairs: List[str]) -> float:
+        """Estimate quota spent fetching pairs in one fetch_rates call"""
+        if self.supports_batch:
+            return self.cost_per_request
+        return self.cost_per_request * len(pairs)
+
+    async def fetch_rates(self, pairs: List[str]) -> Dict[str, Dict]:
+        """Fetch rates for pairs; missing pairs are simply left out"""
+        raise NotImplementedError
+
+    def hosts(self) -> List[str]:
+        """Upstream hosts this provider calls through the shared HTTP client"""
+        return []
+
+    def metadata(self) -> Dict:
+        """Describe the provider for health and benchmarking endpoints"""
+        return {
+            "name": self.name,
+            "pairs": self.pairs,
+            "supports_batch": self.supports_batch,
+            "expected_latency_ms": self.expected_latency_ms,
+            "cost_per_request": self.cost_per_request,
+            "rate_limit_per_minute": self.rate_limit_per_minute
+        }
+
+    def _collect(self, results: Dict, rates: Dict):
+        """Merge executor.map results into rates, logging failed pairs"""
+        for pair, result in results.items():
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to fetch {pair} from {self.name}: {result!r}")
+            elif result:
+                rates[pair] = result
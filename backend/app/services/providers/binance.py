@@ -0,0 +1,147 @@
+"""
+Binance crypto provider (REST market-data API)
+"""
+
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.services.http_client import http_client
+from app.services.providers.base import RateProvider
+
+logger = logging.getLogger(__name__)
+
+class BinanceProvider(RateProvider):
+    """Crypto rates from Binance via a multi-symbol ticker call
+
+    Binance rejects a whole multi-symbol request if any symbol in it is
+    not listed, so pairs are filtered against the exchangeInfo symbol
+    list (refreshed every RATE_EXCHANGE_INFO_TTL) and against symbols it
+    has already rejected before they go into the batch.
+    """
+
+    name = "binance"
+    expected_latency_ms = 250.0
+    cost_per_request = 40.0  # Request weight of an all-symbol ticker call
+    rate_limit_per_minute = 1200  # Request weight budget
+    supports_batch = True
+
+    def __init__(self, pairs: List[str], executor=None):
+        super().__init__(pairs, executor)
+        self._listed: Optional[Set[str]] = None
+        self._listed_at = 0.0
+        self._rejected: Set[str] = set()
+
+    def hosts(self) -> List[str]:
+        return [urlsplit(settings.BINANCE_API_URL).hostname]
+
+    @staticmethod
+    def symbol_for(pair: str) -> str:
+        """Map a pair key like BTC/USD to its Binance symbol"""
+        return settings.RATE_EXCHANGE_SYMBOLS.get(pair, pair.replace("/", "")).upper()
+
+    def supports(self, pair: str) -> bool:
+        if pair not in self.pairs:
+            return False
+        symbol = self.symbol_for(pair)
+        if symbol in self._rejected:
+            return False
+        return self._listed is None or symbol in self._listed
+
+    async def _refresh_listing(self):
+        """Reload the set of trading symbols once it is older than RATE_EXCHANGE_INFO_TTL"""
+        if self._listed is not None and time.monotonic() - self._listed_at < settings.RATE_EXCHANGE_INFO_TTL:
+            return
+        try:
+            info = await self.executor.run(
+                self.name, http_client.get_json, f"{settings.BINANCE_API_URL}/api/v3/exchangeInfo"
+            )
+        except Exception as e:
+            # Keep the previous listing (or none); rejected symbols still filter the batch
+            logger.warning(f"Could not load Binance exchangeInfo: {e!r}")
+            return
+
+        self._listed = {entry["symbol"] for entry in info["symbols"] if entry.get("status") == "TRADING"}
+        self._listed_at = time.monotonic()
+        # A fresh listing supersedes what we learned from rejections
+        self._rejected.clear()
+
+        unlisted = [pair for pair in self.pairs if self.symbol_for(pair) not in self._listed]
+        if unlisted:
+            logger.warning(f"Not listed on Binance, skipping: {', '.join(unlisted)}")
+
+    async def fetch_rates(self, pairs: List[str]) -> Dict[str, Dict]:
+        rates = {}
+
+        await self._refresh_listing()
+        pairs = [pair for pair in pairs if self.supports(pair)]
+        if not pairs:
+            return rates
+
+        # One multi-symbol ticker call for every pair
+        if settings.RATE_BATCH_FETCH:
+            try:
+                rates = await self.executor.run(self.name, self._fetch_tickers, pairs)
+            except Exception as e:
+                logger.warning(f"Binance batch ticker call failed, falling back to per-pair: {e!r}")
+
+        # Fetch whatever the batch call missed, all pairs at once
+        missing = [pair for pair in pairs if pair not in rates]
+        if missing:
+            results = await self.executor.map(self.name, self._fetch_ticker, missing)
+            self._collect(results, rates)
+
+        return rates
+
+    async def _fetch_tickers(self, pairs: List[str]) -> Dict:
+        """Fetch many tickers with a single call"""
+        symbols = {self.symbol_for(pair): pair for pair in pairs}
+        tickers = await http_client.get_json(
+            f"{settings.BINANCE_API_URL}/api/v3/ticker/24hr",
+            params={"symbols": json.dumps(list(symbols), separators=(",", ":"))}
+        )
+
+        rates = {}
+        for ticker in tickers:
+            pair = symbols.get(ticker.get("symbol"))
+            if pair:
+                rates[pair] = self.normalize_ticker(ticker)
+        return rates
+
+    async def _fetch_ticker(self, pair: str) -> Optional[Dict]:
+        """Fetch a single ticker"""
+        try:
+            ticker = await http_client.get_json(
+                f"{settings.BINANCE_API_URL}/api/v3/ticker/24hr",
+                params={"symbol": self.symbol_for(pair)}
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 400:
+                logger.warning(f"{pair} is not listed on Binance")
+                self._rejected.add(self.symbol_for(pair))
+                return None
+            raise
+
+        if ticker:
+            return self.normalize_ticker(ticker)
+        return None
+
+    @staticmethod
+    def normalize_ticker(ticker: Dict) -> Dict:
+        """Convert a Binance 24hr ticker into our rate format"""
+        return {
+            "price": float(ticker["lastPrice"]),
+            "bid": float(ticker["bidPrice"]),
+            "ask": float(ticker["askPrice"]),
+            "volume_24h": float(ticker["quoteVolume"]),
+            "change_24h": float(ticker["priceChangePercent"]),
+            "high_24h": float(ticker["highPrice"]),
+            "low_24h": float(ticker["lowPrice"]),
+            "timestamp": datetime.utcnow().isoformat()
+        }
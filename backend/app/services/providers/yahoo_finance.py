@@ -0,0 +1,99 @@
+"""
+Yahoo Finance forex provider
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+import yfinance as yf
+
+from app.core.config import settings
+from app.services.providers.base import RateProvider
+
+logger = logging.getLogger(__name__)
+
+class YahooFinanceProvider(RateProvider):
+    """Forex rates from Yahoo Finance via a multi-ticker quote download"""
+
+    name = "yahoo_finance"
+    expected_latency_ms = 800.0
+    cost_per_request = 1.0
+    rate_limit_per_minute = 60
+    supports_batch = True
+
+    async def fetch_rates(self, pairs: List[str]) -> Dict[str, Dict]:
+        rates = {}
+        missing = list(pairs)
+
+        # One multi-ticker download for every requested pair
+        if settings.RATE_BATCH_FETCH:
+            try:
+                rates = await self.executor.run(self.name, self._fetch_batch, missing)
+                missing = [pair for pair in missing if pair not in rates]
+            except Exception as e:
+                logger.warning(f"Yahoo Finance batch download failed, falling back to per-pair: {e!r}")
+
+        if missing:
+            results = await self.executor.map(self.name, self._fetch_rate, missing)
+            self._collect(results, rates)
+
+        return rates
+
+    @staticmethod
+    def symbol_for(pair: str) -> str:
+        """Map a pair key like USD/EUR to a Yahoo ticker like USDEUR=X"""
+        return pair.replace("/", "") + "=X"
+
+    def _fetch_batch(self, pairs: List[str]) -> Dict:
+        """Fetch many pairs with a single Yahoo quote download (blocking)"""
+        symbols = {self.symbol_for(pair): pair for pair in pairs}
+        data = yf.download(
+            tickers=" ".join(symbols),
+            period="1d",
+            interval="1m",
+            group_by="ticker",
+            progress=False,
+            threads=False
+        )
+
+        rates = {}
+        if data is None or data.empty:
+            return rates
+
+        timestamp = datetime.utcnow().isoformat()
+        for symbol, pair in symbols.items():
+            try:
+                # Single-ticker downloads come back without the ticker column level
+                frame = data[symbol] if len(symbols) > 1 else data
+                closes = frame["Close"].dropna()
+            except KeyError:
+                continue
+
+            if closes.empty:
+                continue
+
+            price = float(closes.iloc[-1])
+            if price > 0:
+                rates[pair] = {
+                    "price": price,
+                    "bid": price * 0.9995,
+                    "ask": price * 1.0005,
+                    "timestamp": timestamp
+                }
+
+        return rates
+
+    def _fetch_rate(self, pair: str) -> Optional[Dict]:
+        """Fetch a single pair (blocking, runs in the executor pool)"""
+        ticker = yf.Ticker(self.symbol_for(pair))
+        info = ticker.info
+
+        if "regularMarketPrice" in info:
+            price = info["regularMarketPrice"]
+            return {
+                "price": price,
+                "bid": price * 0.9995,
+                "ask": price * 1.0005,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        return None
@@ -3,58 +3,235 @@ Rate Aggregator Service for fetching real-time forex rates
 """
 
 import asyncio
-import httpx
 import json
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-import yfinance as yf
-from alpha_vantage.foreignexchange import ForeignExchange
-import ccxt
-from decimal import Decimal
+import math
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Tuple
 
 from app.core.config import settings
-from app.core.database import cache, SessionLocal
-# from app.models.models import PriceHistory  # Commented to avoid conflicts
+from app.core.database import cache
+from app.services.provider_executor import ProviderExecutor
+from app.services.providers import RateProvider, SimulatorProvider, build_providers
+from app.services import rate_store
+from app.services.consensus import ConsensusEngine
+from app.services.cross_rates import CrossRateMatrix
+from app.services.http_client import http_client
+from app.services.downsampling import downsample_rows, lttb_indices, minmax_indices
+from app.services.event_bus import RATES_CHANGED, event_bus
+from app.services.feed_replay import FeedRecorder
+from app.services.hash_ring import HashRing
+from app.services.leader_election import LeaderElection
+from app.services.poll_scheduler import PollScheduler
+from app.services.provider_health import ProviderHealth
+from app.services.rate_snapshot import RateSnapshot, RateSnapshotStore
+from app.services.rate_stream import TickerStream
+from app.services.shard_membership import ShardMembership
+from app.services.single_flight import SingleFlight
+from app.services.tick_store import TickStore
 
 logger = logging.getLogger(__name__)
 
+RATE_TYPES = ("forex", "crypto")
+
+def load_pair_universe() -> Dict[str, List[str]]:
+    """Configured pairs per rate type, plus any listed in RATE_PAIR_UNIVERSE_FILE"""
+    universe = {
+        "forex": list(settings.RATE_FOREX_PAIRS),
+        "crypto": list(settings.RATE_CRYPTO_PAIRS)
+    }
+    if settings.RATE_PAIR_UNIVERSE_FILE:
+        with open(settings.RATE_PAIR_UNIVERSE_FILE) as f:
+            extra = json.load(f)
+        for rate_type in RATE_TYPES:
+            universe[rate_type].extend(extra.get(rate_type, []))
+
+    # Drop duplicates, keeping the first occurrence
+    return {rate_type: list(dict.fromkeys(pairs)) for rate_type, pairs in universe.items()}
+
 class RateAggregatorService:
     """Service for aggregating forex and crypto rates from multiple sources"""
     
     def __init__(self):
         self.is_running = False
-        self.update_interval = 60  # seconds
-        self.forex_pairs = [
-            "USD/EUR", "USD/JPY", "USD/GBP", "USD/CHF", "USD/CAD",
-            "EUR/JPY", "EUR/GBP", "GBP/JPY", "AUD/USD", "NZD/USD"
-        ]
-        self.crypto_pairs = ["BTC/USD", "ETH/USD", "USDC/USD", "USDT/USD"]
+        universe = load_pair_universe()
+        self.forex_pairs = universe["forex"]
+        self.crypto_pairs = universe["crypto"]
+        self._pair_types = {pair: "forex" for pair in self.forex_pairs}
+        self._pair_types.update((pair, "crypto") for pair in self.crypto_pairs)
+        
+        # Concurrent fan-out engine for provider calls
+        self.executor = ProviderExecutor()
+        
+        # Coalesces concurrent cache-miss refreshes
+        self.single_flight = SingleFlight()
+        self._background_tasks = set()
+        
+        # In-process L1 snapshot of every rate, synced across workers
+        self.snapshots = RateSnapshotStore(RATE_TYPES)
+        
+        # Every price change, local or from another worker, goes out on the event bus
+        self.snapshots.on_change = self._publish_changes
+        
+        # Buffered writer for tick history
+        self.tick_store: Optional[TickStore] = TickStore() if settings.TICK_STORE_ENABLED else None
+        
+        # Provider chains, tried in order; later providers only fill gaps
+        self.forex_providers = build_providers(
+            settings.RATE_PROVIDERS["forex"], self.forex_pairs, self.executor
+        )
+        self.crypto_providers = build_providers(
+            settings.RATE_PROVIDERS["crypto"], self.crypto_pairs, self.executor
+        )
         
-        # Initialize API clients
-        self.alpha_vantage = ForeignExchange(key=settings.ALPHA_VANTAGE_API_KEY)
-        self.ccxt_exchange = ccxt.binance()  # Using Binance for crypto rates
+        # Offline fallback when every provider in a chain comes back empty
+        self.fallback_provider: Optional[RateProvider] = None
+        if settings.RATE_SIMULATOR_FALLBACK:
+            self.fallback_provider = SimulatorProvider(
+                self.forex_pairs + self.crypto_pairs, **settings.RATE_SIMULATOR
+            )
         
-    async def start(self):
-        """Start the rate aggregator service"""
+        # Circuit breaker and latency window per provider
+        self.provider_health: Dict[str, ProviderHealth] = {
+            provider.name: ProviderHealth(provider.name, provider.expected_latency_ms)
+            for provider in self.forex_providers + self.crypto_providers
+        }
+        
+        # Combines quotes from every provider into one robust price per pair
+        self.consensus = ConsensusEngine()
+        
+        # Per-pair refresh cadence driven by volatility, demand and quota
+        self.scheduler = PollScheduler()
+        for rate_type, pairs, providers in (
+            ("forex", self.forex_pairs, self.forex_providers),
+            ("crypto", self.crypto_pairs, self.crypto_providers)
+        ):
+            for provider in providers:
+                self.scheduler.add_provider(provider.name, provider.rate_limit_per_minute)
+            for pair in pairs:
+                primary = next((p.name for p in providers if p.supports(pair)), None)
+                self.scheduler.add_pair(pair, rate_type, primary)
+        
+        # Exchange ticker push feed; polling covers whatever it does not stream
+        self.stream: Optional[TickerStream] = None
+        if settings.RATE_STREAM_ENABLED:
+            self.stream = TickerStream(self.ingest_streamed_rates)
+        
+        # Who polls: one elected leader, or every member of the sharded ingest pool
+        self.leader: Optional[LeaderElection] = None
+        self.shards: Optional[ShardMembership] = None
+        if settings.RATE_INGEST_MODE == "sharded":
+            self.shards = ShardMembership("rate-ingest", self._rebalance)
+        elif settings.RATE_LEADER_ELECTION:
+            self.leader = LeaderElection("rate-aggregator", self._start_ingest, self._stop_ingest)
+        self.ingesting = False
+        self._update_task: Optional[asyncio.Task] = None
+        
+        # Captures raw provider answers and streamed tickers for replay
+        self.recorder: Optional[FeedRecorder] = None
+        
+    async def start(self, ingest: Optional[bool] = None):
+        """Start the rate aggregator service
+        
+        With ingest False (default: RATE_INGEST_IN_API) this process only
+        reads the shared snapshot and leaves polling to other processes.
+        """
         self.is_running = True
         logger.info("Starting Rate Aggregator Service...")
-        asyncio.create_task(self._update_loop())
+        self.snapshots.start_listener()
+        if self.tick_store:
+            await self.tick_store.start()
+        if settings.RATE_RECORD_FILE:
+            self.recorder = FeedRecorder(settings.RATE_RECORD_FILE.format(pid=os.getpid()))
+        
+        if not (settings.RATE_INGEST_IN_API if ingest is None else ingest):
+            return
+        if self.shards:
+            await self.shards.start()
+        elif self.leader:
+            await self.leader.start()
+        else:
+            await self._start_ingest()
     
     async def stop(self):
         """Stop the rate aggregator service"""
         self.is_running = False
+        if self.shards:
+            await self.shards.stop()
+        if self.leader:
+            await self.leader.stop()
+        await self._stop_ingest()
+        self.snapshots.stop_listener()
+        if self.tick_store:
+            await self.tick_store.stop()
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+        self.executor.shutdown()
+        await http_client.aclose()
         logger.info("Stopping Rate Aggregator Service...")
     
+    @staticmethod
+    def _publish_changes(rate_type: str, rates: Dict):
+        event_bus.publish(RATES_CHANGED, {"rate_type": rate_type, "rates": rates})
+    
+    async def _start_ingest(self, stream: bool = True):
+        """Start polling (and streaming); runs when this process becomes leader"""
+        self.ingesting = True
+        if stream and self.stream and not self.stream.is_running:
+            await self.stream.start()
+        if self._update_task is None:
+            self._update_task = asyncio.create_task(self._update_loop())
+    
+    async def _stop_ingest(self):
+        """Stop polling and streaming; runs when this process loses leadership"""
+        self.ingesting = False
+        if self._update_task:
+            self._update_task.cancel()
+            await asyncio.gather(self._update_task, return_exceptions=True)
+            self._update_task = None
+        if self.stream and self.stream.is_running:
+            await self.stream.stop()
+    
+    async def _rebalance(self, ring: HashRing):
+        """Poll only the pairs the ring gives this worker; runs when the pool changes"""
+        owned = [pair for pair in self._pair_types if self.shards.owns(pair)]
+        self.scheduler.set_owned(owned)
+        logger.info(f"Ingest shard owns {len(owned)}/{len(self._pair_types)} pairs")
+        
+        # One connection streams every symbol, so a single member owns it
+        owns_stream = self.shards.owns("stream")
+        if self.stream and self.stream.is_running and not owns_stream:
+            await self.stream.stop()
+        await self._start_ingest(stream=owns_stream)
+    
     async def _update_loop(self):
-        """Main update loop"""
+        """Main update loop: refresh whichever pairs the scheduler says are due"""
         while self.is_running:
             try:
-                await self.update_all_rates()
-                await asyncio.sleep(self.update_interval)
+                due = self.scheduler.due()
+                if due:
+                    await asyncio.gather(
+                        *(self.update_pairs(rate_type, pairs) for rate_type, pairs in due.items()),
+                        return_exceptions=True
+                    )
             except Exception as e:
                 logger.error(f"Error in rate update loop: {e}")
-                await asyncio.sleep(30)  # Wait before retry
+            
+            await asyncio.sleep(max(self.scheduler.seconds_until_next(), settings.RATE_POLL_MIN_INTERVAL / 10))
+    
+    async def update_pairs(self, rate_type: str, pairs: List[str]):
+        """Refresh a subset of one rate type and reschedule those pairs"""
+        rates = {}
+        try:
+            rates = await self.refresh_rates(rate_type, pairs=pairs)
+            logger.debug(f"Updated {len(rates)}/{len(pairs)} {rate_type} rates")
+        except Exception as e:
+            logger.error(f"Error updating {rate_type} rates: {e}")
+        finally:
+            self.scheduler.mark_polled(pairs, rates)
     
     async def update_all_rates(self):
         """Update all forex and crypto rates"""
@@ -67,8 +244,7 @@ class RateAggregatorService:
     async def update_forex_rates(self):
         """Fetch and update forex rates"""
         try:
-            rates = await self.fetch_forex_rates()
-            await self.store_rates(rates, "forex")
+            rates = await self.refresh_rates("forex")
             logger.info(f"Updated {len(rates)} forex rates")
         except Exception as e:
             logger.error(f"Error updating forex rates: {e}")
@@ -76,272 +252,657 @@ class RateAggregatorService:
     async def update_crypto_rates(self):
         """Fetch and update crypto rates"""
         try:
-            rates = await self.fetch_crypto_rates()
-            await self.store_rates(rates, "crypto")
+            rates = await self.refresh_rates("crypto")
             logger.info(f"Updated {len(rates)} crypto rates")
         except Exception as e:
             logger.error(f"Error updating crypto rates: {e}")
     
-    async def fetch_forex_rates(self) -> Dict:
-        """Fetch forex rates from multiple sources"""
-        rates = {}
+    async def ingest_streamed_rates(self, rates: Dict):
+        """Store a batch of pushed tickers and hold off polling those pairs
         
-        # Try Alpha Vantage first
-        for pair in self.forex_pairs:
-            try:
-                from_currency, to_currency = pair.split("/")
-                data, _ = self.alpha_vantage.get_currency_exchange_rate(
-                    from_currency=from_currency,
-                    to_currency=to_currency
-                )
-                
-                if data:
-                    rate = float(data.get("5. Exchange Rate", 0))
-                    if rate > 0:
-                        rates[pair] = {
-                            "price": rate,
-                            "bid": rate * 0.9995,  # Simulated bid
-                            "ask": rate * 1.0005,  # Simulated ask
-                            "timestamp": datetime.utcnow().isoformat()
-                        }
-            except Exception as e:
-                logger.warning(f"Failed to fetch {pair} from Alpha Vantage: {e}")
+        Streamed pairs are rescheduled as if they had just been polled,
+        so the poller only picks them up again once the stream goes quiet.
+        """
+        if self.recorder:
+            self.recorder.record_stream(rates)
+        await self.store_rates(rates, "crypto")
+        self.scheduler.mark_polled(rates.keys(), rates)
+    
+    async def ingest_quotes(self, quotes: Dict[str, Dict]) -> Dict:
+        """Combine and store one polling cycle of {source: {pair: rate}}
         
-        # Fallback to Yahoo Finance
-        if len(rates) < len(self.forex_pairs):
-            await self._fetch_yahoo_finance_rates(rates)
+        Used to replay recorded cycles: quotes are combined the way the
+        live fetch path would, then stored under each pair's rate type.
+        """
+        if settings.RATE_CONSENSUS_ENABLED and len(quotes) > 1:
+            rates = self.consensus.combine(quotes)
+        else:
+            rates = {}
+            for fetched in quotes.values():
+                for pair, rate in fetched.items():
+                    rates.setdefault(pair, rate)
+        
+        rates_by_type: Dict[str, Dict] = {}
+        for pair, rate in rates.items():
+            rates_by_type.setdefault(self._rate_type_for(pair), {})[pair] = rate
+        for rate_type, typed_rates in rates_by_type.items():
+            await self.store_rates(typed_rates, rate_type)
+        
+        return rates
+    
+    async def refresh_rates(
+        self,
+        rate_type: str,
+        reuse_fresh: bool = False,
+        pairs: Optional[List[str]] = None
+    ) -> Dict:
+        """Fetch and store one rate type, coalescing concurrent refreshes
+        
+        Callers in this process share one in-flight fetch per rate type
+        (or per pair subset), and a Redis lock makes sure only one worker
+        process hits the providers for it at a time. With reuse_fresh,
+        data another worker stored within the soft TTL is adopted instead
+        of refetched. pairs limits the fetch to a subset of the type.
+        """
+        key = f"rates:{rate_type}"
+        if pairs is not None:
+            key += ":" + ",".join(sorted(pairs))
+        return await self.single_flight.do(
+            key, self._refresh_rates_locked, rate_type, reuse_fresh, pairs
+        )
+    
+    async def _refresh_rates_locked(
+        self,
+        rate_type: str,
+        reuse_fresh: bool = False,
+        pairs: Optional[List[str]] = None
+    ) -> Dict:
+        """Refresh a rate type under the cross-worker refresh lock
+        
+        Scheduled pair refreshes skip the lock: only the process that owns
+        those pairs (the leader, or their shard) polls them.
+        """
+        if pairs is not None:
+            rates = await self._fetch_rates(rate_type, pairs)
+            await self.store_rates(rates, rate_type)
+            return rates
+        
+        if reuse_fresh:
+            envelope = self._read_fresh_envelope(rate_type)
+            if envelope:
+                self._adopt_envelope(rate_type, envelope)
+                return envelope["data"]
+        
+        lock_name = f"refresh:{rate_type}"
+        token = cache.acquire_lock(lock_name, settings.RATE_REFRESH_LOCK_TTL * 1000)
+        
+        if token is None:
+            # Another worker is already refreshing; wait for it to publish
+            envelope = await self._wait_for_cached_rates(rate_type)
+            if envelope:
+                self._adopt_envelope(rate_type, envelope)
+                return envelope["data"]
+            logger.warning(f"Timed out waiting for {rate_type} refresh by another worker")
+        
+        try:
+            rates = await self._fetch_rates(rate_type)
+            await self.store_rates(rates, rate_type)
+            return rates
+        finally:
+            if token:
+                cache.release_lock(lock_name, token)
+    
+    def _adopt_envelope(self, rate_type: str, envelope: Dict):
+        """Swap a rate type read from Redis into the snapshot, keeping each pair's own age"""
+        self.snapshots.publish(
+            rate_type,
+            envelope["data"],
+            envelope["stored_at"],
+            announce=False,
+            pair_stored_at=envelope.get("pair_stored_at")
+        )
+    
+    async def _wait_for_cached_rates(self, rate_type: str) -> Optional[Dict]:
+        """Poll the cache until another worker stores rate_type or the lock TTL passes"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.RATE_REFRESH_LOCK_TTL
+        
+        while loop.time() < deadline:
+            envelope = self._read_fresh_envelope(rate_type)
+            if envelope:
+                return envelope
+            await asyncio.sleep(settings.RATE_REFRESH_POLL_INTERVAL)
+        
+        return None
+    
+    def _read_fresh_envelope(self, rate_type: str) -> Optional[Dict]:
+        """Read rates:{rate_type} from Redis if it is within the soft TTL"""
+        envelope = self._read_envelope(rate_type)
+        if envelope and time.time() - envelope["stored_at"] <= settings.RATE_CACHE_SOFT_TTL:
+            return envelope
+        return None
+    
+    def _rate_type_for(self, pair: str) -> str:
+        """Work out whether a pair is served by the forex or crypto chain"""
+        if pair in self._pair_types:
+            return self._pair_types[pair]
+        if "/" in pair and pair.split("/")[1] in ["USD", "EUR", "JPY", "GBP"]:
+            return "forex"
+        return "crypto"
+    
+    async def _fetch_rates(self, rate_type: str, pairs: Optional[List[str]] = None) -> Dict:
+        if rate_type == "forex":
+            return await self.fetch_forex_rates(pairs)
+        return await self.fetch_crypto_rates(pairs)
+    
+    async def fetch_forex_rates(self, pairs: Optional[List[str]] = None) -> Dict:
+        """Fetch forex rates from multiple sources"""
+        pairs = pairs or self.forex_pairs
+        rates = await self._fetch_from_providers(self.forex_providers, pairs)
         
         # Fallback to simulated rates for demo
-        if len(rates) == 0:
-            rates = self._generate_demo_forex_rates()
+        if len(rates) == 0 and self.fallback_provider:
+            rates = await self.fallback_provider.fetch_rates(pairs)
         
         return rates
     
-    async def _fetch_yahoo_finance_rates(self, rates: Dict):
-        """Fetch rates from Yahoo Finance"""
-        for pair in self.forex_pairs:
-            if pair not in rates:
-                try:
-                    yahoo_symbol = pair.replace("/", "") + "=X"
-                    ticker = yf.Ticker(yahoo_symbol)
-                    info = ticker.info
-                    
-                    if "regularMarketPrice" in info:
-                        price = info["regularMarketPrice"]
-                        rates[pair] = {
-                            "price": price,
-                            "bid": price * 0.9995,
-                            "ask": price * 1.0005,
-                            "timestamp": datetime.utcnow().isoformat()
-                        }
-                except Exception as e:
-                    logger.warning(f"Failed to fetch {pair} from Yahoo Finance: {e}")
-    
-    def _generate_demo_forex_rates(self) -> Dict:
-        """Generate demo forex rates for testing"""
-        base_rates = {
-            "USD/EUR": 0.92,
-            "USD/JPY": 149.50,
-            "USD/GBP": 0.79,
-            "USD/CHF": 0.88,
-            "USD/CAD": 1.36,
-            "EUR/JPY": 162.50,
-            "EUR/GBP": 0.86,
-            "GBP/JPY": 189.00,
-            "AUD/USD": 0.65,
-            "NZD/USD": 0.59
-        }
+    async def fetch_crypto_rates(self, pairs: Optional[List[str]] = None) -> Dict:
+        """Fetch crypto rates from exchanges"""
+        pairs = pairs or self.crypto_pairs
+        rates = await self._fetch_from_providers(self.crypto_providers, pairs)
+        
+        if not rates and self.fallback_provider:
+            logger.error("Error fetching crypto rates: no exchange data available")
+            # Use simulated rates as fallback
+            rates = await self.fallback_provider.fetch_rates(pairs)
+        
+        return rates
+    
+    async def _fetch_from_providers(self, providers: List[RateProvider], pairs: List[str]) -> Dict:
+        """Walk the provider chain, asking each one only for pairs still missing
+        
+        Providers whose circuit is open or that cannot afford the request
+        from their remaining quota are skipped. With hedging on, a provider
+        that runs past its latency percentile is raced against the next
+        usable one and the first non-empty answer wins. With consensus on,
+        every provider is asked at once instead and the quotes are
+        combined; hedging never runs there, since no provider is waited
+        on before the others are asked.
+        """
+        if settings.RATE_CONSENSUS_ENABLED and len(providers) > 1:
+            return await self._fetch_consensus(providers, pairs)
         
         rates = {}
-        for pair, base_rate in base_rates.items():
-            # Add small random variation
-            import random
-            variation = random.uniform(-0.002, 0.002)
-            price = base_rate * (1 + variation)
+        quotes = {}
+        tried = set()
+        
+        for index, provider in enumerate(providers):
+            if provider.name in tried:
+                continue
+            missing = [pair for pair in pairs if pair not in rates and provider.supports(pair)]
+            if not missing or not self._provider_usable(provider, missing):
+                continue
+            tried.add(provider.name)
             
-            rates[pair] = {
-                "price": price,
-                "bid": price * 0.9995,
-                "ask": price * 1.0005,
-                "timestamp": datetime.utcnow().isoformat(),
-                "volume_24h": random.randint(1000000, 10000000),
-                "change_24h": random.uniform(-2, 2)
-            }
+            hedge = None
+            if settings.RATE_HEDGE_ENABLED:
+                hedge = next(
+                    (
+                        candidate for candidate in providers[index + 1:]
+                        if candidate.name not in tried
+                        and all(candidate.supports(pair) for pair in missing)
+                    ),
+                    None
+                )
+            
+            fetched, winner = await self._hedged_fetch(provider, hedge, missing)
+            if winner is not None:
+                tried.add(winner.name)
+                quotes[winner.name] = fetched
+            
+            for pair in missing:
+                if pair in fetched:
+                    rates[pair] = fetched[pair]
         
+        if self.recorder:
+            self.recorder.record_quotes(quotes)
         return rates
     
-    async def fetch_crypto_rates(self) -> Dict:
-        """Fetch crypto rates from exchanges"""
-        rates = {}
+    async def _fetch_consensus(self, providers: List[RateProvider], pairs: List[str]) -> Dict:
+        """Ask every usable provider at once and combine their quotes
         
+        Once the first non-empty answer is in, stragglers get
+        RATE_CONSENSUS_GRACE seconds before they are cancelled, so one
+        slow source cannot hold up the cycle.
+        """
+        tasks = {}
+        for provider in providers:
+            wanted = [pair for pair in pairs if provider.supports(pair)]
+            if wanted and self._provider_usable(provider, wanted):
+                tasks[asyncio.ensure_future(self._call_provider(provider, wanted))] = provider.name
+        
+        quotes: Dict[str, Dict] = {}
+        pending = set(tasks)
         try:
-            # Fetch from Binance using ccxt
-            for pair in self.crypto_pairs:
-                symbol = pair.replace("/", "")
-                ticker = self.ccxt_exchange.fetch_ticker(symbol)
-                
-                if ticker:
-                    rates[pair] = {
-                        "price": ticker["last"],
-                        "bid": ticker["bid"],
-                        "ask": ticker["ask"],
-                        "volume_24h": ticker["quoteVolume"],
-                        "change_24h": ticker["percentage"],
-                        "high_24h": ticker["high"],
-                        "low_24h": ticker["low"],
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
+            while pending and not any(quotes.values()):
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                quotes.update((tasks[task], task.result()) for task in done)
+            if pending:
+                done, pending = await asyncio.wait(pending, timeout=settings.RATE_CONSENSUS_GRACE)
+                quotes.update((tasks[task], task.result()) for task in done)
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        if self.recorder:
+            self.recorder.record_quotes(quotes)
+        return self.consensus.combine(quotes)
+    
+    def _provider_usable(self, provider: RateProvider, pairs: List[str]) -> bool:
+        """Check quota without spending it, then claim a slot from the circuit breaker"""
+        if not self.scheduler.budget(provider.name).available(provider.request_cost(pairs)):
+            logger.debug(f"Skipping {provider.name}: out of quota")
+            return False
+        if not self.provider_health[provider.name].breaker.allow():
+            logger.debug(f"Skipping {provider.name}: circuit open")
+            return False
+        return True
+    
+    async def _call_provider(self, provider: RateProvider, pairs: List[str]) -> Dict:
+        """Fetch from one provider, recording its latency and outcome; never raises"""
+        self.scheduler.budget(provider.name).spend(provider.request_cost(pairs))
+        health = self.provider_health[provider.name]
+        started = time.monotonic()
+        
+        try:
+            fetched = await provider.fetch_rates(pairs)
+        except asyncio.CancelledError:
+            # Lost a hedge race; no verdict on the provider
+            health.breaker.release()
+            raise
         except Exception as e:
-            logger.error(f"Error fetching crypto rates: {e}")
-            # Use demo rates as fallback
-            rates = self._generate_demo_crypto_rates()
+            logger.warning(f"Provider {provider.name} failed: {e!r}")
+            health.record(False, time.monotonic() - started)
+            return {}
         
-        return rates
+        health.record(bool(fetched), time.monotonic() - started)
+        return fetched
     
-    def _generate_demo_crypto_rates(self) -> Dict:
-        """Generate demo crypto rates for testing"""
-        base_rates = {
-            "BTC/USD": 65000,
-            "ETH/USD": 3500,
-            "USDC/USD": 1.0,
-            "USDT/USD": 1.0
-        }
+    async def _hedged_fetch(
+        self,
+        primary: RateProvider,
+        secondary: Optional[RateProvider],
+        pairs: List[str]
+    ) -> Tuple[Dict, Optional[RateProvider]]:
+        """Fetch pairs from primary, hedging to secondary if primary is slow or fails
         
-        rates = {}
-        import random
+        Returns the winning answer and the provider that gave it. The
+        losing call is cancelled once a non-empty answer arrives.
+        """
+        tasks = {asyncio.ensure_future(self._call_provider(primary, pairs)): primary}
+        delay = self.provider_health[primary.name].hedge_delay()
+        hedged = secondary is None
         
-        for pair, base_rate in base_rates.items():
-            variation = random.uniform(-0.01, 0.01)
-            price = base_rate * (1 + variation)
+        try:
+            while tasks:
+                timeout = None if hedged else delay
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    provider = tasks.pop(task)
+                    if task.result():
+                        return task.result(), provider
+                
+                # Primary is past its percentile or came back empty: race the secondary
+                if not hedged:
+                    hedged = True
+                    if self._provider_usable(secondary, pairs):
+                        if not done:
+                            logger.info(f"Hedging {primary.name} to {secondary.name} after {delay:.2f}s")
+                        tasks[asyncio.ensure_future(self._call_provider(secondary, pairs))] = secondary
             
-            rates[pair] = {
-                "price": price,
-                "bid": price * 0.999,
-                "ask": price * 1.001,
-                "volume_24h": random.randint(10000000, 100000000),
-                "change_24h": random.uniform(-5, 5),
-                "high_24h": price * 1.02,
-                "low_24h": price * 0.98,
-                "timestamp": datetime.utcnow().isoformat()
+            return {}, None
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def get_providers(self) -> List[Dict]:
+        """Describe every configured provider, with per-host HTTP timings for its upstreams"""
+        providers = self.forex_providers + self.crypto_providers
+        consensus_stats = self.consensus.stats()
+        http_stats = http_client.metadata()
+        return [
+            {
+                **provider.metadata(),
+                "health": self.provider_health[provider.name].metadata(),
+                "consensus": consensus_stats.get(provider.name),
+                "http": {host: http_stats.get(host) for host in provider.hosts()}
             }
-        
-        return rates
+            for provider in providers
+        ]
     
     async def store_rates(self, rates: Dict, rate_type: str):
         """Store rates in cache and database"""
-        # Store in Redis cache
-        for pair, data in rates.items():
-            cache_key = f"rate:{pair}"
-            cache.set(cache_key, json.dumps(data), expire=120)  # 2 minutes cache
-        
-        # Store aggregated data
-        all_rates_key = f"rates:{rate_type}"
-        cache.set(all_rates_key, json.dumps(rates), expire=120)
-        
-        # Store in database for historical data - commented out for now
-        # db = SessionLocal()
-        # try:
-        #     for pair, data in rates.items():
-        #         history = PriceHistory(
-        #             symbol=pair,
-        #             price=Decimal(str(data["price"])),
-        #             volume_24h=Decimal(str(data.get("volume_24h", 0))),
-        #             change_24h=data.get("change_24h", 0),
-        #             high_24h=Decimal(str(data.get("high_24h", data["price"]))),
-        #             low_24h=Decimal(str(data.get("low_24h", data["price"])))
-        #         )
-        #         db.add(history)
-        #     
-        #     db.commit()
-        # except Exception as e:
-        #     logger.error(f"Error storing rates in database: {e}")
-        #     db.rollback()
-        # finally:
-        #     db.close()
+        if not rates:
+            # Keep serving the previous data; it ages into stale/last-known-good
+            return
+        
+        stored_at = time.time()
+        
+        # One pipelined round trip writes every pair plus the last-known-good copy
+        rate_store.write_rates(rate_type, rates, stored_at, expire=settings.RATE_CACHE_HARD_TTL)
+        
+        # Swap the in-process snapshot and tell the other workers
+        self.snapshots.publish(rate_type, rates, stored_at, merge=True)
+        
+        # Buffer ticks for the batched history writer
+        if self.tick_store:
+            self.tick_store.add(rates)
     
     async def get_rate(self, pair: str) -> Optional[Dict]:
         """Get current rate for a specific pair"""
-        # Try cache first
-        cache_key = f"rate:{pair}"
-        cached = cache.get(cache_key)
+        data, _ = await self.get_rate_with_meta(pair)
+        return data
+    
+    async def get_rate_with_meta(self, pair: str) -> Tuple[Optional[Dict], Dict]:
+        """Get current rate for a pair along with its cache freshness"""
+        rate_type = self._rate_type_for(pair)
+        self.scheduler.record_read(pair)
         
-        if cached:
-            return json.loads(cached)
+        # Hot path: the in-process snapshot, aged by when this pair was last stored
+        data, meta = self._read_snapshot_pair(self.snapshots.current, rate_type, pair)
+        if data is not None:
+            return data, meta
         
-        # Fetch fresh rate
-        if "/" in pair and pair.split("/")[1] in ["USD", "EUR", "JPY", "GBP"]:
-            rates = await self.fetch_forex_rates()
-        else:
-            rates = await self.fetch_crypto_rates()
+        data, meta = self._read_cached(rate_type, pair)
+        if data is not None:
+            return data, meta
         
-        return rates.get(pair)
+        rates, meta = await self._read_cold(rate_type)
+        return rates.get(pair), meta
     
     async def get_all_rates(self) -> Dict:
         """Get all current rates"""
-        forex_cached = cache.get("rates:forex")
-        crypto_cached = cache.get("rates:crypto")
+        rates, _ = await self.get_all_rates_with_meta()
+        return rates
+    
+    async def get_all_rates_with_meta(self) -> Tuple[Mapping, Dict]:
+        """Get all current rates along with per-type cache freshness
+        
+        When the snapshot covers every rate type this returns the
+        snapshot's read-only merged mapping without touching Redis.
+        """
+        snapshot = self.snapshots.current
+        rates_by_type = {}
+        meta = {}
+        
+        for rate_type in RATE_TYPES:
+            rates_by_type[rate_type], meta[rate_type] = self._read_snapshot(snapshot, rate_type)
         
-        forex_rates = json.loads(forex_cached) if forex_cached else {}
-        crypto_rates = json.loads(crypto_cached) if crypto_cached else {}
+        if all(rates is not None for rates in rates_by_type.values()):
+            return snapshot.rates, meta
         
-        # Fetch if not cached
-        if not forex_rates:
-            forex_rates = await self.fetch_forex_rates()
-            await self.store_rates(forex_rates, "forex")
+        all_rates = {}
+        for rate_type in RATE_TYPES:
+            rates = rates_by_type[rate_type]
+            
+            if rates is None:
+                rates, meta[rate_type] = self._read_cached(rate_type)
+                if rates and meta[rate_type]["status"] in ("fresh", "stale"):
+                    self.snapshots.reload(rate_type)
+            
+            if not rates:
+                rates, meta[rate_type] = await self._read_cold(rate_type)
+            
+            all_rates.update(rates)
+        
+        return all_rates, meta
+    
+    async def _read_cold(self, rate_type: str) -> Tuple[Dict, Dict]:
+        """Rates for a type with nothing cached, not even last-known-good
         
-        if not crypto_rates:
-            crypto_rates = await self.fetch_crypto_rates()
-            await self.store_rates(crypto_rates, "crypto")
+        Only a process that polls the whole chain fetches, sharing the
+        fetch with any concurrent misses. Followers and shards report a
+        miss at once and leave filling the cache to the owner.
+        """
+        if self.ingesting and not self.shards:
+            rates = await self.refresh_rates(rate_type, reuse_fresh=True)
+            return rates, self._cache_meta("fresh", 0.0)
         
-        return {**forex_rates, **crypto_rates}
+        return {}, self._cache_meta("miss", None)
     
-    async def get_historical_rates(self, symbol: str, interval: str = "1d", limit: int = 100) -> List[Dict]:
-        """Get historical rates for a symbol"""
-        # Temporarily return mock data until PriceHistory is properly configured
-        import random
-        from datetime import datetime, timedelta
+    def _read_snapshot(self, snapshot: RateSnapshot, rate_type: str) -> Tuple[Optional[Mapping], Dict]:
+        """Stale-while-revalidate read of one rate type from the L1 snapshot"""
+        age = snapshot.age(rate_type)
         
-        historical_data = []
-        base_price = 100  # Base price for demo
-        current_time = datetime.utcnow()
+        if age is None or age > settings.RATE_CACHE_HARD_TTL:
+            return None, self._cache_meta("miss", None)
         
-        for i in range(limit):
-            timestamp = current_time - timedelta(hours=i)
-            price = base_price * (1 + random.uniform(-0.05, 0.05))
-            
-            historical_data.append({
-                "timestamp": timestamp.isoformat(),
-                "price": price,
-                "volume": random.randint(100000, 1000000),
-                "change": random.uniform(-5, 5),
-                "high": price * 1.02,
-                "low": price * 0.98
-            })
+        meta = self._cache_meta("fresh", age, snapshot.stored_at[rate_type], snapshot.version)
+        if age > settings.RATE_CACHE_SOFT_TTL:
+            self._schedule_refresh(rate_type)
+            meta.update(status="stale", stale=True)
+        
+        return snapshot.types[rate_type], meta
+    
+    def _read_snapshot_pair(self, snapshot: RateSnapshot, rate_type: str, pair: str) -> Tuple[Optional[Dict], Dict]:
+        """Stale-while-revalidate read of one pair from the L1 snapshot
+        
+        Pairs are polled in subsets, so a pair whose providers keep
+        failing can sit in a rate type that is otherwise fresh; it is aged
+        by its own store time, and past the hard TTL it is left to the
+        last-known-good path.
+        """
+        age = snapshot.pair_age(pair)
+        rates = snapshot.types.get(rate_type)
         
-        return historical_data
+        if age is None or rates is None or pair not in rates or age > settings.RATE_CACHE_HARD_TTL:
+            return None, self._cache_meta("miss", None)
+        
+        meta = self._cache_meta("fresh", age, snapshot.pair_stored_at[pair], snapshot.version)
+        if age > settings.RATE_CACHE_SOFT_TTL:
+            self._schedule_refresh(rate_type)
+            meta.update(status="stale", stale=True)
+        
+        return rates[pair], meta
+    
+    def _read_cached(self, rate_type: str, pair: Optional[str] = None) -> Tuple[Optional[Dict], Dict]:
+        """Stale-while-revalidate read of a rate cache entry
+        
+        Within the soft TTL the entry is served as-is. Between the soft and
+        hard TTL it is still served immediately while a background refresh
+        runs. Once the entry has expired we serve the last-known-good copy
+        (and refresh in the background); only a cold cache returns None.
+        """
+        now = time.time()
+        envelope = self._read_envelope(rate_type, pair)
+        
+        if envelope:
+            stored_at = envelope["stored_at"]
+            age = now - stored_at
+            if age <= settings.RATE_CACHE_SOFT_TTL:
+                return envelope["data"], self._cache_meta("fresh", age, stored_at)
+            if age <= settings.RATE_CACHE_HARD_TTL:
+                self._schedule_refresh(rate_type)
+                return envelope["data"], self._cache_meta("stale", age, stored_at)
+        
+        envelope = self._read_envelope(rate_type, pair, lkg=True)
+        if envelope:
+            stored_at = envelope["stored_at"]
+            self._schedule_refresh(rate_type)
+            return envelope["data"], self._cache_meta("last_known_good", now - stored_at, stored_at)
+        
+        return None, self._cache_meta("miss", None)
+    
+    @staticmethod
+    def _read_envelope(rate_type: str, pair: Optional[str] = None, lkg: bool = False) -> Optional[Dict]:
+        """Load a {data, stored_at} cache entry for a whole rate type or one pair"""
+        if pair is None:
+            return rate_store.read_rates(rate_type, lkg)
+        return rate_store.read_rate(rate_type, pair, lkg)
+    
+    @staticmethod
+    def _cache_meta(
+        status: str,
+        age: Optional[float],
+        stored_at: Optional[float] = None,
+        version: Optional[int] = None
+    ) -> Dict:
+        """Describe how fresh a served value is"""
+        return {
+            "status": status,
+            "stale": status in ("stale", "last_known_good"),
+            "age_seconds": round(age, 3) if age is not None else None,
+            "stored_at": stored_at,
+            "snapshot_version": version,
+            "soft_ttl": settings.RATE_CACHE_SOFT_TTL,
+            "hard_ttl": settings.RATE_CACHE_HARD_TTL
+        }
+    
+    def _schedule_refresh(self, rate_type: str):
+        """Kick off a background refresh unless one is already running
+        
+        Followers and shards leave fetching to the pair's owner and just
+        re-read Redis.
+        """
+        if self.single_flight.in_flight(f"rates:{rate_type}"):
+            return
+        
+        if self.shards or not self.ingesting:
+            try:
+                self.snapshots.reload(rate_type)
+            except Exception as e:
+                logger.warning(f"Could not reload {rate_type} rates: {e}")
+            return
+        
+        task = asyncio.create_task(self.refresh_rates(rate_type, reuse_fresh=True))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_refresh_done)
+    
+    def _on_background_refresh_done(self, task: asyncio.Task):
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Background rate refresh failed: {task.exception()}")
+    
+    async def get_historical_rates(
+        self,
+        symbol: str,
+        interval: str = "1d",
+        limit: int = 100,
+        max_points: Optional[int] = None,
+        downsample: str = "lttb"
+    ) -> List[Dict]:
+        """Get historical OHLCV candles for a symbol, newest first
+        
+        With max_points, the candles are thinned to that many using LTTB
+        on the close or a min/max envelope over the highs and lows.
+        """
+        if not self.tick_store:
+            return []
+        
+        candles = await self.tick_store.get_candles(symbol, interval, limit=limit)
+        candles = downsample_rows(
+            candles,
+            max_points,
+            downsample,
+            x_key="bucket_start",
+            y_key="close",
+            low_key="low",
+            high_key="high"
+        )
+        
+        return [
+            {
+                "timestamp": candle["bucket_start"].isoformat(),
+                "open": candle["open"],
+                "high": candle["high"],
+                "low": candle["low"],
+                "close": candle["close"],
+                "price": candle["close"],
+                "volume": candle["volume"],
+                "change": (candle["close"] / candle["open"] - 1) * 100 if candle["open"] else 0,
+                "ticks": candle["tick_count"]
+            }
+            for candle in candles
+        ]
+    
+    async def get_tick_history(
+        self,
+        symbol: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        max_points: Optional[int] = None,
+        downsample: str = "lttb"
+    ) -> List[Dict]:
+        """Get raw ticks for a symbol across the archive and the live table, oldest first"""
+        if not self.tick_store:
+            return []
+        
+        columns = await self.tick_store.get_tick_history(symbol, start, end, limit)
+        
+        # Downsample on the columns so dropped ticks never become dicts
+        if max_points and len(columns["timestamp"]) > max_points:
+            if downsample == "minmax":
+                keep = minmax_indices(columns["price"], None, max_points)
+            else:
+                keep = lttb_indices(columns["timestamp"], columns["price"], max_points)
+            columns = {name: column[keep] for name, column in columns.items()}
+        
+        # Only the requested rows are turned into Python objects
+        timestamps = columns["timestamp"].tolist()
+        prices = columns["price"].tolist()
+        bids = columns["bid"].tolist()
+        asks = columns["ask"].tolist()
+        volumes = columns["volume"].tolist()
+        
+        nan_to_none = lambda value: None if math.isnan(value) else value
+        return [
+            {
+                "timestamp": datetime.utcfromtimestamp(timestamps[i] / 1_000_000).isoformat(),
+                "price": prices[i],
+                "bid": nan_to_none(bids[i]),
+                "ask": nan_to_none(asks[i]),
+                "volume": nan_to_none(volumes[i])
+            }
+            for i in range(len(timestamps))
+        ]
+    
+    async def get_cross_rates(self) -> CrossRateMatrix:
+        """Get the cross-rate matrix for the current rates"""
+        rates, _ = await self.get_all_rates_with_meta()
+        
+        snapshot = self.snapshots.current
+        if rates is snapshot.rates:
+            return snapshot.cross_rates
+        
+        # Served from Redis or last-known-good rather than the snapshot
+        return CrossRateMatrix(rates)
     
     async def convert_currency(self, amount: float, from_currency: str, to_currency: str) -> float:
         """Convert amount from one currency to another"""
         if from_currency == to_currency:
             return amount
         
-        # Direct conversion
-        pair = f"{from_currency}/{to_currency}"
-        rate_data = await self.get_rate(pair)
+        cross_rates = await self.get_cross_rates()
+        rate = cross_rates.rate(from_currency, to_currency)
         
-        if rate_data:
-            return amount * rate_data["price"]
+        if rate is None:
+            raise ValueError(f"Cannot convert {from_currency} to {to_currency}")
         
-        # Try reverse pair
-        reverse_pair = f"{to_currency}/{from_currency}"
-        rate_data = await self.get_rate(reverse_pair)
-        
-        if rate_data:
-            return amount / rate_data["price"]
-        
-        # Try USD as intermediate
-        if from_currency != "USD" and to_currency != "USD":
-            usd_amount = await self.convert_currency(amount, from_currency, "USD")
-            return await self.convert_currency(usd_amount, "USD", to_currency)
+        return amount * rate
+    
+    async def convert_currency_batch(
+        self,
+        amounts: List[float],
+        from_currencies: List[str],
+        to_currencies: List[str]
+    ) -> List[Optional[float]]:
+        """Convert many rows at once; rows that cannot be converted come back as None"""
+        cross_rates = await self.get_cross_rates()
+        converted = cross_rates.convert_many(amounts, from_currencies, to_currencies)
         
-        raise ValueError(f"Cannot convert {from_currency} to {to_currency}")
+        return [None if math.isnan(value) else value for value in converted.tolist()]
+
+# Global service instance shared by the app lifespan and the API routers
+rate_service = RateAggregatorService()
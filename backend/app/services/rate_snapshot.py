@@ -0,0 +1,233 @@
+"""
+In-process rate snapshot (L1) in front of the Redis rate cache
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Optional
+
+from app.core.database import cache
+from app.services import rate_store
+from app.services.cross_rates import CrossRateMatrix
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "rates:invalidate"
+
+class RateSnapshot:
+    """Immutable, versioned view of every rate
+
+    Snapshots are never modified after construction; a new rate update
+    builds a new snapshot and swaps it in, so readers can hold on to one
+    without locks. The per-pair rate dicts are shared between snapshots
+    and must be treated as read-only.
+    """
+
+    __slots__ = ("version", "types", "rates", "stored_at", "pair_stored_at", "_cross_rates")
+
+    def __init__(
+        self,
+        version: int,
+        rates_by_type: Dict[str, Dict],
+        stored_at: Dict[str, float],
+        pair_stored_at: Optional[Dict[str, float]] = None
+    ):
+        merged = {}
+        for rates in rates_by_type.values():
+            merged.update(rates)
+
+        self.version = version
+        self.types: Mapping[str, Mapping] = MappingProxyType(
+            {rate_type: MappingProxyType(rates) for rate_type, rates in rates_by_type.items()}
+        )
+        self.rates: Mapping[str, Dict] = MappingProxyType(merged)
+        self.stored_at: Mapping[str, float] = MappingProxyType(dict(stored_at))
+        self.pair_stored_at: Mapping[str, float] = MappingProxyType(dict(pair_stored_at or {}))
+        self._cross_rates: Optional[CrossRateMatrix] = None
+
+    @property
+    def cross_rates(self) -> CrossRateMatrix:
+        """Cross-rate matrix for this snapshot, built once on first use"""
+        if self._cross_rates is None:
+            self._cross_rates = CrossRateMatrix(self.rates)
+        return self._cross_rates
+
+    def age(self, rate_type: str, now: Optional[float] = None) -> Optional[float]:
+        """Seconds since rate_type was stored, or None if we have none"""
+        if rate_type not in self.stored_at:
+            return None
+        return (now or time.time()) - self.stored_at[rate_type]
+
+    def pair_age(self, pair: str, now: Optional[float] = None) -> Optional[float]:
+        """Seconds since pair itself was stored, or None if we have none"""
+        if pair not in self.pair_stored_at:
+            return None
+        return (now or time.time()) - self.pair_stored_at[pair]
+
+class RateSnapshotStore:
+    """Holds the current RateSnapshot and keeps it in sync across workers
+
+    publish() swaps in a new snapshot and announces it on a Redis pub/sub
+    channel; other workers reload that rate type from Redis in a
+    background listener thread, so request handlers only ever read the
+    in-memory snapshot. Merged (partial) updates announce the pairs they
+    touched, and listeners fetch and merge just those, so ingest shards
+    writing different pairs of the same type never mask each other.
+    
+    If set, on_change(rate_type, rates) is called after every swap with
+    just the pairs whose price differs from the previous snapshot, from
+    whichever thread made the swap.
+    """
+
+    def __init__(self, rate_types=("forex", "crypto")):
+        self.rate_types = tuple(rate_types)
+        self.worker_id = f"{os.getpid()}:{id(self)}"
+        self._snapshot = RateSnapshot(0, {}, {})
+        self._lock = threading.Lock()
+        self._listener = None
+        self.on_change: Optional[Callable[[str, Dict], None]] = None
+
+    @property
+    def current(self) -> RateSnapshot:
+        """The latest snapshot; a plain attribute read, safe from any thread"""
+        return self._snapshot
+
+    def publish(
+        self,
+        rate_type: str,
+        rates: Dict,
+        stored_at: float,
+        announce: bool = True,
+        merge: bool = False,
+        pair_stored_at: Optional[Dict[str, float]] = None
+    ) -> RateSnapshot:
+        """Swap in a snapshot with rate_type replaced (or merged), unless ours is already newer
+
+        pair_stored_at gives each pair's own store time; pairs missing
+        from it are taken to have been stored at stored_at.
+        """
+        pair_times = {pair: stored_at for pair in rates}
+        if pair_stored_at:
+            pair_times.update((pair, t) for pair, t in pair_stored_at.items() if pair in rates)
+
+        with self._lock:
+            current = self._snapshot
+            if merge:
+                # Partial updates from other shards may carry an older clock
+                stored_at = max(stored_at, current.stored_at.get(rate_type, 0))
+            elif current.stored_at.get(rate_type, 0) > stored_at:
+                return current
+
+            rates_by_type = {
+                name: dict(current.types[name])
+                for name in self.rate_types
+                if name in current.types
+            }
+            if merge and rate_type in rates_by_type:
+                rates_by_type[rate_type].update(rates)
+            else:
+                rates_by_type[rate_type] = dict(rates)
+            stored = dict(current.stored_at)
+            stored[rate_type] = stored_at
+            pair_stored = dict(current.pair_stored_at)
+            if not merge:
+                for pair in current.types.get(rate_type, ()):
+                    pair_stored.pop(pair, None)
+            pair_stored.update(pair_times)
+
+            # Keep a stable type order so merged lookups are deterministic
+            ordered = {name: rates_by_type[name] for name in self.rate_types if name in rates_by_type}
+            snapshot = RateSnapshot(current.version + 1, ordered, stored, pair_stored)
+            self._snapshot = snapshot
+            
+            changed = {}
+            if self.on_change:
+                previous = current.types.get(rate_type, {})
+                changed = {
+                    pair: rate for pair, rate in rates.items()
+                    if pair not in previous or previous[pair].get("price") != rate.get("price")
+                }
+        
+        if changed:
+            try:
+                self.on_change(rate_type, changed)
+            except Exception as e:
+                logger.error(f"Error in rate snapshot change handler: {e}")
+
+        if announce:
+            message = {
+                "origin": self.worker_id,
+                "rate_type": rate_type,
+                "stored_at": stored_at
+            }
+            if merge:
+                message["pairs"] = list(rates)
+            try:
+                cache.publish(INVALIDATION_CHANNEL, json.dumps(message))
+            except Exception as e:
+                logger.warning(f"Failed to announce rate snapshot: {e}")
+
+        return snapshot
+
+    def reload(self, rate_type: str) -> Optional[RateSnapshot]:
+        """Pull rate_type from the Redis cache into the snapshot"""
+        envelope = rate_store.read_rates(rate_type)
+        if not envelope:
+            return None
+        return self.publish(
+            rate_type,
+            envelope["data"],
+            envelope["stored_at"],
+            announce=False,
+            pair_stored_at=envelope["pair_stored_at"]
+        )
+
+    def _on_invalidation(self, message: Dict):
+        """Pub/sub handler, runs on the listener thread"""
+        try:
+            payload = json.loads(message["data"])
+            if payload.get("origin") == self.worker_id:
+                return
+            rate_type = payload["rate_type"]
+            if "pairs" in payload:
+                envelope = rate_store.read_pairs(rate_type, payload["pairs"])
+                if envelope:
+                    self.publish(
+                        rate_type,
+                        envelope["data"],
+                        envelope["stored_at"],
+                        announce=False,
+                        merge=True,
+                        pair_stored_at=envelope["pair_stored_at"]
+                    )
+                return
+            if self._snapshot.stored_at.get(rate_type, 0) >= payload["stored_at"]:
+                return
+            self.reload(rate_type)
+        except Exception as e:
+            logger.error(f"Error applying rate snapshot invalidation: {e}")
+
+    def start_listener(self):
+        """Start following invalidations from other workers"""
+        if self._listener is not None:
+            return
+
+        for rate_type in self.rate_types:
+            try:
+                self.reload(rate_type)
+            except Exception as e:
+                logger.warning(f"Could not preload {rate_type} rates: {e}")
+
+        pubsub = cache.pubsub()
+        pubsub.subscribe(**{cache.key(INVALIDATION_CHANNEL): self._on_invalidation})
+        self._listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def stop_listener(self):
+        """Stop following invalidations"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
@@ -0,0 +1,82 @@
+"""
+Redis layout for cached rates
+
+Each rate type lives in one hash, rates:{rate_type}, with one field per
+pair holding [stored_at, rate] as JSON and a _stored_at field holding
+the time of the last write to any pair. Pairs are polled in subsets, so
+the per-pair time is what tells a pair's own age. A non-expiring twin,
+lkg:rates:{rate_type}, keeps the last-known-good copy. One pipelined
+round trip updates every pair in both hashes, and single-pair reads are
+a constant-time HMGET.
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+from app.core.database import cache
+
+STORED_AT_FIELD = "_stored_at"
+
+def rates_key(rate_type: str, lkg: bool = False) -> str:
+    """Cache key of the hash holding rate_type"""
+    return f"lkg:rates:{rate_type}" if lkg else f"rates:{rate_type}"
+
+def _decode(value: str, fallback: float) -> Tuple[Dict, float]:
+    """Split a field into (rate, stored_at); bare rates written before per-pair times get fallback"""
+    decoded = json.loads(value)
+    if isinstance(decoded, list):
+        return decoded[1], decoded[0]
+    return decoded, fallback
+
+def _decode_fields(fields: Dict, fallback: float) -> Dict:
+    data = {}
+    pair_stored_at = {}
+    for pair, value in fields.items():
+        data[pair], pair_stored_at[pair] = _decode(value, fallback)
+    return {"data": data, "stored_at": fallback, "pair_stored_at": pair_stored_at}
+
+def write_rates(rate_type: str, rates: Dict, stored_at: float, expire: int):
+    """Write every pair of rate_type to the live and last-known-good hashes
+
+    Fields are merged, so a pair missing from this batch keeps its
+    previous value. Each pair is serialized once and shared by both hashes.
+    """
+    fields = {pair: json.dumps([stored_at, data]) for pair, data in rates.items()}
+    fields[STORED_AT_FIELD] = repr(stored_at)
+
+    live_key = cache.key(rates_key(rate_type))
+    lkg_key = cache.key(rates_key(rate_type, lkg=True))
+
+    pipe = cache.pipeline()
+    pipe.hset(live_key, mapping=fields)
+    pipe.expire(live_key, expire)
+    pipe.hset(lkg_key, mapping=fields)
+    pipe.execute()
+
+def read_rates(rate_type: str, lkg: bool = False) -> Optional[Dict]:
+    """Read all pairs of rate_type as {"data": {...}, "stored_at": ..., "pair_stored_at": {...}}"""
+    fields = cache.hgetall(rates_key(rate_type, lkg))
+    stored_at = fields.pop(STORED_AT_FIELD, None)
+    if stored_at is None:
+        return None
+
+    return _decode_fields(fields, float(stored_at))
+
+def read_rate(rate_type: str, pair: str, lkg: bool = False) -> Optional[Dict]:
+    """Read one pair of rate_type as {"data": {...}, "stored_at": ...}, stored_at being the pair's own"""
+    value, stored_at = cache.hmget(rates_key(rate_type, lkg), [pair, STORED_AT_FIELD])
+    if value is None or stored_at is None:
+        return None
+
+    data, pair_stored_at = _decode(value, float(stored_at))
+    return {"data": data, "stored_at": pair_stored_at}
+
+def read_pairs(rate_type: str, pairs: List[str]) -> Optional[Dict]:
+    """Read a subset of rate_type's pairs in the read_rates format"""
+    values = cache.hmget(rates_key(rate_type), list(pairs) + [STORED_AT_FIELD])
+    stored_at = values.pop()
+    if stored_at is None:
+        return None
+
+    fields = {pair: value for pair, value in zip(pairs, values) if value is not None}
+    return _decode_fields(fields, float(stored_at))
@@ -0,0 +1,141 @@
+"""
+Push-based streaming ingest of exchange ticker feeds
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+import websockets
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def stream_url(base_url: str, symbols: Dict[str, str]) -> str:
+    """Combined-stream URL subscribing to every symbol's 24h ticker"""
+    streams = "/".join(f"{symbol.lower()}@ticker" for symbol in symbols.values())
+    return f"{base_url}?streams={streams}"
+
+def normalize_ticker(data: Dict) -> Dict:
+    """Convert a Binance 24hrTicker event into our rate format"""
+    return {
+        "price": float(data["c"]),
+        "bid": float(data["b"]),
+        "ask": float(data["a"]),
+        "volume_24h": float(data["q"]),
+        "change_24h": float(data["P"]),
+        "high_24h": float(data["h"]),
+        "low_24h": float(data["l"]),
+        "timestamp": datetime.utcfromtimestamp(data["E"] / 1000).isoformat()
+    }
+
+class TickerStream:
+    """Long-lived exchange WebSocket subscription feeding the aggregator
+
+    Ticker events are conflated per pair (only the newest is kept) and
+    handed to on_rates in batches every RATE_STREAM_FLUSH_INTERVAL, so a
+    burst of messages costs one cache write, not one per message. The
+    connection is re-established with jittered exponential backoff; while
+    it is down is_live() turns false and the poller takes the pairs back.
+    """
+
+    def __init__(
+        self,
+        on_rates: Callable[[Dict[str, Dict]], Awaitable],
+        url: Optional[str] = None,
+        symbols: Optional[Dict[str, str]] = None
+    ):
+        self.on_rates = on_rates
+        self.url = url or settings.RATE_STREAM_URL
+        self.symbols = symbols or settings.RATE_EXCHANGE_SYMBOLS  # pair -> exchange symbol
+        self._pairs = {symbol.upper(): pair for pair, symbol in self.symbols.items()}
+        self._pending: Dict[str, Dict] = {}
+        self._last_message: Dict[str, float] = {}
+        self._tasks = []
+        self.is_running = False
+        self.connected = False
+        self.messages = 0
+
+    async def start(self):
+        self.is_running = True
+        self._tasks = [
+            asyncio.create_task(self._connection_loop()),
+            asyncio.create_task(self._flush_loop())
+        ]
+
+    async def stop(self):
+        self.is_running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._flush()
+
+    def is_live(self, pair: str) -> bool:
+        """Check whether pair has streamed recently enough to skip polling it"""
+        last = self._last_message.get(pair)
+        return self.connected and last is not None and time.monotonic() - last <= settings.RATE_STREAM_STALE_AFTER
+
+    async def _connection_loop(self):
+        url = stream_url(self.url, self.symbols)
+        failures = 0
+
+        while self.is_running:
+            try:
+                async with websockets.connect(url, ping_interval=settings.RATE_STREAM_PING_INTERVAL) as ws:
+                    self.connected = True
+                    failures = 0
+                    logger.info(f"Ticker stream connected: {len(self.symbols)} symbols")
+                    async for message in ws:
+                        self._handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Ticker stream disconnected: {e!r}")
+            finally:
+                self.connected = False
+
+            if self.is_running:
+                failures += 1
+                delay = min(settings.RATE_STREAM_RECONNECT_MAX, 2 ** failures / 4)
+                await asyncio.sleep(random.uniform(delay / 2, delay))
+
+    def _handle_message(self, message):
+        try:
+            data = json.loads(message)
+            data = data.get("data", data)  # Combined streams wrap the event
+            pair = self._pairs.get(data.get("s", ""))
+            if pair is None or data.get("e") != "24hrTicker":
+                return
+            self._pending[pair] = normalize_ticker(data)
+            self._last_message[pair] = time.monotonic()
+            self.messages += 1
+        except (ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Ignoring malformed ticker message: {e!r}")
+
+    async def _flush_loop(self):
+        while self.is_running:
+            await asyncio.sleep(settings.RATE_STREAM_FLUSH_INTERVAL)
+            try:
+                await self._flush()
+            except Exception as e:
+                logger.error(f"Error flushing streamed rates: {e}")
+
+    async def _flush(self):
+        if not self._pending:
+            return
+        rates, self._pending = self._pending, {}
+        await self.on_rates(rates)
+
+    def metadata(self) -> Dict:
+        return {
+            "url": self.url,
+            "connected": self.connected,
+            "messages": self.messages,
+            "live_pairs": [pair for pair in self.symbols if self.is_live(pair)]
+        }
@@ -0,0 +1,80 @@
+"""
+Heartbeat-based membership of the ingest worker pool
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.core.database import cache
+from app.services.hash_ring import HashRing
+
+logger = logging.getLogger(__name__)
+
+class ShardMembership:
+    """Tracks the live ingest workers and the hash ring over them
+
+    Every member writes a heartbeat into a Redis sorted set (score = time
+    of last beat) every RATE_SHARD_HEARTBEAT_INTERVAL and prunes members
+    silent for longer than RATE_SHARD_MEMBER_TTL, all in one pipelined
+    round trip. Whenever the live set changes, on_change is called with
+    the new ring so the owner can pick up or drop its share of pairs.
+    Members leave the set on a clean shutdown, so the rest rebalance on
+    their next beat.
+    """
+
+    def __init__(self, name: str, on_change: Callable[[HashRing], Awaitable]):
+        self.name = name
+        self.on_change = on_change
+        self.member_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.ring = HashRing(vnodes=settings.RATE_SHARD_VNODES)
+        self._task: Optional[asyncio.Task] = None
+        self.is_running = False
+
+    @property
+    def key(self) -> str:
+        return cache.key(f"members:{self.name}")
+
+    def owns(self, key: str) -> bool:
+        return self.ring.node_for(key) == self.member_id
+
+    async def start(self):
+        self.is_running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            cache.redis.zrem(self.key, self.member_id)
+        except Exception as e:
+            logger.warning(f"Could not leave {self.name} pool: {e}")
+
+    def _heartbeat(self):
+        """Beat, prune the dead and read the live members in one round trip"""
+        now = time.time()
+        pipe = cache.pipeline()
+        pipe.zadd(self.key, {self.member_id: now})
+        pipe.zremrangebyscore(self.key, "-inf", now - settings.RATE_SHARD_MEMBER_TTL)
+        pipe.zrange(self.key, 0, -1)
+        return pipe.execute()[-1]
+
+    async def _run(self):
+        while self.is_running:
+            try:
+                members = [m.decode() if isinstance(m, bytes) else m for m in self._heartbeat()]
+                if sorted(members) != self.ring.nodes:
+                    self.ring = HashRing(members, vnodes=settings.RATE_SHARD_VNODES)
+                    logger.info(f"{self.name} pool is now {len(members)} workers; rebalancing")
+                    await self.on_change(self.ring)
+            except Exception as e:
+                logger.error(f"Error in {self.name} heartbeat: {e}")
+            await asyncio.sleep(settings.RATE_SHARD_HEARTBEAT_INTERVAL)
@@ -0,0 +1,37 @@
+"""
+Single-flight request coalescing
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key onto one in-flight call
+
+    The first caller for a key starts the work; everyone arriving while it
+    is still running awaits the same task and gets the same result (or
+    exception). The task is shielded, so a cancelled caller does not
+    cancel the fetch for everybody else.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, func: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        """Run func once per key at a time and share its result"""
+        task = self._inflight.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def in_flight(self, key: str) -> bool:
+        """Check whether a call for key is currently running"""
+        return key in self._inflight
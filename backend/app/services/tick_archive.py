@@ -0,0 +1,144 @@
+"""
+Append-only, memory-mapped columnar archive for sealed tick partitions
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# One fixed-width file per column; timestamps are epoch microseconds (UTC)
+COLUMNS = {
+    "timestamp": np.dtype("<i8"),
+    "price": np.dtype("<f8"),
+    "bid": np.dtype("<f8"),
+    "ask": np.dtype("<f8"),
+    "volume": np.dtype("<f8")
+}
+
+def to_micros(timestamp: datetime) -> int:
+    """Datetime to epoch microseconds; naive values are UTC"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp() * 1_000_000)
+
+class TickArchive:
+    """Per-symbol columnar tick files with an index and zero-copy reads
+
+    Each symbol has a directory holding timestamp/price/bid/ask/volume
+    column files and an index.json listing the sealed partitions, their
+    row ranges and the committed row count. Columns are appended first
+    and the index is replaced atomically afterwards, so a crash mid-append
+    leaves trailing bytes that readers ignore. Partitions must be sealed
+    in chronological order, which keeps every timestamp column sorted
+    and lets slice() binary-search it. Nothing is created on disk until
+    the first append.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _dirname(symbol: str) -> str:
+        return symbol.replace("/", "-")
+
+    def _symbol_dir(self, symbol: str) -> Path:
+        return self.root / self._dirname(symbol)
+
+    def read_index(self, symbol: str) -> Dict:
+        """Load a symbol's index; empty if it has never been archived"""
+        path = self._symbol_dir(symbol) / "index.json"
+        if not path.exists():
+            return {"symbol": symbol, "rows": 0, "partitions": []}
+        return json.loads(path.read_text())
+
+    def _write_index(self, symbol: str, index: Dict):
+        path = self._symbol_dir(symbol) / "index.json"
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(index))
+        os.replace(tmp, path)
+
+    def symbols(self) -> List[str]:
+        """Every archived symbol"""
+        if not self.root.is_dir():
+            return []
+        return sorted(
+            self.read_index(path.name)["symbol"]
+            for path in self.root.iterdir()
+            if (path / "index.json").exists()
+        )
+
+    def has_partition(self, symbol: str, partition: str) -> bool:
+        """Check whether a partition was already sealed for symbol"""
+        return any(p["name"] == partition for p in self.read_index(symbol)["partitions"])
+
+    def append(self, symbol: str, partition: str, columns: Dict[str, np.ndarray]) -> int:
+        """Append one partition's rows for symbol; returns rows written"""
+        rows = len(columns["timestamp"])
+        if rows == 0:
+            return 0
+
+        with self._lock:
+            index = self.read_index(symbol)
+            if any(p["name"] == partition for p in index["partitions"]):
+                return 0
+
+            timestamps = np.asarray(columns["timestamp"], dtype=COLUMNS["timestamp"])
+            if index["partitions"] and timestamps[0] < index["partitions"][-1]["end"]:
+                raise ValueError(f"{partition} for {symbol} overlaps the archive; seal partitions in order")
+
+            directory = self._symbol_dir(symbol)
+            directory.mkdir(parents=True, exist_ok=True)
+
+            committed = index["rows"]
+            for name, dtype in COLUMNS.items():
+                data = np.asarray(columns.get(name, np.full(rows, np.nan)), dtype=dtype)
+                path = directory / f"{name}.col"
+                with open(path, "r+b" if path.exists() else "wb") as f:
+                    # Drop any bytes left behind by an interrupted append
+                    f.truncate(committed * dtype.itemsize)
+                    f.seek(committed * dtype.itemsize)
+                    data.tofile(f)
+
+            index["partitions"].append({
+                "name": partition,
+                "first_row": committed,
+                "rows": rows,
+                "start": int(timestamps[0]),
+                "end": int(timestamps[-1])
+            })
+            index["rows"] = committed + rows
+            self._write_index(symbol, index)
+
+        return rows
+
+    def columns(self, symbol: str) -> Dict[str, np.ndarray]:
+        """Read-only memory-mapped views of every committed row"""
+        rows = self.read_index(symbol)["rows"]
+        directory = self._symbol_dir(symbol)
+        if rows == 0:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        return {
+            name: np.memmap(directory / f"{name}.col", dtype=dtype, mode="r", shape=(rows,))
+            for name, dtype in COLUMNS.items()
+        }
+
+    def slice(
+        self,
+        symbol: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Dict[str, np.ndarray]:
+        """Zero-copy views of the rows with start <= timestamp < end"""
+        columns = self.columns(symbol)
+        timestamps = columns["timestamp"]
+
+        lo = 0 if start is None else int(np.searchsorted(timestamps, to_micros(start), side="left"))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, to_micros(end), side="left"))
+
+        return {name: column[lo:hi] for name, column in columns.items()}
@@ -0,0 +1,472 @@
+"""
+Persistent tick store with buffered, batched writes
+"""
+
+import asyncio
+import csv
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.core.database import engine, cache
+from app.models.all_models import PriceTick, PriceCandle
+from app.services.candles import CandleAggregator, merge_candle
+from app.services.tick_archive import TickArchive, to_micros
+
+logger = logging.getLogger(__name__)
+
+TICK_COLUMNS = ("symbol", "timestamp", "price", "bid", "ask", "volume_24h", "change_24h")
+
+def parse_timestamp(value: Optional[str]) -> datetime:
+    """Parse a rate timestamp; naive values are UTC, missing ones are now"""
+    if not value:
+        return datetime.now(timezone.utc)
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+def month_bounds(timestamp: datetime) -> Tuple[datetime, datetime]:
+    """First instant of timestamp's month and of the following month (UTC)"""
+    start = datetime(timestamp.year, timestamp.month, 1, tzinfo=timezone.utc)
+    if timestamp.month == 12:
+        end = datetime(timestamp.year + 1, 1, 1, tzinfo=timezone.utc)
+    else:
+        end = datetime(timestamp.year, timestamp.month + 1, 1, tzinfo=timezone.utc)
+    return start, end
+
+def partition_name(timestamp: datetime) -> str:
+    """Name of the monthly price_ticks partition holding timestamp"""
+    return f"{PriceTick.__tablename__}_p{timestamp.year:04d}{timestamp.month:02d}"
+
+def partition_month(name: str) -> Optional[datetime]:
+    """Inverse of partition_name; None for names we did not create"""
+    suffix = name.rsplit("_p", 1)[-1]
+    if len(suffix) != 6 or not suffix.isdigit():
+        return None
+    return datetime(int(suffix[:4]), int(suffix[4:]), 1, tzinfo=timezone.utc)
+
+def months_before(timestamp: datetime, months: int) -> datetime:
+    """Start of the month `months` before timestamp's month"""
+    index = timestamp.year * 12 + timestamp.month - 1 - months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+def coalesce_candles(rows: List[Dict]) -> List[Dict]:
+    """Fold candle rows for the same bucket into one, oldest first"""
+    merged: Dict[Tuple, Dict] = {}
+    for row in rows:
+        key = (row["symbol"], row["interval"], row["bucket_start"])
+        merged[key] = merge_candle(merged.get(key), row)
+    return list(merged.values())
+
+class TickStore:
+    """Buffers rate ticks in memory and flushes them to price_ticks in batches
+
+    Ticks are flushed when the buffer reaches batch_size or every
+    flush_interval seconds, whichever comes first. Writes run on a
+    dedicated single-thread pool so they never block the event loop and
+    never interleave. On PostgreSQL a batch is one COPY into the monthly
+    partition(s); elsewhere it is one multi-row INSERT.
+
+    Every tick is also folded into OHLCV candles as it arrives; changed
+    candles are upserted into price_candles on the same flush.
+
+    Monthly partitions older than TICK_ARCHIVE_AFTER_MONTHS are sealed
+    into the memory-mapped TickArchive and dropped from the database.
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_buffer: Optional[int] = None
+    ):
+        self.batch_size = batch_size or settings.TICK_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.TICK_FLUSH_INTERVAL
+        self.max_buffer = max_buffer or settings.TICK_BUFFER_MAX
+        self.is_running = False
+        self._buffer: List[Tuple] = []
+        self.candles = CandleAggregator()
+        self._pending_candles: List[Dict] = []
+        self._last_volume_24h: Dict[str, float] = {}
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tick-store")
+        self._flush_task: Optional[asyncio.Task] = None
+        self._seal_task: Optional[asyncio.Task] = None
+        self.archive: Optional[TickArchive] = (
+            TickArchive(settings.TICK_ARCHIVE_DIR) if settings.TICK_ARCHIVE_ENABLED else None
+        )
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._partitions: Set[str] = set()
+        self._is_postgres = engine.dialect.name == "postgresql"
+
+    async def start(self):
+        """Start the periodic flusher"""
+        self.is_running = True
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        if self.archive and self._is_postgres:
+            self._seal_task = asyncio.create_task(self._seal_loop())
+
+    async def stop(self):
+        """Stop the flusher and write out whatever is buffered"""
+        self.is_running = False
+        self._wakeup.set()
+        if self._seal_task:
+            self._seal_task.cancel()
+            await asyncio.gather(self._seal_task, return_exceptions=True)
+            self._seal_task = None
+        if self._flush_task:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()
+        self._pool.shutdown(wait=True)
+
+    def add(self, rates: Dict):
+        """Buffer one tick per pair; triggers a flush once batch_size is reached"""
+        for pair, data in rates.items():
+            if data.get("price") is None:
+                continue
+            timestamp = parse_timestamp(data.get("timestamp"))
+            self._buffer.append((
+                pair,
+                timestamp,
+                data["price"],
+                data.get("bid"),
+                data.get("ask"),
+                data.get("volume_24h"),
+                data.get("change_24h")
+            ))
+            self.candles.add_tick(pair, timestamp, data["price"], self._tick_volume(pair, data))
+
+        if len(self._buffer) > self.max_buffer:
+            dropped = len(self._buffer) - self.max_buffer
+            del self._buffer[:dropped]
+            logger.warning(f"Tick buffer full, dropped {dropped} oldest ticks")
+
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _tick_volume(self, pair: str, data: Dict) -> Optional[float]:
+        """Volume traded since pair's previous tick, or None if it cannot be known
+
+        Providers that report per-tick volume are taken at their word.
+        Otherwise it is the rise in rolling 24h volume since the previous
+        tick; volume leaving the window can outweigh new trades, so a fall
+        counts as nothing traded and candle volume is a lower bound.
+        """
+        if data.get("volume") is not None:
+            return float(data["volume"])
+
+        volume_24h = data.get("volume_24h")
+        if volume_24h is None:
+            return None
+        previous = self._last_volume_24h.get(pair)
+        self._last_volume_24h[pair] = volume_24h
+        if previous is None:
+            return None
+        return max(volume_24h - previous, 0.0)
+
+    async def _flush_loop(self):
+        """Flush on the size trigger or every flush_interval seconds"""
+        while self.is_running:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing ticks: {e}")
+
+    async def flush(self):
+        """Write the buffered ticks and changed candles as one batch each"""
+        async with self._flush_lock:
+            rows, self._buffer = self._buffer, []
+            candles = self._pending_candles + self.candles.drain()
+            self._pending_candles = []
+            if not rows and not candles:
+                return
+
+            loop = asyncio.get_running_loop()
+            if rows:
+                try:
+                    await loop.run_in_executor(self._pool, self._write_ticks, rows)
+                except Exception:
+                    # Put the batch back in front so the next flush retries it
+                    self._buffer[:0] = rows
+                    self._pending_candles = candles
+                    raise
+
+            if candles:
+                try:
+                    await loop.run_in_executor(self._pool, self._write_candles, coalesce_candles(candles))
+                except Exception:
+                    self._pending_candles = candles
+                    raise
+
+    async def _seal_loop(self):
+        """Periodically move old partitions into the columnar archive"""
+        while self.is_running:
+            try:
+                await self.seal_old_partitions()
+            except Exception as e:
+                logger.error(f"Error sealing tick partitions: {e}")
+            await asyncio.sleep(settings.TICK_ARCHIVE_CHECK_INTERVAL)
+
+    async def seal_old_partitions(self) -> List[str]:
+        """Seal every partition older than TICK_ARCHIVE_AFTER_MONTHS; one worker at a time"""
+        token = cache.acquire_lock("tick-archive-seal", settings.TICK_ARCHIVE_CHECK_INTERVAL * 1000)
+        if token is None:
+            return []
+        try:
+            cutoff = months_before(datetime.now(timezone.utc), settings.TICK_ARCHIVE_AFTER_MONTHS)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, self._seal_before, cutoff)
+        finally:
+            cache.release_lock("tick-archive-seal", token)
+
+    def _seal_before(self, cutoff: datetime) -> List[str]:
+        """Seal partitions whose whole month ends on or before cutoff, oldest first"""
+        with engine.connect() as conn:
+            names = conn.execute(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :parent"
+            ), {"parent": PriceTick.__tablename__}).scalars().all()
+
+        sealed = []
+        for name in sorted(names):
+            month = partition_month(name)
+            if month is None or month_bounds(month)[1] > cutoff:
+                continue
+            self._seal_partition(name)
+            sealed.append(name)
+        return sealed
+
+    def _seal_partition(self, name: str):
+        """Stream one partition into the archive, then detach and drop it"""
+        chunks: Dict[str, List[List]] = {}
+
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(text(
+                f"SELECT symbol, timestamp, price, bid, ask, volume_24h FROM {name} "
+                f"ORDER BY symbol, timestamp"
+            ))
+            for batch in result.partitions(50000):
+                for symbol, timestamp, price, bid, ask, volume in batch:
+                    columns = chunks.setdefault(symbol, [[], [], [], [], []])
+                    columns[0].append(to_micros(timestamp))
+                    columns[1].append(float(price))
+                    columns[2].append(float(bid) if bid is not None else np.nan)
+                    columns[3].append(float(ask) if ask is not None else np.nan)
+                    columns[4].append(float(volume) if volume is not None else np.nan)
+
+        for symbol, columns in chunks.items():
+            self.archive.append(symbol, name, {
+                "timestamp": np.array(columns[0], dtype=np.int64),
+                "price": np.array(columns[1]),
+                "bid": np.array(columns[2]),
+                "ask": np.array(columns[3]),
+                "volume": np.array(columns[4])
+            })
+
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {PriceTick.__tablename__} DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+        self._partitions.discard(name)
+        logger.info(f"Sealed tick partition {name} ({len(chunks)} symbols) into the archive")
+
+    def _write_ticks(self, rows: List[Tuple]):
+        """Persist one batch of ticks (runs on the tick-store thread)"""
+        if self._is_postgres:
+            self._ensure_partitions(row[1] for row in rows)
+            self._copy_rows(rows)
+        else:
+            with engine.begin() as conn:
+                conn.execute(
+                    insert(PriceTick.__table__),
+                    [dict(zip(TICK_COLUMNS, row)) for row in rows]
+                )
+
+    def _write_candles(self, rows: List[Dict]):
+        """Upsert changed candles, adding volume deltas and widening high/low"""
+        if not self._is_postgres:
+            logger.debug("Candle rollups need PostgreSQL; skipping persistence")
+            return
+
+        table = PriceCandle.__table__
+        statement = pg_insert(table).values(rows)
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.symbol, table.c.interval, table.c.bucket_start],
+            set_={
+                "high": func.greatest(table.c.high, excluded.high),
+                "low": func.least(table.c.low, excluded.low),
+                "close": excluded.close,
+                # NULL volume is unknown, so it neither zeroes nor erases a known total
+                "volume": func.coalesce(table.c.volume + excluded.volume, table.c.volume, excluded.volume),
+                "tick_count": table.c.tick_count + excluded.tick_count,
+                "updated_at": func.now()
+            }
+        )
+
+        with engine.begin() as conn:
+            conn.execute(statement)
+
+    def _ensure_partitions(self, timestamps):
+        """Create any monthly partitions this batch needs"""
+        needed = {}
+        for timestamp in timestamps:
+            name = partition_name(timestamp)
+            if name not in self._partitions:
+                needed[name] = month_bounds(timestamp)
+
+        if not needed:
+            return
+
+        with engine.begin() as conn:
+            for name, (start, end) in needed.items():
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PriceTick.__tablename__} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                ))
+        self._partitions.update(needed)
+
+    def _copy_rows(self, rows: List[Tuple]):
+        """Bulk load rows with COPY ... FROM STDIN"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if value is None else value for value in row])
+        buffer.seek(0)
+
+        connection = engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {PriceTick.__tablename__} ({', '.join(TICK_COLUMNS)}) "
+                    f"FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+    async def get_candles(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int = 100,
+        end: Optional[datetime] = None
+    ) -> List[Dict]:
+        """Most recent candles for symbol, newest first, including unflushed ticks"""
+        loop = asyncio.get_running_loop()
+        candles = await loop.run_in_executor(None, self._query_candles, symbol, interval, limit, end)
+
+        pending = self.candles.open_candle(symbol, interval)
+        if pending and (end is None or pending["bucket_start"] < end):
+            if candles and candles[0]["bucket_start"] == pending["bucket_start"]:
+                candles[0] = merge_candle(candles[0], pending)
+            elif not candles or pending["bucket_start"] > candles[0]["bucket_start"]:
+                candles.insert(0, pending)
+                del candles[limit:]
+
+        return candles
+
+    def _query_candles(self, symbol, interval, limit, end) -> List[Dict]:
+        """Range scan over the (symbol, interval, bucket_start) primary key"""
+        table = PriceCandle.__table__
+        query = select(table).where(table.c.symbol == symbol, table.c.interval == interval)
+        if end is not None:
+            query = query.where(table.c.bucket_start < end)
+        query = query.order_by(table.c.bucket_start.desc()).limit(limit)
+
+        with engine.connect() as conn:
+            return [
+                {
+                    "symbol": row.symbol,
+                    "interval": row.interval,
+                    "bucket_start": row.bucket_start,
+                    "open": float(row.open),
+                    "high": float(row.high),
+                    "low": float(row.low),
+                    "close": float(row.close),
+                    "volume": float(row.volume) if row.volume is not None else None,
+                    "tick_count": row.tick_count or 0
+                }
+                for row in conn.execute(query)
+            ]
+
+    async def get_tick_history(
+        self,
+        symbol: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """Columnar ticks for symbol in [start, end), oldest first
+
+        With limit only the latest limit ticks are returned: the database
+        query stops there, and the archive is only read for what the table
+        could not supply. Archived rows come back as zero-copy memory-mapped
+        views; they are only copied when recent database ticks have to be
+        appended.
+        """
+        loop = asyncio.get_running_loop()
+        recent = await loop.run_in_executor(None, self._query_tick_columns, symbol, start, end, limit)
+
+        remaining = None if limit is None else limit - len(recent["timestamp"])
+        if not self.archive or remaining == 0:
+            return recent
+
+        archived = self.archive.slice(symbol, start, end)
+        if remaining is not None:
+            archived = {name: column[max(len(column) - remaining, 0):] for name, column in archived.items()}
+        if len(recent["timestamp"]) == 0:
+            return archived
+
+        # The archive only holds months already dropped from the table, so they never overlap
+        return {name: np.concatenate([archived[name], recent[name]]) for name in archived}
+
+    def _query_tick_columns(self, symbol, start, end, limit=None) -> Dict[str, np.ndarray]:
+        table = PriceTick.__table__
+        query = select(
+            table.c.timestamp, table.c.price, table.c.bid, table.c.ask, table.c.volume_24h
+        ).where(table.c.symbol == symbol)
+        if start is not None:
+            query = query.where(table.c.timestamp >= start)
+        if end is not None:
+            query = query.where(table.c.timestamp < end)
+        if limit is None:
+            query = query.order_by(table.c.timestamp)
+        else:
+            # Newest first so the index scan stops after limit rows
+            query = query.order_by(table.c.timestamp.desc()).limit(limit)
+
+        with engine.connect() as conn:
+            rows = conn.execute(query).all()
+        if limit is not None:
+            rows.reverse()
+
+        as_float = lambda value: float(value) if value is not None else np.nan
+        return {
+            "timestamp": np.array([to_micros(row[0]) for row in rows], dtype=np.int64),
+            "price": np.array([as_float(row[1]) for row in rows]),
+            "bid": np.array([as_float(row[2]) for row in rows]),
+            "ask": np.array([as_float(row[3]) for row in rows]),
+            "volume": np.array([as_float(row[4]) for row in rows])
+        }
@@ -2,94 +2,467 @@
 WebSocket Manager for real-time updates
 """
 
-from typing import Dict, Set, List
+from typing import Callable, Deque, Dict, Iterable, Set, List, Optional, Tuple
+from collections import deque
 from fastapi import WebSocket
 import json
 import asyncio
 import logging
+import math
 from datetime import datetime
 
+from app.core.config import settings
+from app.middleware.auth import decode_user_id
+from app.services.event_bus import RATES_CHANGED, Subscription, event_bus
+
 logger = logging.getLogger(__name__)
 
+WILDCARD = "*"
+CHANNEL_SEPARATOR = ":"
+
+def channel_prefixes(channel: str) -> List[str]:
+    """Wildcard prefixes that could cover a channel, e.g. "" and "prices:" for prices:BTC/USD"""
+    prefixes = [""]
+    position = channel.find(CHANNEL_SEPARATOR)
+    while position != -1:
+        prefixes.append(channel[:position + 1])
+        position = channel.find(CHANNEL_SEPARATOR, position + 1)
+    return prefixes
+
+OVERFLOW_POLICIES = ("drop_oldest", "conflate", "disconnect")
+
+class OutboundQueue:
+    """Bounded queue of encoded frames waiting to be written to one client
+    
+    Each frame carries a conflation key: its channel, or None for frames
+    meant for this client alone (acks, notifications, transaction
+    updates), which are never dropped. When the queue is full,
+    drop_oldest discards the oldest channel frame, conflate discards the
+    oldest frame for the same channel (or else the oldest channel frame)
+    and disconnect refuses the frame so the caller can drop the client.
+    If only personal frames are queued, every policy refuses.
+    
+    Like asyncio.Queue, the writer calls task_done() once a frame is on
+    the socket, and join() waits until everything queued was written.
+    """
+    
+    def __init__(self, maxsize: int, policy: str):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self._frames: Deque[Tuple[Optional[str], str]] = deque()
+        self._ready = asyncio.Event()
+        self._unfinished = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+    
+    def __len__(self) -> int:
+        return len(self._frames)
+    
+    def put(self, frame: str, key: Optional[str] = None) -> bool:
+        """Queue a frame without blocking; False means the client should be dropped"""
+        if len(self._frames) >= self.maxsize:
+            if self.policy == "disconnect":
+                return False
+            dropped = None
+            if self.policy == "conflate" and key is not None:
+                # The new frame supersedes the oldest one queued for its channel
+                dropped = next((i for i, (queued_key, _) in enumerate(self._frames) if queued_key == key), None)
+            if dropped is None:
+                dropped = next((i for i, (queued_key, _) in enumerate(self._frames) if queued_key is not None), None)
+            if dropped is None:
+                return False
+            del self._frames[dropped]
+            self._unfinished -= 1
+            self.dropped += 1
+        
+        self._frames.append((key, frame))
+        self._unfinished += 1
+        self._drained.clear()
+        self._ready.set()
+        return True
+    
+    async def get(self) -> str:
+        while not self._frames:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._frames.popleft()[1]
+    
+    def task_done(self):
+        """Mark a frame taken with get() as written"""
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._drained.set()
+    
+    async def join(self):
+        """Wait until every queued frame has been written"""
+        await self._drained.wait()
+    
+    def clear(self):
+        """Forget queued frames, releasing anyone waiting in join()"""
+        self._frames.clear()
+        self._unfinished = 0
+        self._drained.set()
+
 class ConnectionManager:
-    """Manages WebSocket connections"""
+    """Manages WebSocket connections
+    
+    Every connection gets a bounded OutboundQueue drained by its own
+    writer task, so sends never wait on the network: a broadcast encodes
+    the message once and enqueues the same frame for each subscriber, and
+    a slow client only backs up its own queue (WS_OVERFLOW_POLICY decides
+    what happens when it fills).
+    
+    Channels are indexed both ways: subscriptions maps a client to its
+    channels and channel_subscribers maps a channel to its clients, so a
+    broadcast only touches that channel's audience. A subscription ending
+    in "*" ("prices:*", or "*" for everything) is kept by prefix in
+    wildcard_subscribers and matches any channel under it, such as the
+    per-symbol "prices:BTC/USD".
+    """
     
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
         self.subscriptions: Dict[str, Set[str]] = {}
+        self.channel_subscribers: Dict[str, Set[str]] = {}
+        self.wildcard_subscribers: Dict[str, Set[str]] = {}
+        self.queues: Dict[str, OutboundQueue] = {}
+        self.writers: Dict[str, asyncio.Task] = {}
+        self.on_disconnect: Optional[Callable[[str], None]] = None
+        self.on_subscriptions_changed: Optional[Callable[[Iterable[str], int], None]] = None
+        
+        # Reverse lookups so inbound frames and user pushes never scan every connection
+        self.client_ids: Dict[WebSocket, str] = {}
+        self.client_users: Dict[str, str] = {}
+        self.user_connections: Dict[str, Set[str]] = {}
         
-    async def connect(self, websocket: WebSocket, client_id: str):
-        """Accept and store a new WebSocket connection"""
+    async def connect(self, websocket: WebSocket, client_id: str, user_id: Optional[str] = None):
+        """Accept and store a new WebSocket connection, optionally for an authenticated user"""
         await websocket.accept()
         self.active_connections[client_id] = websocket
+        self.client_ids[websocket] = client_id
+        if user_id is not None:
+            self.client_users[client_id] = user_id
+            self.user_connections.setdefault(user_id, set()).add(client_id)
         self.subscriptions[client_id] = set()
+        self.queues[client_id] = OutboundQueue(settings.WS_SEND_QUEUE_SIZE, settings.WS_OVERFLOW_POLICY)
+        self.writers[client_id] = asyncio.create_task(self._writer(client_id, websocket))
         logger.info(f"Client {client_id} connected")
         
     def disconnect(self, client_id: str):
         """Remove a WebSocket connection"""
         if client_id in self.active_connections:
+            channels = self.subscriptions[client_id]
+            for channel in channels:
+                self._unindex(client_id, channel)
+            self.client_ids.pop(self.active_connections[client_id], None)
+            user_id = self.client_users.pop(client_id, None)
+            if user_id is not None:
+                connections = self.user_connections[user_id]
+                connections.discard(client_id)
+                if not connections:
+                    del self.user_connections[user_id]
             del self.active_connections[client_id]
             del self.subscriptions[client_id]
+            self.queues.pop(client_id).clear()
+            writer = self.writers.pop(client_id)
+            if writer is not asyncio.current_task():
+                writer.cancel()
+            if self.on_disconnect:
+                self.on_disconnect(client_id)
+            if channels and self.on_subscriptions_changed:
+                self.on_subscriptions_changed(channels, -1)
             logger.info(f"Client {client_id} disconnected")
+    
+    async def _writer(self, client_id: str, websocket: WebSocket):
+        """Drain one client's queue onto its socket"""
+        queue = self.queues[client_id]
+        try:
+            while True:
+                frame = await queue.get()
+                await asyncio.wait_for(websocket.send_text(frame), settings.WS_SEND_TIMEOUT)
+                queue.task_done()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending message to {client_id}: {e!r}")
+            self.disconnect(client_id)
+            # Close it too, so a client that is merely slow knows to reconnect
+            asyncio.ensure_future(self._close(websocket))
+    
+    def _enqueue(self, client_id: str, frame: str, key: Optional[str] = None) -> bool:
+        """Queue a frame for a client; False if the overflow policy says to drop it"""
+        queue = self.queues.get(client_id)
+        if queue is None:
+            return True
+        if not queue.put(frame, key):
+            logger.warning(f"Client {client_id} send queue full; disconnecting")
+            websocket = self.active_connections[client_id]
+            self.disconnect(client_id)
+            asyncio.ensure_future(self._close(websocket))
+            return False
+        return True
+    
+    @staticmethod
+    async def _close(websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)  # Try again later
+        except Exception:
+            pass
             
     async def send_personal_message(self, message: str, client_id: str):
         """Send a message to a specific client"""
-        if client_id in self.active_connections:
-            websocket = self.active_connections[client_id]
-            try:
-                await websocket.send_text(message)
-            except Exception as e:
-                logger.error(f"Error sending message to {client_id}: {e}")
-                self.disconnect(client_id)
+        self._enqueue(client_id, message)
+    
+    async def send_to_user(self, message: str, user_id: str):
+        """Send a message to every connection of one authenticated user"""
+        self.multicast(tuple(self.user_connections.get(user_id, ())), message)
+    
+    def subscribers(self, channel: str) -> Set[str]:
+        """Clients subscribed to channel directly or through a wildcard"""
+        audience = set(self.channel_subscribers.get(channel, ()))
+        if self.wildcard_subscribers:
+            for prefix in channel_prefixes(channel):
+                audience.update(self.wildcard_subscribers.get(prefix, ()))
+        return audience
+    
+    def has_subscribers(self, channel: str) -> bool:
+        """Cheap check used to skip building messages nobody would receive"""
+        if channel in self.channel_subscribers:
+            return True
+        return any(prefix in self.wildcard_subscribers for prefix in channel_prefixes(channel))
                 
     async def broadcast(self, message: str, channel: str = None):
-        """Broadcast a message to all connected clients or specific channel"""
-        disconnected_clients = []
+        """Broadcast a message to all connected clients or specific channel
         
-        for client_id, websocket in self.active_connections.items():
-            # If channel specified, only send to subscribed clients
-            if channel and channel not in self.subscriptions.get(client_id, set()):
-                continue
-                
-            try:
-                await websocket.send_text(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to {client_id}: {e}")
-                disconnected_clients.append(client_id)
-                
-        # Clean up disconnected clients
-        for client_id in disconnected_clients:
-            self.disconnect(client_id)
+        Returns once the frame is queued for every recipient; the writer
+        tasks deliver it concurrently.
+        """
+        # Only the channel's audience is visited, not every connection
+        client_ids = self.subscribers(channel) if channel else list(self.active_connections)
+        self.multicast(client_ids, message, channel)
+    
+    def multicast(self, client_ids: Iterable[str], message: str, channel: Optional[str] = None):
+        """Queue one encoded frame for each of client_ids"""
+        for client_id in client_ids:
+            self._enqueue(client_id, message, channel)
+    
+    async def drain(self):
+        """Wait until every client's queued frames have been written"""
+        await asyncio.gather(*(queue.join() for queue in list(self.queues.values())))
+    
+    def queue_stats(self) -> Dict:
+        """Backlog and drops across every client's send queue"""
+        depths = [len(queue) for queue in self.queues.values()]
+        return {
+            "clients": len(depths),
+            "queued": sum(depths),
+            "max_depth": max(depths, default=0),
+            "dropped": sum(queue.dropped for queue in self.queues.values()),
+            "policy": settings.WS_OVERFLOW_POLICY
+        }
             
     def subscribe(self, client_id: str, channel: str):
         """Subscribe a client to a channel"""
         if client_id in self.subscriptions:
+            added = channel not in self.subscriptions[client_id]
             self.subscriptions[client_id].add(channel)
+            index, key = self._index_for(channel)
+            index.setdefault(key, set()).add(client_id)
+            if added and self.on_subscriptions_changed:
+                self.on_subscriptions_changed((channel,), 1)
             logger.info(f"Client {client_id} subscribed to {channel}")
             
     def unsubscribe(self, client_id: str, channel: str):
         """Unsubscribe a client from a channel"""
         if client_id in self.subscriptions:
+            removed = channel in self.subscriptions[client_id]
             self.subscriptions[client_id].discard(channel)
+            self._unindex(client_id, channel)
+            if removed and self.on_subscriptions_changed:
+                self.on_subscriptions_changed((channel,), -1)
             logger.info(f"Client {client_id} unsubscribed from {channel}")
+    
+    def _index_for(self, channel: str):
+        """The reverse index a channel lives in and its key there"""
+        if channel.endswith(WILDCARD):
+            return self.wildcard_subscribers, channel[:-len(WILDCARD)]
+        return self.channel_subscribers, channel
+    
+    def _unindex(self, client_id: str, channel: str):
+        index, key = self._index_for(channel)
+        members = index.get(key)
+        if members is not None:
+            members.discard(client_id)
+            # Drop empty channels so has_subscribers stays a dict lookup
+            if not members:
+                del index[key]
+
+class PriceConflator:
+    """Holds back price ticks for clients that asked for a fixed cadence
+    
+    A client that subscribes with interval_ms gets at most one
+    price_update per interval, carrying only the latest price of each
+    symbol that moved since the last one. In between, ticks just overwrite
+    the client's pending {symbol: price} map, so a fast symbol costs the
+    same outbound traffic as a slow one. Clients on the same interval
+    share one flush task, which only visits clients with pending prices.
+    """
+    
+    def __init__(self, manager: ConnectionManager):
+        self.manager = manager
+        self.intervals: Dict[str, float] = {}
+        self.members: Dict[float, Set[str]] = {}
+        self.pending: Dict[str, Dict[str, float]] = {}
+        self.dirty: Dict[float, Set[str]] = {}
+        self.tasks: Dict[float, asyncio.Task] = {}
+    
+    def set_interval(self, client_id: str, interval_ms: Optional[float]) -> Optional[int]:
+        """Put a client on a cadence (clamped to the configured range); 0 or None streams every tick"""
+        self.remove(client_id)
+        if not interval_ms:
+            return None
+        
+        interval_ms = int(min(max(interval_ms, settings.WS_CONFLATION_MIN_INTERVAL_MS), settings.WS_CONFLATION_MAX_INTERVAL_MS))
+        interval = interval_ms / 1000
+        self.intervals[client_id] = interval
+        self.members.setdefault(interval, set()).add(client_id)
+        if interval not in self.tasks:
+            self.tasks[interval] = asyncio.create_task(self._flush_loop(interval))
+        return interval_ms
+    
+    def partition(self, client_ids: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Split clients into (streamed every tick, conflated)"""
+        immediate, conflated = [], []
+        for client_id in client_ids:
+            (conflated if client_id in self.intervals else immediate).append(client_id)
+        return immediate, conflated
+    
+    def update(self, client_ids: Iterable[str], prices: Dict[str, float]):
+        """Record the latest prices for conflated clients"""
+        for client_id in client_ids:
+            interval = self.intervals.get(client_id)
+            if interval is None:
+                continue
+            self.pending.setdefault(client_id, {}).update(prices)
+            self.dirty.setdefault(interval, set()).add(client_id)
+    
+    def remove(self, client_id: str):
+        interval = self.intervals.pop(client_id, None)
+        if interval is None:
+            return
+        self.pending.pop(client_id, None)
+        self.members[interval].discard(client_id)
+        self.dirty.get(interval, set()).discard(client_id)
+        if not self.members[interval]:
+            del self.members[interval]
+    
+    async def stop(self):
+        for task in self.tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+        self.tasks.clear()
+    
+    async def _flush_loop(self, interval: float):
+        """Send each dirty client on this cadence its pending prices; ends when nobody is left on it"""
+        interval_ms = round(interval * 1000)
+        try:
+            while self.members.get(interval):
+                await asyncio.sleep(interval)
+                clients = self.dirty.pop(interval, ())
+                if not clients:
+                    continue
+                
+                timestamp = datetime.now().isoformat()
+                for client_id in clients:
+                    prices = self.pending.pop(client_id, None)
+                    if prices:
+                        self.manager.multicast(
+                            (client_id,),
+                            json.dumps({
+                                "type": "price_update",
+                                "data": prices,
+                                "interval_ms": interval_ms,
+                                "timestamp": timestamp
+                            }),
+                            "prices"
+                        )
+        finally:
+            self.tasks.pop(interval, None)
 
 class WebSocketManager:
     """Main WebSocket manager for the application"""
     
-    def __init__(self):
+    def __init__(self, scheduler=None, snapshots=None):
         self.manager = ConnectionManager()
+        self.conflator = PriceConflator(self.manager)
+        self.manager.on_disconnect = self.conflator.remove
+        self.scheduler = scheduler
+        self.snapshots = snapshots
+        # Live price subscriptions: per pair, and to channels covering every pair
+        self.pair_demand: Dict[str, int] = {}
+        self.broad_demand = 0
+        if scheduler is not None:
+            self.manager.on_subscriptions_changed = self._update_demand
         self.is_running = False
         self.update_tasks = []
+    
+    def _update_demand(self, channels: Iterable[str], delta: int):
+        """Pass subscription changes on to the poll scheduler's demand counts
+        
+        "prices" and wildcards covering it count towards every pair at
+        once; "prices:{pair}" only towards its pair. Only the channels
+        that changed are visited.
+        """
+        for channel in channels:
+            if self._covers_all_prices(channel):
+                self.broad_demand += delta
+                self.scheduler.set_broad_subscribers(self.broad_demand)
+            elif channel.startswith("prices:") and not channel.endswith(WILDCARD):
+                pair = channel[len("prices:"):]
+                count = self.pair_demand.get(pair, 0) + delta
+                if count > 0:
+                    self.pair_demand[pair] = count
+                else:
+                    self.pair_demand.pop(pair, None)
+                self.scheduler.set_subscribers(pair, count)
         
+    @staticmethod
+    def _covers_all_prices(channel: str) -> bool:
+        """True for "prices" and wildcards such as "*" or "prices:*" that match every pair"""
+        if channel == "prices":
+            return True
+        if not channel.endswith(WILDCARD):
+            return False
+        prefix = channel[:-len(WILDCARD)]
+        return "prices:".startswith(prefix)
+    
+    def _snapshot_prices(self, channel: str) -> Dict[str, float]:
+        """Current price of every pair a price channel covers"""
+        if not self.snapshots:
+            return {}
+        rates = self.snapshots.current.rates
+        if self._covers_all_prices(channel):
+            return {pair: rate["price"] for pair, rate in rates.items()}
+        if channel.endswith(WILDCARD):
+            prefix = channel[:-len(WILDCARD)]
+            return {pair: rate["price"] for pair, rate in rates.items() if f"prices:{pair}".startswith(prefix)}
+        if channel.startswith("prices:"):
+            rate = rates.get(channel[len("prices:"):])
+            return {channel[len("prices:"):]: rate["price"]} if rate else {}
+        return {}
+    
     async def start(self):
         """Start the WebSocket manager"""
         self.is_running = True
         logger.info("WebSocket Manager started")
         
-        # Start background tasks for real-time updates
+        # Subscribe before returning so no rate change published after start() is missed
         self.update_tasks = [
-            asyncio.create_task(self._price_update_loop()),
-            asyncio.create_task(self._market_data_loop()),
+            asyncio.create_task(self._price_update_loop(event_bus.subscribe(RATES_CHANGED))),
+            asyncio.create_task(self._market_data_loop(event_bus.subscribe(RATES_CHANGED))),
         ]
         
     async def stop(self):
@@ -102,34 +475,58 @@ class WebSocketManager:
             
         # Wait for tasks to complete
         await asyncio.gather(*self.update_tasks, return_exceptions=True)
+        await self.conflator.stop()
         
         logger.info("WebSocket Manager stopped")
         
-    async def connect(self, websocket: WebSocket):
-        """Handle a new WebSocket connection"""
+    async def connect(self, websocket: WebSocket) -> Optional[str]:
+        """Handle a new WebSocket connection
+        
+        The JWT access token is checked once here, from the token query
+        parameter (browsers cannot set headers on a WebSocket) or a Bearer
+        Authorization header. A bad token is always refused; a missing one
+        only when WS_REQUIRE_AUTH is set. Returns None if the connection
+        was refused.
+        """
         import uuid
+        user_id = None
+        token = self._token_from(websocket)
+        if token:
+            user_id = decode_user_id(token)
+        if user_id is None and (token or settings.WS_REQUIRE_AUTH):
+            await websocket.close(code=1008)  # Policy violation
+            return None
+        
         client_id = str(uuid.uuid4())
-        await self.manager.connect(websocket, client_id)
+        await self.manager.connect(websocket, client_id, str(user_id) if user_id is not None else None)
         
-        # Send initial connection success message
-        await websocket.send_json({
-            "type": "connection",
-            "status": "connected",
-            "client_id": client_id,
-            "timestamp": datetime.now().isoformat()
-        })
+        # Send initial connection success message, through the queue so only the writer touches the socket
+        await self.manager.send_personal_message(
+            json.dumps({
+                "type": "connection",
+                "status": "connected",
+                "client_id": client_id,
+                "authenticated": user_id is not None,
+                "timestamp": datetime.now().isoformat()
+            }),
+            client_id
+        )
         
         return client_id
+    
+    @staticmethod
+    def _token_from(websocket: WebSocket) -> Optional[str]:
+        token = websocket.query_params.get("token")
+        if token:
+            return token
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and credentials:
+            return credentials
+        return None
         
     def disconnect(self, websocket: WebSocket):
         """Handle WebSocket disconnection"""
-        # Find and remove the client
-        client_id = None
-        for cid, ws in self.manager.active_connections.items():
-            if ws == websocket:
-                client_id = cid
-                break
-                
+        client_id = self.manager.client_ids.get(websocket)
         if client_id:
             self.manager.disconnect(client_id)
             
@@ -139,13 +536,7 @@ class WebSocketManager:
             message = json.loads(data)
             message_type = message.get("type")
             
-            # Find client ID
-            client_id = None
-            for cid, ws in self.manager.active_connections.items():
-                if ws == websocket:
-                    client_id = cid
-                    break
-                    
+            client_id = self.manager.client_ids.get(websocket)
             if not client_id:
                 return
                 
@@ -153,17 +544,50 @@ class WebSocketManager:
             if message_type == "subscribe":
                 channel = message.get("channel")
                 if channel:
+                    # Optional per-client cadence for price updates, e.g. {"interval_ms": 1000}
+                    interval_ms = message.get("interval_ms")
+                    if not self._valid_interval(interval_ms):
+                        await self.manager.send_personal_message(
+                            json.dumps({
+                                "type": "error",
+                                "channel": channel,
+                                "message": "interval_ms must be a non-negative number of milliseconds",
+                                "timestamp": datetime.now().isoformat()
+                            }),
+                            client_id
+                        )
+                        return
+                    
                     self.manager.subscribe(client_id, channel)
+                    if "interval_ms" in message:
+                        self.conflator.set_interval(client_id, interval_ms)
+                    interval = self.conflator.intervals.get(client_id)
+                    
                     await self.manager.send_personal_message(
                         json.dumps({
                             "type": "subscription",
                             "channel": channel,
                             "status": "subscribed",
+                            "interval_ms": round(interval * 1000) if interval else None,
                             "timestamp": datetime.now().isoformat()
                         }),
                         client_id
                     )
                     
+                    # Pushes only carry pairs that moved, so start the client off with current prices
+                    prices = self._snapshot_prices(channel)
+                    if prices:
+                        await self.manager.send_personal_message(
+                            json.dumps({
+                                "type": "price_update",
+                                "channel": channel,
+                                "data": prices,
+                                "snapshot": True,
+                                "timestamp": datetime.now().isoformat()
+                            }),
+                            client_id
+                        )
+                    
             elif message_type == "unsubscribe":
                 channel = message.get("channel")
                 if channel:
@@ -192,66 +616,128 @@ class WebSocketManager:
         except Exception as e:
             logger.error(f"Error handling message: {e}")
             
-    async def _price_update_loop(self):
-        """Send price updates to subscribed clients"""
-        while self.is_running:
-            try:
-                # This would fetch real price data from the rate aggregator
-                # For now, we'll send mock updates
-                import random
-                
-                price_update = {
-                    "type": "price_update",
-                    "data": {
-                        "BTC/USD": 45000 + random.uniform(-100, 100),
-                        "ETH/USD": 3000 + random.uniform(-50, 50),
-                        "USD/EUR": 0.85 + random.uniform(-0.01, 0.01),
-                        "GBP/USD": 1.37 + random.uniform(-0.01, 0.01),
-                    },
-                    "timestamp": datetime.now().isoformat()
-                }
+    @staticmethod
+    def _valid_interval(interval_ms) -> bool:
+        """None, or a finite number of milliseconds that is not negative"""
+        if interval_ms is None:
+            return True
+        if isinstance(interval_ms, bool) or not isinstance(interval_ms, (int, float)):
+            return False
+        return math.isfinite(interval_ms) and interval_ms >= 0
+    
+    async def _price_update_loop(self, subscription: Subscription):
+        """Send changed prices to subscribed clients as soon as the aggregator stores them"""
+        try:
+            while self.is_running:
+                event = await subscription.get()
+                try:
+                    await self.broadcast_rates(event["rates"])
+                except Exception as e:
+                    logger.error(f"Error in price update loop: {e}")
+        finally:
+            subscription.close()
                 
-                await self.manager.broadcast(
-                    json.dumps(price_update),
-                    channel="prices"
-                )
+    async def _market_data_loop(self, subscription: Subscription):
+        """Send a market summary built from the latest rates, at most once per WS_MARKET_MIN_INTERVAL"""
+        latest: Optional[Dict[str, Dict]] = None
+        try:
+            while self.is_running:
+                event = await subscription.get()
                 
-                await asyncio.sleep(5)  # Update every 5 seconds
+                # Events only carry pairs that moved, so start from every rate we hold;
+                # seeded here rather than in start() because the snapshot loads after it
+                if latest is None:
+                    latest = dict(self.snapshots.current.rates) if self.snapshots else {}
                 
-            except Exception as e:
-                logger.error(f"Error in price update loop: {e}")
-                await asyncio.sleep(5)
+                # Fold in everything that queued up since the last summary
+                while event is not None:
+                    latest.update(event["rates"])
+                    event = subscription.get_nowait()
                 
-    async def _market_data_loop(self):
-        """Send market data updates to subscribed clients"""
-        while self.is_running:
-            try:
-                # This would fetch real market data
-                # For now, we'll send mock updates
-                import random
+                try:
+                    if self.manager.has_subscribers("market"):
+                        await self.manager.broadcast(
+                            json.dumps({
+                                "type": "market_data",
+                                "data": self._market_summary(latest),
+                                "timestamp": datetime.now().isoformat()
+                            }),
+                            channel="market"
+                        )
+                except Exception as e:
+                    logger.error(f"Error in market data loop: {e}")
                 
-                market_update = {
-                    "type": "market_data",
-                    "data": {
-                        "total_market_cap": 2000000000000 + random.uniform(-50000000000, 50000000000),
-                        "total_volume": 100000000000 + random.uniform(-5000000000, 5000000000),
-                        "btc_dominance": 45 + random.uniform(-1, 1),
-                        "active_trades": random.randint(100, 500),
-                    },
-                    "timestamp": datetime.now().isoformat()
-                }
+                await asyncio.sleep(settings.WS_MARKET_MIN_INTERVAL)
+        finally:
+            subscription.close()
+    
+    @staticmethod
+    def _market_summary(rates: Dict[str, Dict]) -> Dict:
+        """Breadth and volume across every pair we have a rate for
+        
+        total_market_cap, btc_dominance and active_trades are kept for
+        existing clients but stay None: no rate source reports supply or
+        trade counts.
+        """
+        changes = [rate["change_24h"] for rate in rates.values() if rate.get("change_24h") is not None]
+        btc = rates.get("BTC/USD")
+        total_volume = sum(rate.get("volume_24h") or 0 for rate in rates.values())
+        return {
+            "total_market_cap": None,
+            "total_volume": total_volume,
+            "btc_dominance": None,
+            "active_trades": None,
+            "pairs": len(rates),
+            "total_volume_24h": total_volume,
+            "advancing": sum(1 for change in changes if change > 0),
+            "declining": sum(1 for change in changes if change < 0),
+            "average_change_24h": sum(changes) / len(changes) if changes else None,
+            "btc_usd": btc["price"] if btc else None
+        }
                 
-                await self.manager.broadcast(
-                    json.dumps(market_update),
-                    channel="market"
+    async def broadcast_rates(self, rates: Dict[str, Dict]):
+        """Push a batch of fresh rates to price subscribers
+        
+        "prices" gets the whole batch in one message; "prices:{pair}"
+        (or "prices:*") subscribers get one message per pair they follow.
+        Clients on a cadence get them folded into their next conflated
+        update instead.
+        """
+        timestamp = datetime.now().isoformat()
+        prices = {pair: rate["price"] for pair, rate in rates.items()}
+        
+        if self.manager.has_subscribers("prices"):
+            immediate, conflated = self.conflator.partition(self.manager.subscribers("prices"))
+            self.conflator.update(conflated, prices)
+            if immediate:
+                self.manager.multicast(
+                    immediate,
+                    json.dumps({
+                        "type": "price_update",
+                        "data": prices,
+                        "timestamp": timestamp
+                    }),
+                    "prices"
                 )
-                
-                await asyncio.sleep(10)  # Update every 10 seconds
-                
-            except Exception as e:
-                logger.error(f"Error in market data loop: {e}")
-                await asyncio.sleep(10)
-                
+        
+        for pair, price in prices.items():
+            channel = f"prices:{pair}"
+            if not self.manager.has_subscribers(channel):
+                continue
+            immediate, conflated = self.conflator.partition(self.manager.subscribers(channel))
+            self.conflator.update(conflated, {pair: price})
+            if immediate:
+                self.manager.multicast(
+                    immediate,
+                    json.dumps({
+                        "type": "price_update",
+                        "channel": channel,
+                        "data": {pair: price},
+                        "timestamp": timestamp
+                    }),
+                    channel
+                )
+        
     async def send_transaction_update(self, user_id: str, transaction_data: dict):
         """Send transaction update to a specific user"""
         message = {
@@ -260,12 +746,7 @@ class WebSocketManager:
             "timestamp": datetime.now().isoformat()
         }
         
-        # Find client by user_id (would need proper mapping in production)
-        for client_id in self.manager.active_connections:
-            await self.manager.send_personal_message(
-                json.dumps(message),
-                client_id
-            )
+        await self.manager.send_to_user(json.dumps(message), str(user_id))
             
     async def send_notification(self, user_id: str, notification: dict):
         """Send notification to a specific user"""
@@ -275,9 +756,4 @@ class WebSocketManager:
             "timestamp": datetime.now().isoformat()
         }
         
-        # Find client by user_id (would need proper mapping in production)
-        for client_id in self.manager.active_connections:
-            await self.manager.send_personal_message(
-                json.dumps(message),
-                client_id
-            )
+        await self.manager.send_to_user(json.dumps(message), str(user_id))
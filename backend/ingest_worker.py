@@ -0,0 +1,59 @@
+"""
+Sharded rate ingest worker pool
+Runs N processes that each join the ingest pool and poll the share of the
+pair universe the consistent hash ring gives them. Results land in the
+shared Redis rate hashes and snapshot, so API workers started with
+RATE_INGEST_IN_API=false serve them without polling anything themselves:
+
+    python ingest_worker.py --processes 4
+    RATE_INGEST_IN_API=false uvicorn main:app --workers 4
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+
+# Every process started from here is an ingest shard
+os.environ["RATE_INGEST_MODE"] = "sharded"
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def run_worker():
+    from app.services.rate_aggregator import rate_service
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await rate_service.start(ingest=True)
+    logger.info(f"Ingest worker {os.getpid()} started")
+    await stop.wait()
+    await rate_service.stop()
+    logger.info(f"Ingest worker {os.getpid()} stopped")
+
+def worker_main():
+    asyncio.run(run_worker())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=worker_main, name=f"ingest-{i}") for i in range(args.processes)]
+    for worker in workers:
+        worker.start()
+
+    # Children get the same SIGINT from the terminal; SIGTERM is forwarded
+    signal.signal(signal.SIGTERM, lambda *_: [worker.terminate() for worker in workers])
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.join()
@@ -3,7 +3,7 @@ CryptoForex Backend API Server
 Main FastAPI application with all endpoints
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
@@ -21,7 +21,8 @@ from app.api.all_endpoints import (
     forex_pairs_router,
     trading_router
 )
-from app.services.rate_aggregator import RateAggregatorService
+from app.api.market_data import router as market_data_router
+from app.services.rate_aggregator import rate_service
 from app.services.websocket_manager import WebSocketManager
 from app.middleware.auth import verify_token
 from app.middleware.rate_limiter import RateLimitMiddleware
@@ -31,8 +32,7 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Initialize services
-rate_service = RateAggregatorService()
-ws_manager = WebSocketManager()
+ws_manager = WebSocketManager(scheduler=rate_service.scheduler, snapshots=rate_service.snapshots)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -43,12 +43,12 @@ async def lifespan(app: FastAPI):
     # Create database tables
     Base.metadata.create_all(bind=engine)
     
+    # Start WebSocket manager first so it hears the rates the aggregator preloads
+    await ws_manager.start()
+    
     # Start rate aggregator service
     await rate_service.start()
     
-    # Start WebSocket manager
-    await ws_manager.start()
-    
     logger.info("Backend started successfully!")
     
     yield
@@ -99,6 +99,7 @@ async def health_check():
         "database": "connected",
         "redis": "connected",
         "rate_service": rate_service.is_running,
+        "rate_ingest": rate_service.ingesting,
         "websocket": ws_manager.is_running
     }
 
@@ -108,11 +109,13 @@ app.include_router(deposits_router, prefix="/api", tags=["Deposits"])
 app.include_router(stablecoins_router, prefix="/api", tags=["Stablecoins"])
 app.include_router(forex_pairs_router, prefix="/api", tags=["Forex Pairs"])
 app.include_router(trading_router, prefix="/api", tags=["Trading"])
+app.include_router(market_data_router, prefix="/api/market", tags=["Market Data"])
 
 # WebSocket endpoint for real-time updates
 @app.websocket("/ws")
-async def websocket_endpoint(websocket):
-    await ws_manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket):
+    if await ws_manager.connect(websocket) is None:
+        return
     try:
         while True:
             data = await websocket.receive_text()
@@ -0,0 +1,87 @@
+"""
+Mock exchange WebSocket server for streaming ingest
+Serves Binance-style combined 24hrTicker streams from the deterministic
+simulator, so RATE_STREAM_ENABLED can be exercised without network access:
+
+    python mock_exchange_server.py --port 9001
+    RATE_STREAM_ENABLED=true RATE_STREAM_URL=ws://localhost:9001/stream uvicorn main:app
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+
+from app.core.config import settings
+from app.services.providers import SimulatorProvider
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUOTES = ("USDT", "USDC", "USD", "EUR", "BTC", "ETH")
+
+def symbol_to_pair(symbol: str) -> str:
+    """Map an exchange symbol back to our pair key"""
+    for pair, configured in settings.RATE_EXCHANGE_SYMBOLS.items():
+        if configured.upper() == symbol:
+            return pair
+    for quote in QUOTES:
+        if symbol.endswith(quote) and symbol != quote:
+            return f"{symbol[:-len(quote)]}/{'USD' if quote == 'USDT' else quote}"
+    return symbol
+
+def ticker_event(symbol: str, rate: dict) -> dict:
+    """Wrap a simulated rate as a combined-stream 24hrTicker message"""
+    return {
+        "stream": f"{symbol.lower()}@ticker",
+        "data": {
+            "e": "24hrTicker",
+            "E": int(time.time() * 1000),
+            "s": symbol,
+            "c": f"{rate['price']:.8f}",
+            "b": f"{rate['bid']:.8f}",
+            "a": f"{rate['ask']:.8f}",
+            "q": f"{rate['volume_24h']:.2f}",
+            "P": f"{rate['change_24h']:.3f}",
+            "h": f"{rate['high_24h']:.8f}",
+            "l": f"{rate['low_24h']:.8f}"
+        }
+    }
+
+async def serve_client(websocket, interval: float, seed: int):
+    query = parse_qs(urlparse(websocket.path).query)
+    streams = query.get("streams", [""])[0].split("/")
+    symbols = [stream.split("@")[0].upper() for stream in streams if stream.endswith("@ticker")]
+    pairs = {symbol: symbol_to_pair(symbol) for symbol in symbols}
+
+    # Each connection replays the same seeded price paths
+    simulator = SimulatorProvider(list(pairs.values()), seed=seed, latency_ms=0.0, jitter_ms=0.0)
+    logger.info(f"Client subscribed to {', '.join(symbols) or 'nothing'}")
+
+    try:
+        while True:
+            rates = await simulator.fetch_rates(list(pairs.values()))
+            for symbol, pair in pairs.items():
+                if pair in rates:
+                    await websocket.send(json.dumps(ticker_event(symbol, rates[pair])))
+            await asyncio.sleep(interval)
+    except websockets.ConnectionClosed:
+        logger.info("Client disconnected")
+
+async def main(host: str, port: int, interval: float, seed: int):
+    async with websockets.serve(lambda ws: serve_client(ws, interval, seed), host, port):
+        logger.info(f"Mock exchange streaming on ws://{host}:{port}/stream every {interval}s")
+        await asyncio.Future()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between ticker events")
+    parser.add_argument("--seed", type=int, default=settings.RATE_SIMULATOR.get("seed", 42))
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.interval, args.seed))
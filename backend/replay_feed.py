@@ -0,0 +1,107 @@
+"""
+Record and replay rate feeds
+Captures what the ingest path receives (raw provider answers per polling
+cycle and streamed ticker batches) to a compact gzipped file, then plays
+it back through the aggregator and WebSocket fan-out at 1x or faster and
+reports ingest-to-delivery latency and throughput:
+
+    python replay_feed.py record data/feed.jsonl.gz --duration 600
+    python replay_feed.py replay data/feed.jsonl.gz --speed 10 --clients 500
+    python replay_feed.py replay data/feed.jsonl.gz --speed 0   # as fast as possible
+
+Replay needs Redis like the API does, but never calls an upstream provider.
+It keeps its keys under a separate prefix (--redis-prefix) and skips the
+tick store, so it never touches the live rates or price history.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class NullWebSocket:
+    """Benchmark client that accepts and discards every message"""
+
+    def __init__(self):
+        self.messages = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        self.messages += 1
+
+    async def send_json(self, message: dict):
+        self.messages += 1
+
+async def record(args):
+    from app.services.rate_aggregator import rate_service
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await rate_service.start(ingest=True)
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=args.duration)
+    except asyncio.TimeoutError:
+        pass
+    await rate_service.stop()
+
+async def replay(args):
+    from app.services.feed_replay import FeedReplayer
+    from app.services.rate_aggregator import rate_service
+    from app.services.websocket_manager import WebSocketManager
+
+    # Only the replayed records should reach the fan-out, so the manager's own loops stay off
+    ws_manager = WebSocketManager()
+    clients = [NullWebSocket() for _ in range(args.clients)]
+    for i, client in enumerate(clients):
+        await ws_manager.manager.connect(client, f"replay-{i}")
+        ws_manager.manager.subscribe(f"replay-{i}", "prices")
+
+    await rate_service.start(ingest=False)
+    try:
+        stats = await FeedReplayer(rate_service, ws_manager, args.speed).run(args.path)
+    finally:
+        await rate_service.stop()
+
+    stats["clients"] = args.clients
+    stats["messages_delivered"] = sum(client.messages for client in clients)
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="poll the configured providers and record what arrives")
+    record_parser.add_argument("path")
+    record_parser.add_argument("--duration", type=float, default=None, help="seconds; default until interrupted")
+
+    replay_parser = commands.add_parser("replay", help="play a recording back through the pipeline")
+    replay_parser.add_argument("path")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="timeline multiplier; 0 for no pacing")
+    replay_parser.add_argument("--clients", type=int, default=100, help="WebSocket subscribers to fan out to")
+    replay_parser.add_argument(
+        "--redis-prefix", default="cryptoforex:replay:", help="Redis key prefix, kept apart from the live one"
+    )
+
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure before importing the app
+    if args.command == "record":
+        os.environ["RATE_RECORD_FILE"] = args.path
+        os.environ["RATE_LEADER_ELECTION"] = "false"
+        asyncio.run(record(args))
+    else:
+        os.environ.pop("RATE_RECORD_FILE", None)
+        os.environ["REDIS_PREFIX"] = args.redis_prefix
+        os.environ["TICK_STORE_ENABLED"] = "false"
+        os.environ["RATE_LEADER_ELECTION"] = "false"
+        asyncio.run(replay(args))
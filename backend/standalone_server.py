@@ -20,6 +20,10 @@ import asyncio
 import random
 from jose import JWTError, jwt
 
+from app.services.downsampling import METHODS as DOWNSAMPLING_METHODS, downsample_rows
+from app.services.event_bus import RATES_CHANGED, event_bus
+from app.services.providers.simulator import SimulatorProvider
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,6 +42,10 @@ TRADES_DB = {}
 WALLETS_DB = {}
 WEBSOCKET_CONNECTIONS = set()
 
+# Simulated ingest standing in for the rate aggregator
+SIMULATED_PAIRS = ["BTC/USD", "ETH/USD", "USD/EUR", "USD/GBP", "USD/JPY"]
+SIMULATED_TICK_INTERVAL = 1.0  # seconds between simulated provider polls
+
 # Configuration
 SECRET_KEY = "test-secret-key-2024"
 ALGORITHM = "HS256"
@@ -114,9 +122,14 @@ def get_current_user(user_id: str = Depends(verify_token)):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting CryptoForex Test Backend...")
-    # Start background task for WebSocket updates
-    asyncio.create_task(broadcast_updates())
+    # Subscribe before the simulated feed starts so its first tick is delivered
+    tasks = [
+        asyncio.create_task(broadcast_updates(event_bus.subscribe(RATES_CHANGED))),
+        asyncio.create_task(simulate_rates())
+    ]
     yield
+    for task in tasks:
+        task.cancel()
     logger.info("Shutting down CryptoForex Test Backend...")
 
 # Create FastAPI app
@@ -136,27 +149,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Background task for WebSocket updates
-async def broadcast_updates():
+# Background tasks for WebSocket updates
+async def simulate_rates():
+    """Poll the offline simulator and publish the prices that moved, like the aggregator does"""
+    provider = SimulatorProvider(SIMULATED_PAIRS, latency_ms=0, jitter_ms=0)
+    last_prices = {}
     while True:
-        await asyncio.sleep(5)
-        if WEBSOCKET_CONNECTIONS:
-            price_update = {
-                "type": "price_update",
-                "data": {
-                    "BTC/USD": 45000 + random.uniform(-100, 100),
-                    "ETH/USD": 3000 + random.uniform(-50, 50),
-                    "USD/EUR": 0.85 + random.uniform(-0.01, 0.01),
-                },
-                "timestamp": datetime.now().isoformat()
-            }
-            disconnected = set()
-            for websocket in WEBSOCKET_CONNECTIONS:
-                try:
-                    await websocket.send_json(price_update)
-                except:
-                    disconnected.add(websocket)
-            WEBSOCKET_CONNECTIONS.difference_update(disconnected)
+        rates = await provider.fetch_rates(SIMULATED_PAIRS)
+        changed = {pair: rate for pair, rate in rates.items() if last_prices.get(pair) != rate["price"]}
+        last_prices.update((pair, rate["price"]) for pair, rate in changed.items())
+        if changed:
+            event_bus.publish(RATES_CHANGED, {"rate_type": None, "rates": changed})
+        await asyncio.sleep(SIMULATED_TICK_INTERVAL)
+
+async def broadcast_updates(subscription):
+    """Push each batch of changed prices to every client as soon as it is published"""
+    while True:
+        event = await subscription.get()
+        if not WEBSOCKET_CONNECTIONS:
+            continue
+        price_update = {
+            "type": "price_update",
+            "data": {pair: rate["price"] for pair, rate in event["rates"].items()},
+            "timestamp": datetime.now().isoformat()
+        }
+        websockets = list(WEBSOCKET_CONNECTIONS)
+        results = await asyncio.gather(
+            *(websocket.send_json(price_update) for websocket in websockets),
+            return_exceptions=True
+        )
+        WEBSOCKET_CONNECTIONS.difference_update(
+            websocket for websocket, result in zip(websockets, results) if isinstance(result, Exception)
+        )
 
 # Root endpoint
 @app.get("/")
@@ -449,7 +473,15 @@ async def get_crypto_rates():
     ]
 
 @app.get("/api/market/chart/{symbol}")
-async def get_chart_data(symbol: str, interval: str = "1h", limit: int = 24):
+async def get_chart_data(
+    symbol: str,
+    interval: str = "1h",
+    limit: int = 24,
+    max_points: Optional[int] = None,
+    downsample: str = "lttb"
+):
+    if downsample not in DOWNSAMPLING_METHODS:
+        raise HTTPException(status_code=400, detail=f"downsample must be one of {', '.join(DOWNSAMPLING_METHODS)}")
     chart_data = []
     base_price = 100
     for i in range(limit):
@@ -466,7 +498,14 @@ async def get_chart_data(symbol: str, interval: str = "1h", limit: int = 24):
             "volume": random.uniform(1000000, 10000000)
         })
         base_price = close
-    return chart_data
+    return downsample_rows(
+        chart_data,
+        max_points,
+        downsample,
+        y_key="close",
+        low_key="low",
+        high_key="high"
+    )
 
 @app.get("/api/market/stats")
 async def get_market_stats():
@@ -510,7 +549,7 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        WEBSOCKET_CONNECTIONS.remove(websocket)
+        WEBSOCKET_CONNECTIONS.discard(websocket)
 
 if __name__ == "__main__":
     print("\n" + "="*50)
@@ -0,0 +1,121 @@
+"""
+Stub upstream market-data server
+Answers the Alpha Vantage and Binance REST endpoints our providers call,
+with prices from the deterministic simulator, so the pooled HTTP client
+and provider chain can be exercised without network access or API keys:
+
+    python stub_market_server.py --port 9002 --latency-ms 80 --error-rate 0.05
+    ALPHA_VANTAGE_URL=http://localhost:9002/query BINANCE_API_URL=http://localhost:9002 uvicorn main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Query
+
+from app.core.config import settings
+from app.services.providers import SimulatorProvider
+
+app = FastAPI(title="Stub Market Data")
+simulator = SimulatorProvider([], seed=settings.RATE_SIMULATOR.get("seed", 42), latency_ms=0.0, jitter_ms=0.0)
+options = {"latency_ms": 0.0, "error_rate": 0.0}
+requests_served = {"count": 0}
+
+# Binance symbol -> pair, from the configured map plus USDT-quoted defaults
+SYMBOL_PAIRS = {symbol.upper(): pair for pair, symbol in settings.RATE_EXCHANGE_SYMBOLS.items()}
+
+def symbol_to_pair(symbol: str) -> Optional[str]:
+    if symbol in SYMBOL_PAIRS:
+        return SYMBOL_PAIRS[symbol]
+    if symbol.endswith("USDT") and len(symbol) > 4:
+        return f"{symbol[:-4]}/USD"
+    return None
+
+async def upstream_delay():
+    """Apply the configured latency and failure injection"""
+    requests_served["count"] += 1
+    if options["latency_ms"]:
+        await asyncio.sleep(options["latency_ms"] * random.uniform(0.5, 1.5) / 1000)
+    if random.random() < options["error_rate"]:
+        raise HTTPException(status_code=503, detail="Injected upstream failure")
+
+def binance_ticker(symbol: str, rate: dict) -> dict:
+    return {
+        "symbol": symbol,
+        "lastPrice": f"{rate['price']:.8f}",
+        "bidPrice": f"{rate['bid']:.8f}",
+        "askPrice": f"{rate['ask']:.8f}",
+        "quoteVolume": f"{rate['volume_24h']:.2f}",
+        "priceChangePercent": f"{rate['change_24h']:.3f}",
+        "highPrice": f"{rate['high_24h']:.8f}",
+        "lowPrice": f"{rate['low_24h']:.8f}",
+        "closeTime": int(time.time() * 1000)
+    }
+
+@app.get("/query")
+async def alpha_vantage_query(
+    function: str,
+    from_currency: str,
+    to_currency: str,
+    apikey: Optional[str] = None
+):
+    await upstream_delay()
+    if function != "CURRENCY_EXCHANGE_RATE":
+        return {"Error Message": f"Unsupported function {function}"}
+
+    pair = f"{from_currency}/{to_currency}"
+    rate = (await simulator.fetch_rates([pair]))[pair]
+    return {
+        "Realtime Currency Exchange Rate": {
+            "1. From_Currency Code": from_currency,
+            "3. To_Currency Code": to_currency,
+            "5. Exchange Rate": f"{rate['price']:.5f}",
+            "6. Last Refreshed": rate["timestamp"],
+            "8. Bid Price": f"{rate['bid']:.5f}",
+            "9. Ask Price": f"{rate['ask']:.5f}"
+        }
+    }
+
+@app.get("/api/v3/exchangeInfo")
+async def binance_exchange_info():
+    await upstream_delay()
+    symbols = set(SYMBOL_PAIRS)
+    for pair in settings.RATE_CRYPTO_PAIRS:
+        base, quote = pair.split("/")
+        if quote == "USD" and base != "USDT":
+            symbols.add(f"{base}USDT")
+    return {"symbols": [{"symbol": symbol, "status": "TRADING"} for symbol in sorted(symbols)]}
+
+@app.get("/api/v3/ticker/24hr")
+async def binance_ticker_24hr(symbol: Optional[str] = None, symbols: Optional[str] = Query(None)):
+    await upstream_delay()
+    requested = json.loads(symbols) if symbols else [symbol] if symbol else []
+    pairs = {name: symbol_to_pair(name) for name in requested}
+
+    unknown = [name for name, pair in pairs.items() if pair is None]
+    if unknown:
+        # Binance rejects the whole request when any symbol is invalid
+        raise HTTPException(status_code=400, detail={"code": -1121, "msg": "Invalid symbol."})
+
+    rates = await simulator.fetch_rates(list(pairs.values()))
+    tickers = [binance_ticker(name, rates[pair]) for name, pair in pairs.items()]
+    return tickers if symbols else tickers[0]
+
+@app.get("/stats")
+async def stats():
+    return {"requests": requests_served["count"], **options}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=9002)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    options.update(latency_ms=args.latency_ms, error_rate=args.error_rate)
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,120 @@
+"""
+Tests for multi-source consensus pricing
+"""
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.consensus import ConsensusEngine, reject_outliers, weighted_median
+
+WEIGHTS = {"a": 1.0, "b": 1.0, "c": 1.0, "heavy": 5.0, "default": 1.0}
+
+def quote(price, **extra):
+    return {"price": price, **extra}
+
+def test_weighted_median_follows_the_weights():
+    values = np.array([[1.0, 2.0, 3.0], [1.0, 2.0, 3.0]])
+    weights = np.array([[1.0, 1.0, 1.0], [5.0, 1.0, 1.0]])
+
+    assert weighted_median(values, weights).tolist() == [2.0, 1.0]
+
+def test_weighted_median_ignores_zero_weights_and_empty_rows():
+    values = np.array([[1.0, 50.0, 3.0], [1.0, 2.0, 3.0]])
+    weights = np.array([[1.0, 0.0, 1.0], [0.0, 0.0, 0.0]])
+
+    result = weighted_median(values, weights)
+
+    assert result[0] == 1.0
+    assert np.isnan(result[1])
+
+def test_reject_outliers_flags_the_far_quote():
+    prices = np.array([[100.0, 100.1, 99.9, 150.0]])
+
+    accepted, deviation = reject_outliers(prices, np.array([np.nan]), k=5.0, tolerance=0.005)
+
+    assert accepted.tolist() == [[True, True, True, False]]
+    assert deviation[0, 3] > 0.4
+
+def test_reject_outliers_keeps_tight_markets_within_tolerance():
+    # Identical quotes give a zero MAD; the tolerance keeps a 10 bps move from being rejected
+    prices = np.array([[100.0, 100.0, 100.0, 100.1]])
+
+    accepted, _ = reject_outliers(prices, np.array([np.nan]), k=5.0, tolerance=0.005)
+
+    assert accepted.all()
+
+def test_reject_outliers_uses_the_anchor_to_pick_between_two_sources():
+    prices = np.array([[100.0, 130.0]])
+
+    accepted, _ = reject_outliers(prices, np.array([100.2]), k=1.0, tolerance=0.005)
+
+    assert accepted.tolist() == [[True, False]]
+
+def test_reject_outliers_skips_missing_quotes():
+    prices = np.array([[100.0, np.nan, 100.2]])
+
+    accepted, _ = reject_outliers(prices, np.array([np.nan]), k=5.0, tolerance=0.005)
+
+    assert accepted.tolist() == [[True, False, True]]
+
+def test_combine_drops_the_outlier_and_reports_it(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_CONSENSUS_METHOD", "median")
+    engine = ConsensusEngine(WEIGHTS)
+
+    rates = engine.combine({
+        "a": {"BTC/USD": quote(100.0, bid=99.0, ask=101.0)},
+        "b": {"BTC/USD": quote(100.2)},
+        "c": {"BTC/USD": quote(180.0)}
+    })
+
+    rate = rates["BTC/USD"]
+    assert 100.0 <= rate["price"] <= 100.2
+    assert rate["sources"] == 2
+    assert rate["rejected_sources"] == ["c"]
+
+    stats = engine.stats()
+    assert stats["c"]["rejected"] == 1
+    assert stats["a"]["rejected"] == 0
+
+def test_combine_weights_sources(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_CONSENSUS_METHOD", "median")
+    engine = ConsensusEngine(WEIGHTS)
+
+    rates = engine.combine({
+        "heavy": {"EUR/USD": quote(1.1000)},
+        "a": {"EUR/USD": quote(1.1010)},
+        "b": {"EUR/USD": quote(1.1011)}
+    })
+
+    assert rates["EUR/USD"]["price"] == 1.1000
+
+def test_combine_rescales_bid_and_ask_of_the_nearest_source(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_CONSENSUS_METHOD", "median")
+    engine = ConsensusEngine({"default": 1.0})
+
+    rates = engine.combine({
+        "a": {"ETH/USD": quote(2000.0, bid=1999.0, ask=2001.0)},
+        "b": {"ETH/USD": quote(2002.0)}
+    })
+
+    rate = rates["ETH/USD"]
+    scale = rate["price"] / 2000.0
+    assert rate["bid"] == 1999.0 * scale
+    assert rate["ask"] == 2001.0 * scale
+
+def test_combine_passes_a_single_source_through():
+    engine = ConsensusEngine(WEIGHTS)
+    rates = {"BTC/USD": quote(100.0)}
+
+    assert engine.combine({"a": rates, "b": {}}) == rates
+
+def test_combine_vwap_weights_by_volume(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_CONSENSUS_METHOD", "vwap")
+    engine = ConsensusEngine({"default": 1.0})
+
+    rates = engine.combine({
+        "a": {"BTC/USD": quote(100.0, volume_24h=3.0)},
+        "b": {"BTC/USD": quote(100.4, volume_24h=1.0)}
+    })
+
+    assert abs(rates["BTC/USD"]["price"] - 100.1) < 1e-9
@@ -0,0 +1,66 @@
+"""
+Tests for the cross-rate matrix
+"""
+
+import numpy as np
+import pytest
+
+from app.services.cross_rates import CrossRateMatrix
+
+RATES = {
+    "EUR/USD": {"price": 1.10},
+    "USD/JPY": {"price": 150.0},
+    "BTC/USD": {"price": 60000.0},
+    "XAU/CHF": {"price": 2000.0}
+}
+
+def test_direct_quotes_and_inverses_are_exact():
+    matrix = CrossRateMatrix(RATES)
+
+    assert matrix.rate("EUR", "USD") == 1.10
+    assert matrix.rate("USD", "EUR") == 1 / 1.10
+
+def test_cross_rates_are_derived_through_the_graph():
+    matrix = CrossRateMatrix(RATES)
+
+    assert matrix.rate("EUR", "JPY") == pytest.approx(1.10 * 150.0)
+    assert matrix.rate("BTC", "EUR") == pytest.approx(60000.0 / 1.10)
+
+def test_same_currency_converts_at_one():
+    assert CrossRateMatrix(RATES).rate("JPY", "JPY") == 1.0
+
+def test_disconnected_and_unknown_currencies_have_no_rate():
+    matrix = CrossRateMatrix(RATES)
+
+    assert matrix.rate("EUR", "CHF") is None
+    assert matrix.rate("EUR", "GBP") is None
+
+def test_unusable_quotes_are_ignored():
+    matrix = CrossRateMatrix({
+        "EUR/USD": {"price": 1.10},
+        "GBP/USD": {"price": 0},
+        "JPY/USD": {},
+        "SPOT": {"price": 1.0}
+    })
+
+    assert matrix.currencies.tolist() == ["EUR", "USD"]
+
+def test_convert_many_matches_rate():
+    matrix = CrossRateMatrix(RATES)
+
+    converted = matrix.convert_many(
+        [100.0, 2.0, 5.0, 1.0],
+        ["EUR", "BTC", "EUR", "GBP"],
+        ["JPY", "USD", "EUR", "USD"]
+    )
+
+    assert converted[0] == pytest.approx(100.0 * matrix.rate("EUR", "JPY"))
+    assert converted[1] == pytest.approx(120000.0)
+    assert converted[2] == 5.0
+    assert np.isnan(converted[3])
+
+def test_empty_rates_build_an_empty_matrix():
+    matrix = CrossRateMatrix({})
+
+    assert matrix.rate("EUR", "USD") is None
+    assert np.isnan(matrix.convert_many([1.0], ["EUR"], ["USD"])[0])
@@ -0,0 +1,82 @@
+"""
+Tests for chart downsampling
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.services.downsampling import downsample_rows, epoch_seconds, lttb_indices, minmax_indices
+
+def test_lttb_keeps_endpoints_and_threshold():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 25)
+
+    keep = lttb_indices(x, y, 50)
+
+    assert len(keep) == 50
+    assert keep[0] == 0
+    assert keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+
+def test_lttb_keeps_a_spike():
+    x = np.arange(500, dtype=float)
+    y = np.zeros(500)
+    y[321] = 100.0
+
+    assert 321 in lttb_indices(x, y, 20)
+
+def test_lttb_returns_everything_under_threshold():
+    assert lttb_indices(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+
+def test_lttb_with_two_points_keeps_the_ends():
+    assert lttb_indices(np.arange(100), np.arange(100), 2).tolist() == [0, 99]
+
+def test_lttb_weighs_x_spacing():
+    # Same y values; only the gap before the last point differs
+    y = np.array([0.0, 2.0, 0.0, 1.2, 0.0, 10.0])
+    even = lttb_indices(np.arange(6, dtype=float), y, 3)
+    gappy = lttb_indices(np.array([0.0, 1.0, 2.0, 3.0, 4.0, 1000.0]), y, 3)
+
+    assert even.tolist() == [0, 4, 5]
+    assert gappy.tolist() == [0, 1, 5]
+
+def test_minmax_keeps_each_bucket_extremes_in_order():
+    low = np.array([5.0, 1.0, 9.0, 4.0, 3.0, 8.0, 2.0, 7.0])
+
+    keep = minmax_indices(low, None, 4)
+
+    assert keep.tolist() == [1, 2, 5, 6]
+
+def test_minmax_uses_separate_high_series():
+    low = np.array([3.0, 2.0, 4.0, 5.0])
+    high = np.array([6.0, 9.0, 7.0, 8.0])
+
+    keep = minmax_indices(low, high, 2)
+
+    assert keep.tolist() == [1]
+
+def test_epoch_seconds_accepts_datetimes_and_iso_strings():
+    moment = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    assert epoch_seconds(moment) == moment.timestamp()
+    assert epoch_seconds("2024-01-01T00:00:00") == moment.timestamp()
+    assert epoch_seconds(12.5) == 12.5
+
+def test_downsample_rows_uses_timestamps_not_positions():
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    offsets = [0, 1, 2, 3, 4, 1000]
+    rows = [
+        {"timestamp": (start + timedelta(minutes=offset)).isoformat(), "price": price}
+        for offset, price in zip(offsets, [0.0, 2.0, 0.0, 1.2, 0.0, 10.0])
+    ]
+
+    kept = downsample_rows(rows, 3)
+
+    # Spaced by row position this would keep row 4, as in test_lttb_weighs_x_spacing
+    assert [rows.index(row) for row in kept] == [0, 1, 5]
+
+def test_downsample_rows_leaves_short_series_alone():
+    rows = [{"timestamp": i, "price": float(i)} for i in range(3)]
+
+    assert downsample_rows(rows, 10) is rows
@@ -0,0 +1,47 @@
+"""
+Tests for the consistent hash ring
+"""
+
+from app.services.hash_ring import HashRing
+
+KEYS = [f"PAIR{i}/USD" for i in range(2000)]
+
+def test_empty_ring_owns_nothing():
+    ring = HashRing()
+
+    assert ring.node_for("BTC/USD") is None
+    assert ring.assign(KEYS) == {}
+
+def test_every_key_is_assigned_exactly_once():
+    ring = HashRing(["a", "b", "c"])
+
+    assignment = ring.assign(KEYS)
+
+    assert sorted(assignment) == ["a", "b", "c"]
+    assert sorted(key for keys in assignment.values() for key in keys) == sorted(KEYS)
+
+def test_placement_is_deterministic():
+    assert HashRing(["a", "b", "c"]).assign(KEYS) == HashRing(["c", "a", "b", "a"]).assign(KEYS)
+
+def test_keys_spread_roughly_evenly():
+    assignment = HashRing(["a", "b", "c", "d"]).assign(KEYS)
+
+    for keys in assignment.values():
+        assert 0.15 < len(keys) / len(KEYS) < 0.35
+
+def test_adding_a_node_only_moves_keys_to_it():
+    before = HashRing(["a", "b", "c"])
+    after = HashRing(["a", "b", "c", "d"])
+
+    moved = [key for key in KEYS if before.node_for(key) != after.node_for(key)]
+
+    assert all(after.node_for(key) == "d" for key in moved)
+    assert len(moved) / len(KEYS) < 0.4
+
+def test_removing_a_node_only_moves_its_keys():
+    before = HashRing(["a", "b", "c"])
+    after = HashRing(["a", "c"])
+
+    for key in KEYS:
+        if before.node_for(key) != "b":
+            assert after.node_for(key) == before.node_for(key)
@@ -0,0 +1,32 @@
+"""
+Tests for the provider status endpoint
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.market_data import router
+from app.services.rate_aggregator import rate_service
+
+app = FastAPI()
+app.include_router(router, prefix="/api/market")
+client = TestClient(app)
+
+def test_providers_lists_every_configured_provider():
+    response = client.get("/api/market/providers")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True
+
+    configured = [provider.name for provider in rate_service.forex_providers + rate_service.crypto_providers]
+    assert [provider["name"] for provider in body["data"]] == configured
+    assert body["count"] == len(configured)
+
+def test_providers_report_health_and_consensus():
+    body = client.get("/api/market/providers").json()
+
+    for provider in body["data"]:
+        assert "health" in provider
+        assert "consensus" in provider
+        assert isinstance(provider["http"], dict)